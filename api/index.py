@@ -1,25 +1,14 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+import os
+import sys
 from mangum import Mangum
 
-app = FastAPI(title="Illusion Note API")
+# 저장소 루트를 모듈 검색 경로에 추가 (app 패키지 임포트용)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# CORS 설정
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-@app.get("/")
-async def root():
-    return {"message": "Illusion Note API - Welcome!"}
-
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy"}
+# 전체 라우터를 포함한 FastAPI 앱을 그대로 사용
+# 무거운 의존성(openai, torch 등)과 서비스 객체는 첫 요청 시 로드되므로 콜드 스타트에 영향이 없음
+from app.main import app
 
 # Vercel 서버리스 함수 핸들러
-handler = Mangum(app) 
\ No newline at end of file
+# Mangum은 호출마다 lifespan을 실행하므로, 커넥션 풀이 매 요청 종료 시 닫히지 않도록 비활성화
+handler = Mangum(app, lifespan="off")
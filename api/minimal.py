@@ -1,10 +1,17 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 import os
+import sys
+from typing import List
 import openai
 from dotenv import load_dotenv
 from pydantic import BaseModel
 
+# Make the repository root importable (for the app package)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.lexicon_scorer import get_default_scorer
+
 # Load environment variables
 try:
     load_dotenv()
@@ -37,6 +44,9 @@ app.add_middleware(
 class TextRequest(BaseModel):
     text: str
     
+class TextsRequest(BaseModel):
+    texts: List[str]
+    
 class PromptRequest(BaseModel):
     prompt: str
     temperature: float = 0.7
@@ -70,29 +80,13 @@ async def openai_completion(request: PromptRequest):
     except Exception as e:
         return {"error": str(e)}
 
-# A simple emotion analyzer endpoint
+# Lexicon-based emotion analyzer endpoint
+# The lexicon is compiled once into a multi-pattern automaton, so each text is scanned a single time
 @app.post("/api/emotion")
 async def analyze_emotion(request: TextRequest):
-    emotions = {
-        "happy": 0.0,
-        "sad": 0.0,
-        "angry": 0.0,
-        "fear": 0.0,
-        "surprise": 0.0
-    }
-    
-    text = request.text.lower()
-    
-    # Very basic rule-based emotion detection
-    if any(word in text for word in ["happy", "joy", "glad", "delighted"]):
-        emotions["happy"] = 0.8
-    if any(word in text for word in ["sad", "unhappy", "depressed", "miserable"]):
-        emotions["sad"] = 0.8
-    if any(word in text for word in ["angry", "mad", "furious", "outraged"]):
-        emotions["angry"] = 0.8
-    if any(word in text for word in ["afraid", "scared", "terrified", "fearful"]):
-        emotions["fear"] = 0.8
-    if any(word in text for word in ["surprised", "shocked", "amazed", "astonished"]):
-        emotions["surprise"] = 0.8
-    
-    return {"emotions": emotions} 
\ No newline at end of file
+    return get_default_scorer().score(request.text)
+
+# Batch variant for scoring many texts in one request
+@app.post("/api/emotion/batch")
+async def analyze_emotion_batch(request: TextsRequest):
+    return {"results": get_default_scorer().score_batch(request.texts)}
@@ -0,0 +1 @@
+# Initialize cli package 
@@ -0,0 +1,45 @@
+"""
+월별 감정 집계(emotion_monthly_stats) 재생성 명령
+
+집계 테이블을 도입하기 전에 저장된 emotion_analysis 행, 또는 집계 없이 저장된 행을
+월별 집계에 반영합니다. 대상 사용자의 집계를 지우고 emotion_analysis에서 다시 계산하므로
+여러 번 실행해도 결과가 같습니다.
+
+사용법:
+    python -m app.cli.backfill_rollups
+    python -m app.cli.backfill_rollups --user-id 00000000-0000-0000-0000-000000000000
+    python -m app.cli.backfill_rollups --url sqlite:///data/emotion.db
+"""
+import os
+import time
+import asyncio
+import argparse
+from uuid import UUID
+
+from app.models.emotion_storage import EmotionStorage
+
+
+async def backfill(url, user_id=None):
+    backend = EmotionStorage.create_backend(url)
+    try:
+        return await backend.backfill(user_id)
+    finally:
+        await backend.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="월별 감정 집계 재생성")
+    parser.add_argument("--url", default=os.getenv("EMOTION_STORAGE_URL"), help="저장소 URL (기본값: EMOTION_STORAGE_URL)")
+    parser.add_argument("--user-id", type=UUID, default=None, help="특정 사용자만 재생성")
+    args = parser.parse_args()
+
+    if not args.url:
+        parser.error("--url 또는 EMOTION_STORAGE_URL이 필요합니다")
+
+    start = time.perf_counter()
+    rows = asyncio.run(backfill(args.url, args.user_id))
+    print(f"월별 집계 {rows}행 재생성 ({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+비동기 작업 워커
+
+API 서버(서버리스 포함)가 JOB_QUEUE_URL의 Redis 호환 서버에 제출한 작업을 처리합니다.
+API 서버는 JOB_WORKERS=0으로 두어 제출만 받고, 작업 처리는 이 프로세스가 담당하도록 분리할 수 있습니다.
+
+사용법:
+    JOB_QUEUE_URL=redis://localhost:6379/0 python -m app.cli.job_worker
+    JOB_QUEUE_URL=redis://localhost:6379/0 python -m app.cli.job_worker --workers 16
+"""
+import os
+import signal
+import asyncio
+import argparse
+import logging
+
+from app.core.log_config import setup_logging, shutdown_logging
+from app.models.job_queue import JobManager
+from app.routes import openai_route
+
+logger = logging.getLogger("app.cli.job_worker")
+
+
+async def run(workers):
+    manager = JobManager.from_env(openai_route.run_job)
+    manager.workers = workers
+    manager.start()
+    logger.info("작업 워커 시작", extra={"workers": workers, "backend": type(manager.backend).__name__})
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+
+    logger.info("작업 워커 종료 중 (처리 중인 작업 완료 대기)")
+    await manager.close()
+    await openai_route.close_openai_service()
+    await openai_route.close_emotion_storage()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="비동기 작업 워커")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("JOB_WORKERS", "4")) or 4, help="동시에 처리할 작업 수")
+    args = parser.parse_args()
+
+    if not os.getenv("JOB_QUEUE_URL"):
+        parser.error("JOB_QUEUE_URL이 필요합니다 (프로세스 메모리 대기열은 다른 프로세스와 공유되지 않음)")
+
+    setup_logging()
+    try:
+        asyncio.run(run(args.workers))
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""
+대량 재분석 명령
+
+프롬프트 템플릿이나 모델을 바꾼 뒤 emotion_analysis 내보내기(JSONL 또는 CSV)를 다시 분석합니다.
+
+- 입력을 한 행씩 읽으므로 행 수와 관계없이 메모리 사용량이 일정합니다.
+- --concurrency개까지 동시에 분석하고, 결과는 입력 순서대로 JSONL로 바로 기록합니다.
+- --checkpoint-every 행마다 입력/출력 위치를 체크포인트 파일에 저장하므로, 중단된 뒤 같은 명령을
+  다시 실행하면 마지막 체크포인트부터 이어서 처리합니다 (체크포인트 이후 기록된 출력은 잘라냄).
+- 처리 속도(행/초)와 진행률을 표준 오류로 표시합니다.
+
+입력 행 필드: text(필수), id, user_id, mood_id, mode, response_type.
+emotion_analysis 내보내기처럼 mood_id/mode가 metadata(JSON)에 들어 있어도 읽습니다.
+
+엔진:
+    openai     OpenAIService.generate_response (업스트림 장애 시 템플릿 응답으로 대체하지 않고 error로 기록)
+    analyzer   EmotionAnalyzer.analyze_async (로컬 템플릿/모델)
+
+사용법:
+    python -m app.cli.reanalyze export.jsonl results.jsonl
+    python -m app.cli.reanalyze export.csv results.jsonl --engine analyzer --concurrency 64
+    python -m app.cli.reanalyze export.jsonl results.jsonl --restart   # 체크포인트 무시하고 처음부터
+"""
+import os
+import csv
+import sys
+import json
+import time
+import signal
+import asyncio
+import argparse
+import logging
+
+from app.core.log_config import setup_logging, shutdown_logging
+
+logger = logging.getLogger("app.cli.reanalyze")
+
+# 출력 행에 그대로 옮길 입력 필드
+PASSTHROUGH_FIELDS = ("id", "user_id")
+
+
+def detect_format(path):
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def _lines(f, position):
+    """바이너리 파일에서 한 줄씩 디코딩하여 반환하고, 읽은 위치(바이트)를 position[0]에 반영합니다."""
+    while True:
+        line = f.readline()
+        if not line:
+            return
+        if position[0] == 0 and line.startswith(b"\xef\xbb\xbf"):
+            # UTF-8 BOM (엑셀 등에서 내보낸 CSV)
+            position[0] += 3
+            line = line[3:]
+        position[0] += len(line)
+        yield line.decode("utf-8")
+
+
+def read_rows(path, fmt, offset=0):
+    """
+    입력 파일의 행을 (행 dict, 행이 끝난 위치(바이트)) 형태로 하나씩 반환합니다.
+
+    offset이 주어지면 그 위치(이전 실행에서 처리가 끝난 행의 끝)부터 읽습니다.
+    CSV는 따옴표 안의 줄바꿈(여러 줄짜리 일기)을 지원하며, 헤더는 항상 파일 처음에서 읽습니다.
+
+    Raises:
+        ValueError: JSONL 행이 JSON 객체가 아닌 경우
+    """
+    position = [0]
+    with open(path, "rb") as f:
+        if fmt == "csv":
+            lines = _lines(f, position)
+            reader = csv.reader(lines)
+            header = next(reader, None)
+            if header is None:
+                return
+            if offset > position[0]:
+                f.seek(offset)
+                position[0] = offset
+            # csv.reader는 행을 완성하는 데 필요한 줄만 읽으므로 행을 받은 시점의 위치가 행의 끝
+            for values in reader:
+                if values:
+                    yield dict(zip(header, values)), position[0]
+            return
+
+        if offset:
+            f.seek(offset)
+            position[0] = offset
+        for line in _lines(f, position):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError(f"JSON 객체가 아닌 행입니다 (위치 {position[0]})")
+            yield row, position[0]
+
+
+def entry_params(row):
+    """입력 행에서 (text, mood_id, mode, response_type)을 추출합니다. mood_id/mode는 metadata도 확인합니다."""
+    metadata = row.get("metadata") or {}
+    if isinstance(metadata, str):
+        try:
+            metadata = json.loads(metadata)
+        except ValueError:
+            metadata = {}
+    return (
+        row.get("text") or "",
+        row.get("mood_id") or metadata.get("mood_id") or "neutral",
+        row.get("mode") or metadata.get("mode") or "chat",
+        row.get("response_type") or "comfort"
+    )
+
+
+class Checkpoint:
+    """
+    진행 위치 체크포인트 (JSON 파일, 임시 파일에 쓴 뒤 교체하여 항상 온전한 내용 유지)
+
+    rows: 처리가 끝난 입력 행 수, input_offset: 입력에서 다음에 읽을 위치,
+    output_offset: 출력 파일에서 기록이 확정된 끝 위치
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self, input_path, output_path):
+        """같은 입력/출력의 체크포인트가 있으면 반환합니다. 없으면 None을 반환합니다."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        if state.get("input") != os.path.abspath(input_path) or state.get("output") != os.path.abspath(output_path):
+            raise ValueError(f"다른 입력/출력의 체크포인트입니다: {self.path} (--restart로 처음부터 실행)")
+        return state
+
+    def save(self, input_path, output_path, rows, errors, input_offset, output_offset):
+        state = {
+            "input": os.path.abspath(input_path),
+            "output": os.path.abspath(output_path),
+            "rows": rows,
+            "errors": errors,
+            "input_offset": input_offset,
+            "output_offset": output_offset,
+            "updated_at": time.time()
+        }
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.path)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class Progress:
+    """처리 속도와 진행률을 표준 오류에 한 줄로 갱신하여 표시합니다 (interval초마다)."""
+
+    def __init__(self, total_bytes, start_rows, start_offset, interval=1.0, stream=sys.stderr):
+        self.total_bytes = total_bytes
+        self.start_rows = start_rows
+        self.start_offset = start_offset
+        self.interval = interval
+        self.stream = stream
+        self.started = time.monotonic()
+        self.last_shown = 0.0
+        self.last_rows = start_rows
+        self.last_time = self.started
+
+    def update(self, rows, errors, offset, in_flight, force=False):
+        now = time.monotonic()
+        if not force and now - self.last_shown < self.interval:
+            return
+        # 최근 구간 속도와 이번 실행 전체 평균 속도
+        recent = (rows - self.last_rows) / max(now - self.last_time, 1e-9)
+        average = (rows - self.start_rows) / max(now - self.started, 1e-9)
+        self.last_shown = self.last_time = now
+        self.last_rows = rows
+
+        percent = f"{offset / self.total_bytes:6.1%}" if self.total_bytes else "   -  "
+        eta = ""
+        if average > 0 and self.total_bytes and offset > self.start_offset:
+            remaining = (now - self.started) * (self.total_bytes - offset) / (offset - self.start_offset)
+            eta = f"  남은 시간 {remaining:,.0f}s"
+        self.stream.write(
+            f"\r{percent}  {rows:,}행  {recent:,.1f}행/s (평균 {average:,.1f})  오류 {errors:,}  처리 중 {in_flight}{eta}   "
+        )
+        self.stream.flush()
+
+
+def create_engine(name):
+    """
+    엔진 이름으로 (분석 코루틴 함수, 정리 코루틴 함수)를 반환합니다.
+
+    분석 함수는 (text, mood_id, mode, response_type) -> 결과 dict를 반환하고, 실패하면 예외를 발생시킵니다.
+    """
+    if name == "analyzer":
+        from app.models.emotion_analyzer import EmotionAnalyzer
+
+        analyzer = EmotionAnalyzer()
+
+        async def analyze(text, mood_id, mode, response_type):
+            # EmotionAnalyzer의 모드는 OpenAI 경로의 응답 유형(comfort/fact/advice)에 해당
+            return await analyzer.analyze_async(text, mood_id, response_type)
+
+        async def close():
+            pass
+
+        return analyze, close
+
+    # 재분석은 매번 새로 생성해야 하므로 응답 캐시는 명시적으로 켠 경우에만 사용
+    os.environ.setdefault("OPENAI_CACHE_SIZE", "0")
+    from app.models.openai_service import OpenAIService
+
+    service = OpenAIService()
+
+    async def analyze(text, mood_id, mode, response_type):
+        # 업스트림 오류는 UpstreamError로 전달되어 해당 행의 error로 기록됨
+        return await service.generate_response(text, mode=mode, mood_id=mood_id, response_type=response_type)
+
+    return analyze, service.aclose
+
+
+async def reanalyze(args):
+    """
+    입력을 재분석하여 출력 파일에 기록하고 (처리한 행 수, 오류 행 수)를 반환합니다.
+    """
+    checkpoint = Checkpoint(args.checkpoint or args.output + ".checkpoint")
+    if args.restart:
+        checkpoint.clear()
+    state = checkpoint.load(args.input, args.output)
+
+    rows = errors = input_offset = output_offset = 0
+    if state is not None:
+        rows, errors = state["rows"], state["errors"]
+        input_offset, output_offset = state["input_offset"], state["output_offset"]
+        logger.info("체크포인트부터 재개", extra={"rows": rows, "input_offset": input_offset})
+
+    # 체크포인트 이후에 기록된 (확정되지 않은) 출력은 잘라내고 이어서 기록
+    if state is not None and not os.path.exists(args.output):
+        raise ValueError(f"체크포인트의 출력 파일이 없습니다: {args.output} (--restart로 처음부터 실행)")
+    output = open(args.output, "r+b" if state is not None else "wb")
+    output.truncate(output_offset)
+    output.seek(output_offset)
+
+    analyze, close = create_engine(args.engine)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    window = args.window or args.concurrency * 4
+    progress = Progress(os.path.getsize(args.input), rows, input_offset)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    async def process(row):
+        text, mood_id, mode, response_type = entry_params(row)
+        record = {name: row[name] for name in PASSTHROUGH_FIELDS if name in row}
+        record.update({"mood_id": mood_id, "mode": mode, "response_type": response_type})
+        if not text:
+            record["error"] = "text 필드가 없습니다"
+            return record
+        async with semaphore:
+            try:
+                record.update(await analyze(text, mood_id, mode, response_type))
+            except Exception as e:
+                record["error"] = str(e) or type(e).__name__
+        return record
+
+    def save_checkpoint():
+        # 출력이 디스크에 기록된 뒤에 체크포인트를 갱신 (체크포인트가 가리키는 출력은 항상 온전함)
+        output.flush()
+        os.fsync(output.fileno())
+        checkpoint.save(args.input, args.output, rows, errors, input_offset, output.tell())
+
+    # 입력 순서대로 기록하기 위해 window개까지 미리 시작하고, 항상 가장 앞의 행이 끝나기를 기다림
+    # (느린 행 하나가 있어도 메모리에는 window개의 행만 유지)
+    pending = asyncio.Queue()
+    source = read_rows(args.input, args.input_format or detect_format(args.input), input_offset)
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and not stop.is_set() and pending.qsize() < window:
+                item = next(source, None)
+                if item is None:
+                    exhausted = True
+                    break
+                row, end_offset = item
+                pending.put_nowait((asyncio.ensure_future(process(row)), end_offset))
+            if pending.empty():
+                break
+
+            task, end_offset = pending.get_nowait()
+            record = await task
+            output.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+            rows += 1
+            errors += "error" in record
+            input_offset = end_offset
+            if rows % args.checkpoint_every == 0:
+                save_checkpoint()
+            progress.update(rows, errors, input_offset, pending.qsize())
+    finally:
+        # 중단 신호를 받으면 새 행은 시작하지 않고 이미 시작한 행까지 기록한 뒤 여기에 도달
+        # (예외로 빠져나온 경우 기록하지 못한 행은 취소하고 다음 실행에서 다시 처리)
+        while not pending.empty():
+            pending.get_nowait()[0].cancel()
+        save_checkpoint()
+        output.close()
+        progress.update(rows, errors, input_offset, 0, force=True)
+        sys.stderr.write("\n")
+        await close()
+
+    if stop.is_set():
+        logger.warning("중단됨 - 같은 명령으로 다시 실행하면 이어서 처리합니다", extra={"rows": rows})
+    elif exhausted and not args.keep_checkpoint:
+        checkpoint.clear()
+    return rows, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="emotion_analysis 내보내기 대량 재분석")
+    parser.add_argument("input", help="입력 파일 (JSONL 또는 CSV)")
+    parser.add_argument("output", help="결과 JSONL 파일")
+    parser.add_argument("--input-format", choices=["jsonl", "csv"], default=None, help="입력 형식 (기본값: 확장자로 판단)")
+    parser.add_argument("--engine", choices=["openai", "analyzer"], default="openai")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시에 분석할 최대 행 수")
+    parser.add_argument("--window", type=int, default=0, help="미리 읽어 처리할 최대 행 수 (기본값: concurrency × 4)")
+    parser.add_argument("--checkpoint", default=None, help="체크포인트 파일 (기본값: <output>.checkpoint)")
+    parser.add_argument("--checkpoint-every", type=int, default=500, help="체크포인트 저장 간격(행)")
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 처음부터 실행")
+    parser.add_argument("--keep-checkpoint", action="store_true", help="완료 후에도 체크포인트 파일 유지")
+    args = parser.parse_args()
+
+    if args.concurrency < 1 or args.checkpoint_every < 1:
+        parser.error("--concurrency와 --checkpoint-every는 1 이상이어야 합니다")
+
+    setup_logging()
+    start = time.perf_counter()
+    try:
+        rows, errors = asyncio.run(reanalyze(args))
+    except ValueError as e:
+        parser.exit(2, f"오류: {e}\n")
+    finally:
+        shutdown_logging()
+    print(f"{rows:,}행 처리 (오류 {errors:,}행, {time.perf_counter() - start:.2f}s): {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Initialize core package 
\ No newline at end of file
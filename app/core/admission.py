@@ -0,0 +1,209 @@
+import os
+import json
+import math
+import time
+import asyncio
+from collections import OrderedDict
+from contextvars import ContextVar
+
+from app.core.metrics import ADMISSION_REJECTIONS, LLM_IN_FLIGHT
+
+# 현재 요청의 마감 시각 (time.monotonic 기준, 클라이언트가 예산을 보내지 않으면 None)
+request_deadline = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceededError(asyncio.TimeoutError):
+    """클라이언트 예산이 이미 끝나 업스트림을 호출하지 않은 경우"""
+
+
+def deadline_remaining():
+    """현재 요청의 남은 예산(초). 마감 시각이 없으면 None"""
+    deadline = request_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def _split_env(name, default):
+    return tuple(item.strip() for item in os.getenv(name, default).split(",") if item.strip())
+
+
+class TokenBucketLimiter:
+    """
+    클라이언트별 토큰 버킷
+
+    버킷은 초당 rate개씩 최대 burst개까지 채워집니다. 클라이언트 수가 max_clients를 넘으면
+    가장 오래 사용하지 않은 버킷부터 제거합니다 (제거된 클라이언트는 가득 찬 버킷으로 다시 시작).
+    """
+
+    def __init__(self, rate=5.0, burst=20, max_clients=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()  # client -> [남은 토큰, 마지막 갱신 시각]
+
+    def acquire(self, client):
+        """
+        토큰 1개를 사용합니다.
+
+        Returns:
+            float: 0이면 허용, 0보다 크면 다음 토큰까지 기다려야 하는 시간(초)
+        """
+        now = time.monotonic()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = [float(self.burst), now]
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1.0:
+            bucket[0] -= 1.0
+            return 0.0
+        return (1.0 - bucket[0]) / self.rate
+
+
+class AdmissionMiddleware:
+    """
+    부하 제어(admission control) ASGI 미들웨어
+
+    - 가벼운 경로(/health, /api/analyze 등)는 제한 없이 바로 통과 (부하 중에도 굶지 않도록)
+    - 클라이언트별 토큰 버킷 속도 제한(rate > 0인 경우)은 limited_methods(기본: POST/PUT/PATCH/DELETE)
+      요청에만 적용 -> 429. /jobs/{id} 폴링, 세션/통계 조회 같은 GET 요청은 버킷을 쓰지 않음
+    - LLM 경로의 POST 요청은 전체 동시 처리 수 제한 -> 503 (업스트림 대기열에 쌓이지 않도록 즉시 거절)
+    - X-Request-Timeout-Ms(상대 예산) 또는 X-Request-Deadline(epoch ms) 헤더로 받은 마감 시각을
+      request_deadline 컨텍스트 변수에 저장. 이미 지난 요청은 503으로 거절하고,
+      OpenAIService는 업스트림 호출 전에 남은 예산을 확인합니다.
+
+    거절 응답에는 모두 Retry-After 헤더가 포함됩니다.
+
+    클라이언트는 소켓 주소로 구분하므로, Vercel/로드 밸런서 뒤에서는 모든 요청이 프록시 주소 하나로 묶입니다.
+    프록시 뒤에서 속도 제한을 켤 때는 trust_forwarded(ADMISSION_TRUST_FORWARDED=true)로 X-Forwarded-For를
+    사용해야 하며, 이 헤더를 프록시가 덮어쓰는 환경에서만 켜야 합니다 (직접 노출 시 클라이언트가 위조 가능).
+    버킷과 동시 처리 수는 프로세스(워커)마다 따로 집계됩니다.
+    """
+
+    def __init__(
+        self,
+        app,
+        rate=0.0,
+        burst=20,
+        limited_methods=("POST", "PUT", "PATCH", "DELETE"),
+        llm_max_in_flight=256,
+        llm_prefixes=("/api/openai",),
+        cheap_paths=("/", "/health", "/metrics", "/api/analyze"),
+        trust_forwarded=False,
+        max_clients=10000,
+        overload_retry_after=1
+    ):
+        self.app = app
+        self.limiter = TokenBucketLimiter(rate, burst, max_clients) if rate > 0 else None
+        self.limited_methods = set(limited_methods)
+        self.llm_max_in_flight = llm_max_in_flight
+        self.llm_prefixes = tuple(llm_prefixes)
+        self.cheap_paths = set(cheap_paths)
+        self.trust_forwarded = trust_forwarded
+        self.overload_retry_after = overload_retry_after
+        self.llm_in_flight = 0
+
+    @classmethod
+    def options_from_env(cls):
+        """
+        환경 변수 설정을 app.add_middleware()에 넘길 인자로 반환합니다.
+
+        - ADMISSION_RATE_PER_SEC: 클라이언트별 초당 허용 요청 수, 0이면 속도 제한 안 함 (기본값: 0)
+        - ADMISSION_BURST: 클라이언트별 순간 최대 요청 수 (기본값: 20)
+        - ADMISSION_LIMITED_METHODS: 속도 제한을 적용할 메서드 목록, 쉼표 구분 (기본값: POST,PUT,PATCH,DELETE)
+        - ADMISSION_LLM_MAX_IN_FLIGHT: LLM 경로 전체 동시 처리 수, 0이면 제한 안 함 (기본값: 256)
+        - ADMISSION_LLM_PREFIXES: LLM 경로 접두사 목록, 쉼표 구분 (기본값: /api/openai)
+        - ADMISSION_CHEAP_PATHS: 제한 없이 통과시킬 경로 목록, 쉼표 구분 (기본값: /,/health,/metrics,/api/analyze)
+        - ADMISSION_TRUST_FORWARDED: X-Forwarded-For의 첫 주소를 클라이언트로 사용,
+          프록시/로드 밸런서 뒤에서 속도 제한을 켤 때 필요 (기본값: false)
+        - ADMISSION_MAX_CLIENTS: 보관할 최대 클라이언트 버킷 수 (기본값: 10000)
+        - ADMISSION_OVERLOAD_RETRY_AFTER: 503 응답의 Retry-After(초) (기본값: 1)
+        """
+        return {
+            "rate": float(os.getenv("ADMISSION_RATE_PER_SEC", "0")),
+            "burst": int(os.getenv("ADMISSION_BURST", "20")),
+            "limited_methods": tuple(method.upper() for method in _split_env("ADMISSION_LIMITED_METHODS", "POST,PUT,PATCH,DELETE")),
+            "llm_max_in_flight": int(os.getenv("ADMISSION_LLM_MAX_IN_FLIGHT", "256")),
+            "llm_prefixes": _split_env("ADMISSION_LLM_PREFIXES", "/api/openai"),
+            "cheap_paths": _split_env("ADMISSION_CHEAP_PATHS", "/,/health,/metrics,/api/analyze"),
+            "trust_forwarded": os.getenv("ADMISSION_TRUST_FORWARDED", "false").lower() == "true",
+            "max_clients": int(os.getenv("ADMISSION_MAX_CLIENTS", "10000")),
+            "overload_retry_after": int(os.getenv("ADMISSION_OVERLOAD_RETRY_AFTER", "1"))
+        }
+
+    def _client_key(self, scope):
+        if self.trust_forwarded:
+            for name, value in scope.get("headers", ()):
+                if name == b"x-forwarded-for":
+                    return value.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    @staticmethod
+    def _deadline(scope, arrived):
+        """요청 헤더의 예산으로 마감 시각(monotonic)을 계산합니다. 헤더가 없거나 잘못되면 None"""
+        for name, value in scope.get("headers", ()):
+            try:
+                if name == b"x-request-timeout-ms":
+                    return arrived + float(value) / 1000
+                if name == b"x-request-deadline":
+                    return arrived + float(value) / 1000 - time.time()
+            except ValueError:
+                return None
+        return None
+
+    @staticmethod
+    async def _reject(send, status, reason, retry_after):
+        ADMISSION_REJECTIONS.inc((reason,))
+        body = json.dumps({"detail": reason}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or scope["path"] in self.cheap_paths:
+            await self.app(scope, receive, send)
+            return
+
+        arrived = time.monotonic()
+        if self.limiter is not None and scope["method"] in self.limited_methods:
+            wait = self.limiter.acquire(self._client_key(scope))
+            if wait > 0:
+                await self._reject(send, 429, "rate_limited", max(1, math.ceil(wait)))
+                return
+
+        deadline = self._deadline(scope, arrived)
+        if deadline is not None and deadline <= arrived:
+            # 클라이언트가 이미 포기한 요청
+            await self._reject(send, 503, "deadline_expired", self.overload_retry_after)
+            return
+
+        is_llm = scope["method"] == "POST" and scope["path"].startswith(self.llm_prefixes)
+        if is_llm and self.llm_max_in_flight > 0 and self.llm_in_flight >= self.llm_max_in_flight:
+            await self._reject(send, 503, "overloaded", self.overload_retry_after)
+            return
+
+        token = request_deadline.set(deadline)
+        if is_llm:
+            self.llm_in_flight += 1
+            LLM_IN_FLIGHT.set(value=self.llm_in_flight)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if is_llm:
+                self.llm_in_flight -= 1
+                LLM_IN_FLIGHT.set(value=self.llm_in_flight)
+            request_deadline.reset(token)
@@ -0,0 +1,77 @@
+import os
+import hmac
+import json
+import time
+import base64
+import hashlib
+
+
+def _b64decode(segment):
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def verify_jwt(token, secret, leeway=30):
+    """
+    HS256 JWT(Node 인증 서버의 access token, Supabase JWT)의 서명과 만료 시각을 확인합니다.
+
+    Args:
+        token: "헤더.페이로드.서명" 형식의 토큰
+        secret: 서명 키 (JWT_SECRET)
+        leeway: 서버 간 시계 차이 허용 범위(초)
+
+    Returns:
+        dict: 토큰 클레임
+
+    Raises:
+        ValueError: 형식이 잘못되었거나 서명이 맞지 않거나 만료된 토큰
+    """
+    try:
+        header_segment, payload_segment, signature_segment = token.split(".")
+        header = json.loads(_b64decode(header_segment))
+        claims = json.loads(_b64decode(payload_segment))
+        signature = _b64decode(signature_segment)
+    except (ValueError, TypeError):
+        raise ValueError("잘못된 토큰 형식입니다")
+    if not isinstance(header, dict) or not isinstance(claims, dict) or header.get("alg") != "HS256":
+        raise ValueError("지원하지 않는 토큰입니다")
+
+    expected = hmac.new(secret.encode(), f"{header_segment}.{payload_segment}".encode(), hashlib.sha256).digest()
+    if not hmac.compare_digest(expected, signature):
+        raise ValueError("토큰 서명이 올바르지 않습니다")
+
+    now = time.time()
+    if "exp" in claims and now > float(claims["exp"]) + leeway:
+        raise ValueError("토큰이 만료되었습니다")
+    if "nbf" in claims and now < float(claims["nbf"]) - leeway:
+        raise ValueError("아직 사용할 수 없는 토큰입니다")
+    return claims
+
+
+def authenticated_user_id(authorization):
+    """
+    Authorization: Bearer 헤더의 JWT를 확인하고 사용자 ID(id 또는 sub 클레임)를 반환합니다.
+
+    - JWT_SECRET: 토큰 서명 키 (Node 인증 서버와 같은 값, 없으면 토큰 인증을 사용하지 않음)
+
+    Raises:
+        ValueError: 헤더가 없거나 토큰이 유효하지 않은 경우
+    """
+    secret = os.getenv("JWT_SECRET")
+    scheme, _, token = (authorization or "").partition(" ")
+    if not secret or scheme.lower() != "bearer" or not token.strip():
+        raise ValueError("인증 토큰이 필요합니다")
+    claims = verify_jwt(token.strip(), secret)
+    user_id = claims.get("id") or claims.get("sub")
+    if not user_id:
+        raise ValueError("토큰에 사용자 ID가 없습니다")
+    return str(user_id)
+
+
+def check_service_token(provided):
+    """
+    X-Service-Token 헤더가 SERVICE_TOKEN과 같은지 상수 시간으로 비교합니다.
+
+    - SERVICE_TOKEN: 사용자 대신 조회하는 내부 서비스용 토큰 (없으면 서비스 인증을 사용하지 않음)
+    """
+    expected = os.getenv("SERVICE_TOKEN")
+    return bool(expected) and provided is not None and hmac.compare_digest(expected.encode(), provided.encode())
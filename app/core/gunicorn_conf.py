@@ -0,0 +1,96 @@
+"""
+운영 모드 gunicorn 설정
+
+    gunicorn -c python:app.core.gunicorn_conf app.main:app
+    APP_ENV=production python -m app.main
+
+- 워커 수는 프로세스가 사용할 수 있는 CPU 코어 수 (WEB_CONCURRENCY로 변경)
+- preload_app: 마스터에서 앱을 임포트하고 warmup()으로 감정 사전/모델 가중치를 로드한 뒤 fork하여
+  읽기 전용 상태를 워커들이 copy-on-write로 공유 (gc.freeze()로 GC가 공유 페이지를 건드리지 않도록 함)
+- max_requests(+jitter): 워커가 N개 요청을 처리하면 처리 중인 요청을 마친 뒤 교체 (메모리 증가 방지,
+  종료 시 저장 대기 중인 감정 분석 결과도 저장)
+- 응답 캐시 디스크 계층의 기본 경로를 /dev/shm(tmpfs)으로 두어 워커 간 공유 메모리 캐시로 사용하고,
+  워커별 메모리 계층은 작은 핫 캐시로 줄임
+- 메트릭은 워커별로 쌓이므로 METRICS_MULTIPROC_DIR(기본값: /dev/shm/illusion-note/metrics)에 워커별 파일로
+  기록하고, /metrics는 어느 워커가 응답하든 모든 워커의 값을 합쳐 출력 (종료된 워커의 카운터도 유지)
+
+부하 제어(ADMISSION_*) 한도는 워커별로 적용됩니다. 클라이언트별 속도 제한 버킷과
+LLM 경로 동시 처리 수(ADMISSION_LLM_MAX_IN_FLIGHT)는 워커마다 따로 있으므로, 서버 전체 한도는
+워커 수 × 설정값이고 같은 클라이언트도 연결된 워커에 따라 최대 워커 수 × ADMISSION_RATE_PER_SEC까지 허용됩니다.
+"""
+import gc
+import os
+import random
+import tempfile
+
+from dotenv import load_dotenv
+
+from app.core.log_config import setup_logging, shutdown_logging
+from app.core.metrics import MultiprocessMetrics
+
+
+def _available_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# .env 값이 아래 기본값보다 우선하도록 먼저 로드
+try:
+    load_dotenv()
+except Exception:
+    pass
+
+# 워커별 캐시를 나누지 않도록 앱 임포트(preload) 전에 공유 캐시 기본값 설정
+if os.path.isdir("/dev/shm"):
+    os.environ.setdefault("OPENAI_CACHE_PATH", "/dev/shm/illusion-note/response_cache.db")
+os.environ.setdefault("OPENAI_CACHE_SIZE", "128")
+# 워커별 메트릭을 합쳐 출력하기 위한 공유 디렉터리
+os.environ.setdefault(
+    "METRICS_MULTIPROC_DIR",
+    "/dev/shm/illusion-note/metrics" if os.path.isdir("/dev/shm") else os.path.join(tempfile.gettempdir(), "illusion-note-metrics")
+)
+# gunicorn 로그 형식(%(process)d)에 필요
+os.environ["LOG_PROCESS_INFO"] = "true"
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "0")) or _available_cores()
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", str(max_requests // 10)))
+# 워커 종료 시 처리 중인 요청과 저장 큐(최대 30초)를 마칠 시간
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "35"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+accesslog = None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    # preload로 앱이 임포트된 뒤, 워커 fork 전에 실행
+    from app.main import warmup
+
+    # 이전 실행의 워커 메트릭 파일 정리
+    MultiprocessMetrics.reset(os.environ["METRICS_MULTIPROC_DIR"])
+    warmup()
+    # 로그 출력 스레드는 fork 후 자식에 복제되지 않으므로 마스터의 큐 리스너는 정리
+    shutdown_logging()
+    # 지금까지 만든 객체를 GC 대상에서 제외하여 워커에서 공유 페이지가 복사되지 않도록 함
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    setup_logging()
+    # 워커마다 다른 재시도 지터를 사용하도록 난수 상태 재설정
+    random.seed()
+
+
+def child_exit(server, worker):
+    # 종료된 워커의 카운터/히스토그램을 누적 파일에 합쳐 /metrics 합계가 줄지 않도록 함
+    MultiprocessMetrics.mark_process_dead(os.environ["METRICS_MULTIPROC_DIR"], worker.pid)
@@ -0,0 +1,148 @@
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import random
+import hashlib
+import logging
+from logging.handlers import QueueHandler, QueueListener
+
+# LogRecord 기본 속성 (이 외의 속성은 extra 필드로 출력)
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "sampled"}
+
+_listener = None
+_queue_handler = None
+_preview_chars = 0
+
+
+class JsonLineFormatter(logging.Formatter):
+    """로그 레코드를 한 줄짜리 JSON으로 변환합니다. 큐 리스너 스레드에서 실행됩니다."""
+
+    def format(self, record):
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class SuccessSamplingFilter(logging.Filter):
+    """
+    성공 경로 로그 샘플링 필터
+
+    extra={"sampled": True}로 표시된 레코드는 sample_rate 비율로만 통과시킵니다.
+    경고 이상 레벨과 표시되지 않은 레코드는 항상 통과합니다.
+    """
+
+    def __init__(self, sample_rate):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record):
+        if getattr(record, "sampled", False) and record.levelno < logging.WARNING:
+            return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+        return True
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """
+    호출 스레드(이벤트 루프)에서는 메시지 문자열만 확정하고 큐에 넣는 핸들러
+
+    JSON 직렬화와 출력 I/O는 모두 QueueListener 스레드에서 처리됩니다.
+    큐(락이 없는 SimpleQueue)가 max_size를 넘으면 이벤트 루프를 블로킹하지 않고 레코드를 버립니다.
+    """
+
+    def __init__(self, log_queue, max_size):
+        super().__init__(log_queue)
+        self.max_size = max_size
+        self.dropped = 0
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        if self.queue.qsize() >= self.max_size:
+            self.dropped += 1
+            return
+        self.queue.put_nowait(record)
+
+
+def setup_logging():
+    """
+    애플리케이션 로깅을 설정합니다. 여러 번 호출해도 한 번만 적용됩니다.
+
+    - LOG_LEVEL: 로그 레벨 (기본값: INFO)
+    - LOG_SUCCESS_SAMPLE_RATE: 성공 경로 로그 샘플링 비율 0~1 (기본값: 1.0)
+    - LOG_QUEUE_SIZE: 로그 큐 최대 크기 (기본값: 10000)
+    - LOG_TEXT_PREVIEW_CHARS: 마스킹된 일기 본문과 함께 남길 앞부분 글자 수 (기본값: 0)
+    - LOG_PROCESS_INFO: 레코드에 프로세스 ID 수집, gunicorn 로그 형식에 필요 (기본값: false)
+    """
+    global _listener, _queue_handler, _preview_chars
+    if _listener is not None:
+        return
+
+    _preview_chars = int(os.getenv("LOG_TEXT_PREVIEW_CHARS", "0"))
+
+    # 출력하지 않는 호출 위치/프로세스/스레드 정보 수집 생략 (레코드 생성 비용 절감)
+    logging._srcfile = None
+    logging.logThreads = False
+    logging.logProcesses = os.getenv("LOG_PROCESS_INFO", "false").lower() == "true"
+    logging.logMultiprocessing = False
+
+    log_queue = queue.SimpleQueue()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonLineFormatter())
+
+    _queue_handler = _NonBlockingQueueHandler(log_queue, int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+    _queue_handler.addFilter(SuccessSamplingFilter(float(os.getenv("LOG_SUCCESS_SAMPLE_RATE", "1.0"))))
+
+    logger = logging.getLogger("app")
+    logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    logger.addHandler(_queue_handler)
+    logger.propagate = False
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """큐에 남은 로그를 모두 출력하고 리스너 스레드를 종료합니다."""
+    global _listener, _queue_handler
+    if _listener is not None:
+        logging.getLogger("app").removeHandler(_queue_handler)
+        _listener.stop()
+        _listener = None
+        _queue_handler = None
+
+
+def redact_text(text):
+    """
+    일기 본문을 로그에 남기지 않도록 길이와 해시로 대체합니다.
+
+    LOG_TEXT_PREVIEW_CHARS가 0보다 크면 앞부분 일부만 함께 남깁니다.
+    """
+    if not text:
+        return ""
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=6).hexdigest()
+    redacted = f"<{len(text)}자 #{digest}>"
+    if _preview_chars > 0:
+        redacted = text[:_preview_chars] + ("…" if len(text) > _preview_chars else "") + " " + redacted
+    return redacted
+
+
+def elapsed_ms(start):
+    """time.perf_counter() 기준 경과 시간(ms)"""
+    return round((time.perf_counter() - start) * 1000, 2)
@@ -0,0 +1,577 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import contextvars
+from bisect import bisect_left
+
+logger = logging.getLogger(__name__)
+
+# 기본 지연 시간 버킷 (초)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 요청 본문에서 오는 라벨 값은 허용된 값만 사용 (임의 입력으로 시계열이 무한히 늘지 않도록)
+_ALLOWED_LABELS = {
+    "mode": {"chat", "analyze", "summarize"},
+    "mood_id": {"happy", "neutral", "sad", "tired", "angry"},
+    "response_type": {"comfort", "fact", "advice"}
+}
+JOURNAL_LABELS = ("mode", "mood_id", "response_type")
+
+
+def journal_labels(mode, mood_id, response_type):
+    """
+    일기 요청의 (mode, mood_id, response_type) 라벨 튜플을 만듭니다.
+
+    허용되지 않은 값은 'other'로 대체합니다.
+    """
+    return (
+        mode if mode in _ALLOWED_LABELS["mode"] else "other",
+        mood_id if mood_id in _ALLOWED_LABELS["mood_id"] else "other",
+        response_type if response_type in _ALLOWED_LABELS["response_type"] else "other"
+    )
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    """
+    라벨 값 튜플별로 값을 보관하는 메트릭 기본 클래스
+
+    기록은 이벤트 루프에서만 일어나므로 락을 사용하지 않습니다 (기록 1건당 딕셔너리 조회 1회).
+    """
+
+    kind = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def clear(self):
+        self._values.clear()
+
+    def snapshot(self):
+        """기록된 값을 JSON으로 저장할 수 있는 [[라벨 값 목록, 값], ...] 형태로 반환합니다."""
+        return [[list(labels), value] for labels, value in self._values.items()]
+
+    @staticmethod
+    def _add(current, value):
+        return value if current is None else current + value
+
+    def _merged(self, others, worker=None):
+        """
+        다른 워커의 값을 현재 프로세스 값과 합칩니다.
+
+        Args:
+            others: [(워커 ID, snapshot()), ...]
+            worker: 현재 프로세스의 워커 ID (워커별 게이지의 worker 라벨)
+        """
+        if not others:
+            return self._values
+        merged = dict(self._values)
+        for _, values in others:
+            for labels, value in values:
+                key = tuple(labels)
+                merged[key] = self._add(merged.get(key), value)
+        return merged
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, labels=(), amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels=()):
+        return self._values.get(labels, 0)
+
+    def render(self, others=(), worker=None):
+        lines = self._header()
+        for labels, value in self._merged(others, worker).items():
+            lines.append(f"{self.name}_total{_format_labels(self.labelnames, labels)} {_format_number(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """
+    게이지
+
+    여러 워커의 값을 합칠 때 기본은 합계(진행 중인 요청 수, 큐 길이 등)이고,
+    per_worker=True이면 워커별 시계열(worker 라벨)로 출력합니다 (EWMA, 서킷 상태처럼 합계가 의미 없는 값).
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), per_worker=False):
+        super().__init__(name, documentation, labelnames)
+        self.per_worker = per_worker
+
+    def inc(self, labels=(), amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, labels=(), amount=1):
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, labels=(), value=0):
+        self._values[labels] = value
+
+    def value(self, labels=()):
+        return self._values.get(labels, 0)
+
+    def _merged(self, others, worker=None):
+        if not self.per_worker or worker is None:
+            return super()._merged(others, worker)
+        merged = {tuple(labels) + (str(worker),): value for labels, value in self._values.items()}
+        for other, values in others:
+            for labels, value in values:
+                merged[tuple(labels) + (str(other),)] = value
+        return merged
+
+    def render(self, others=(), worker=None):
+        lines = self._header()
+        labelnames = self.labelnames + ("worker",) if self.per_worker and worker is not None else self.labelnames
+        for labels, value in self._merged(others, worker).items():
+            lines.append(f"{self.name}{_format_labels(labelnames, labels)} {_format_number(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """
+    누적 버킷 히스토그램
+
+    기록 시에는 해당 버킷 하나만 증가시키고, 누적 합은 /metrics 출력 시 계산합니다.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, labels, value):
+        state = self._values.get(labels)
+        if state is None:
+            # [버킷별 개수..., +Inf 개수, 합계]
+            state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def count(self, labels=()):
+        state = self._values.get(labels)
+        return sum(state[:-1]) if state else 0
+
+    @staticmethod
+    def _add(current, value):
+        return list(value) if current is None else [a + b for a, b in zip(current, value)]
+
+    def render(self, others=(), worker=None):
+        lines = self._header()
+        bounds = self.buckets + (float("inf"),)
+        for labels, state in self._merged(others, worker).items():
+            cumulative = 0
+            for bound, count in zip(bounds, state):
+                cumulative += count
+                le = 'le="' + _format_number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {repr(state[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """메트릭 목록을 보관하고 Prometheus 텍스트 형식으로 출력합니다."""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self, others=(), worker=None):
+        """
+        Args:
+            others: 합칠 다른 워커의 값 [(워커 ID, snapshot()), ...] (MultiprocessMetrics)
+            worker: 현재 프로세스의 워커 ID (지정하면 워커별 게이지에 worker 라벨 추가)
+        """
+        lines = []
+        for metric in self._metrics:
+            values = [(other, snapshot.get(metric.name, ())) for other, snapshot in others]
+            lines.extend(metric.render(values, worker))
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        for metric in self._metrics:
+            metric.clear()
+
+    def snapshot(self):
+        """메트릭 이름별 snapshot() (다른 프로세스에 전달하기 위한 JSON 형태)"""
+        return {metric.name: metric.snapshot() for metric in self._metrics}
+
+
+class MultiprocessMetrics:
+    """
+    gunicorn 워커 간 메트릭 집계 (METRICS_MULTIPROC_DIR가 설정된 경우)
+
+    워커마다 메트릭이 따로 쌓이므로, 각 워커가 interval초마다 현재 값을 <디렉터리>/<pid>.json에 기록하고
+    /metrics를 처리하는 워커가 모든 워커의 파일을 합쳐 출력합니다 (다른 워커 값은 최대 interval초 지연).
+
+    - 카운터/히스토그램은 합계, 게이지는 합계 또는 워커별 시계열 (Gauge per_worker)
+    - 종료된 워커(max_requests 교체 등)의 카운터/히스토그램은 gunicorn 마스터가 dead.json에 누적하여
+      전체 합계가 줄지 않도록 하고, 게이지는 버립니다 (mark_process_dead)
+    """
+
+    DEAD_FILE = "dead.json"
+
+    def __init__(self, registry, directory, interval=1.0):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self._task = None
+
+    @property
+    def pid(self):
+        # preload 시 마스터에서 생성되므로 fork 후 워커의 pid를 사용
+        return os.getpid()
+
+    @classmethod
+    def from_env(cls, registry):
+        """
+        환경 변수 설정으로 생성합니다. METRICS_MULTIPROC_DIR가 없으면 None을 반환합니다.
+
+        - METRICS_MULTIPROC_DIR: 워커별 메트릭 파일 디렉터리 (운영 모드 기본값: /dev/shm/illusion-note/metrics)
+        - METRICS_SNAPSHOT_INTERVAL: 워커가 메트릭 파일을 갱신하는 간격(초) (기본값: 1)
+        """
+        directory = os.getenv("METRICS_MULTIPROC_DIR")
+        if not directory:
+            return None
+        return cls(registry, directory, interval=float(os.getenv("METRICS_SNAPSHOT_INTERVAL", "1")))
+
+    @staticmethod
+    def _write_json(path, data):
+        # 읽는 쪽이 쓰는 중인 파일을 보지 않도록 임시 파일에 쓴 뒤 교체
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temporary, path)
+
+    @staticmethod
+    def _read_json(path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, snapshot):
+        os.makedirs(self.directory, exist_ok=True)
+        self._write_json(os.path.join(self.directory, f"{self.pid}.json"), snapshot)
+
+    def _read_others(self):
+        others = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return others
+        for name in names:
+            if not name.endswith(".json") or name == f"{self.pid}.json":
+                continue
+            snapshot = self._read_json(os.path.join(self.directory, name))
+            if snapshot is not None:
+                others.append((name[:-len(".json")], snapshot))
+        return others
+
+    async def render(self):
+        """현재 프로세스 값을 기록한 뒤 모든 워커의 값을 합쳐 Prometheus 텍스트로 반환합니다."""
+        snapshot = self.registry.snapshot()
+        others = await asyncio.to_thread(self._sync, snapshot)
+        return self.registry.render(others, worker=self.pid)
+
+    def _sync(self, snapshot):
+        self._write(snapshot)
+        return self._read_others()
+
+    def start(self):
+        """주기적으로 메트릭 파일을 갱신하는 작업을 시작합니다. 이미 시작되었으면 아무 작업도 하지 않습니다."""
+        if self._task is None:
+            # 시작한 요청의 컨텍스트를 물려받지 않도록 빈 컨텍스트에서 생성
+            self._task = contextvars.Context().run(asyncio.ensure_future, self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.to_thread(self._write, self.registry.snapshot())
+            except OSError as e:
+                logger.warning(f"메트릭 파일 기록 실패: {e}", extra={"directory": self.directory})
+            await asyncio.sleep(self.interval)
+
+    async def close(self):
+        """갱신 작업을 멈추고 마지막 값을 기록합니다 (종료 후 마스터가 dead.json에 합침)."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            self._write(self.registry.snapshot())
+        except OSError as e:
+            logger.warning(f"메트릭 파일 기록 실패: {e}", extra={"directory": self.directory})
+
+    @classmethod
+    def mark_process_dead(cls, directory, pid):
+        """
+        종료된 워커의 카운터/히스토그램을 dead.json에 누적하고 워커 파일을 삭제합니다 (gunicorn 마스터에서 호출).
+        """
+        path = os.path.join(directory, f"{pid}.json")
+        snapshot = cls._read_json(path)
+        if snapshot is not None:
+            dead_path = os.path.join(directory, cls.DEAD_FILE)
+            dead = cls._read_json(dead_path) or {}
+            for metric in REGISTRY._metrics:
+                if metric.kind == "gauge" or metric.name not in snapshot:
+                    continue
+                merged = {tuple(labels): value for labels, value in dead.get(metric.name, ())}
+                for labels, value in snapshot[metric.name]:
+                    key = tuple(labels)
+                    merged[key] = metric._add(merged.get(key), value)
+                dead[metric.name] = [[list(labels), value] for labels, value in merged.items()]
+            cls._write_json(dead_path, dead)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def reset(directory):
+        """이전 실행의 메트릭 파일을 삭제합니다 (gunicorn 마스터 시작 시 호출)."""
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if name.endswith((".json", ".tmp")):
+                os.remove(os.path.join(directory, name))
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route, including response serialization.",
+    ("route", "method", "status") + JOURNAL_LABELS
+))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being processed.",
+    ("route",)
+))
+STAGE_DURATION = REGISTRY.register(Histogram(
+    "openai_stage_duration_seconds",
+    "Latency of each /api/openai stage (prompt_build, upstream, parse, serialize).",
+    ("stage",) + JOURNAL_LABELS
+))
+UPSTREAM_IN_FLIGHT = REGISTRY.register(Gauge(
+    "openai_upstream_in_flight",
+    "OpenAI API calls currently in flight.",
+    JOURNAL_LABELS
+))
+UPSTREAM_TOKENS = REGISTRY.register(Counter(
+    "openai_upstream_tokens",
+    "Tokens reported by the OpenAI API usage field.",
+    ("kind",) + JOURNAL_LABELS
+))
+PARSE_FALLBACKS = REGISTRY.register(Counter(
+    "openai_parse_fallbacks",
+    "Responses converted with _generate_structured_response because they were not valid JSON.",
+    ("reason",) + JOURNAL_LABELS
+))
+UPSTREAM_RETRIES = REGISTRY.register(Counter(
+    "openai_upstream_retries",
+    "Upstream attempts retried after backoff, by failure reason.",
+    ("reason",)
+))
+UPSTREAM_RETRY_DELAY = REGISTRY.register(Histogram(
+    "openai_upstream_retry_delay_seconds",
+    "Backoff delay before each retry (honors Retry-After headers).",
+    ("reason",)
+))
+UPSTREAM_FAILURES = REGISTRY.register(Counter(
+    "openai_upstream_failures",
+    "Upstream calls that failed after all retries, by failure reason.",
+    ("reason",)
+))
+CIRCUIT_STATE = REGISTRY.register(Gauge(
+    "openai_circuit_state",
+    "Upstream circuit breaker state (0=closed, 1=half_open, 2=open).",
+    per_worker=True
+))
+CIRCUIT_TRANSITIONS = REGISTRY.register(Counter(
+    "openai_circuit_transitions",
+    "Upstream circuit breaker state transitions, by new state.",
+    ("state",)
+))
+CIRCUIT_REJECTIONS = REGISTRY.register(Counter(
+    "openai_circuit_rejections",
+    "Upstream calls rejected without an attempt while the circuit was open."
+))
+HEDGE_REQUESTS = REGISTRY.register(Counter(
+    "openai_hedge_requests",
+    "Hedged upstream requests (launched, hedge_won, primary_won).",
+    ("outcome",)
+))
+HEDGE_DELAY = REGISTRY.register(Gauge(
+    "openai_hedge_delay_seconds",
+    "Current hedge delay derived from the recent upstream latency quantile.",
+    per_worker=True
+))
+UPSTREAM_TARGET_REQUESTS = REGISTRY.register(Counter(
+    "openai_upstream_target_requests",
+    "Upstream attempts per pool target (OPENAI_UPSTREAMS), by outcome (success, error).",
+    ("target", "outcome")
+))
+UPSTREAM_TARGET_IN_FLIGHT = REGISTRY.register(Gauge(
+    "openai_upstream_target_in_flight",
+    "Upstream calls currently in flight per pool target.",
+    ("target",)
+))
+UPSTREAM_TARGET_LATENCY = REGISTRY.register(Gauge(
+    "openai_upstream_target_latency_ewma_seconds",
+    "EWMA of upstream latency per pool target, used for routing.",
+    ("target",),
+    per_worker=True
+))
+ROUTE_DECISIONS = REGISTRY.register(Counter(
+    "route_decisions",
+    "HybridRouter decisions (local, empty, llm_disabled, llm_mode, llm_context, llm_negated, llm_mixed, llm_low_confidence, llm_mood_mismatch).",
+    ("decision",)
+))
+FALLBACK_RESPONSES = REGISTRY.register(Counter(
+    "openai_fallback_responses",
+    "Template responses served instead of the upstream, by reason.",
+    ("reason",)
+))
+ADMISSION_REJECTIONS = REGISTRY.register(Counter(
+    "admission_rejections",
+    "Requests shed by admission control (rate_limited, overloaded, deadline_expired, deadline_exceeded).",
+    ("reason",)
+))
+LLM_IN_FLIGHT = REGISTRY.register(Gauge(
+    "admission_llm_in_flight",
+    "LLM route requests currently admitted."
+))
+STORAGE_ROWS = REGISTRY.register(Counter(
+    "emotion_storage_rows",
+    "emotion_analysis rows handled by the write-behind queue (written, dropped, failed, rejected).",
+    ("outcome",)
+))
+STORAGE_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "emotion_storage_queue_depth",
+    "Rows waiting in the write-behind queue."
+))
+STORAGE_FLUSH_DURATION = REGISTRY.register(Histogram(
+    "emotion_storage_flush_duration_seconds",
+    "Latency of one multi-row emotion_analysis insert."
+))
+
+# ASGI scope["state"]에 엔드포인트 정보를 남기는 키
+_STATE_KEY = "metrics"
+
+
+def observe_stage(stage, labels, start):
+    """time.perf_counter() 기준 start부터의 경과 시간을 단계별 히스토그램에 기록합니다."""
+    STAGE_DURATION.observe((stage,) + labels, time.perf_counter() - start)
+
+
+def record_usage(usage, labels):
+    """OpenAI 응답의 usage(prompt_tokens, completion_tokens)를 토큰 카운터에 더합니다."""
+    if usage is None:
+        return
+    UPSTREAM_TOKENS.inc(("prompt",) + labels, usage.prompt_tokens or 0)
+    UPSTREAM_TOKENS.inc(("completion",) + labels, usage.completion_tokens or 0)
+
+
+def mark_endpoint_done(request, labels, serialize=True):
+    """
+    엔드포인트 처리가 끝난 시점과 라벨을 요청 상태에 남깁니다.
+
+    MetricsMiddleware가 라우트 지연 시간에 라벨을 붙이고, serialize가 True이면
+    이 시점부터 응답 시작까지를 serialize 단계로 기록합니다 (스트리밍 응답은 제외).
+    """
+    request.scope.setdefault("state", {})[_STATE_KEY] = (labels, time.perf_counter() if serialize else None)
+
+
+class MetricsMiddleware:
+    """
+    라우트별 지연 시간과 처리 중인 요청 수를 기록하는 ASGI 미들웨어
+
+    BaseHTTPMiddleware와 달리 요청/응답 본문을 감싸지 않으므로 요청당 비용은 수 마이크로초입니다.
+    라우트 라벨은 매칭된 라우트의 경로 템플릿을 사용하고, 매칭되지 않은 경로는 'other'로 묶습니다.
+    """
+
+    EMPTY_LABELS = ("", "", "")
+    MAX_ROUTE_CACHE = 1024
+
+    def __init__(self, app, excluded_paths=("/metrics",)):
+        self.app = app
+        self.excluded_paths = set(excluded_paths)
+        # 요청 경로 -> 라우트 경로 템플릿 (라우팅 전에 처리 중 요청 수를 기록하기 위해 사용)
+        self._route_cache = {}
+
+    def _matched_route(self, scope):
+        route = scope.get("route")
+        template = getattr(route, "path_format", None) or getattr(route, "path", None)
+        if template is None:
+            return "other"
+        if len(self._route_cache) < self.MAX_ROUTE_CACHE:
+            self._route_cache[scope["path"]] = template
+        return template
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        in_flight_route = (self._route_cache.get(scope["path"], "other"),)
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                marker = scope.get("state", {}).get(_STATE_KEY)
+                if marker is not None and marker[1] is not None:
+                    observe_stage("serialize", marker[0], marker[1])
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(in_flight_route)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec(in_flight_route)
+            marker = scope.get("state", {}).get(_STATE_KEY)
+            labels = marker[0] if marker is not None else self.EMPTY_LABELS
+            HTTP_REQUEST_DURATION.observe(
+                (self._matched_route(scope), scope["method"], str(status[0])) + labels,
+                time.perf_counter() - start
+            )
@@ -0,0 +1,288 @@
+import os
+import sys
+import hmac
+import json
+import time
+import uuid
+import asyncio
+import logging
+import tempfile
+import threading
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile-token"
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_ROOT):
+        filename = os.path.relpath(filename, _ROOT)
+    else:
+        # site-packages 등은 패키지 경로만 남김 (예: fastapi/routing.py)
+        filename = "/".join(filename.replace("\\", "/").split("/")[-2:])
+    # collapsed 형식에서 ';'는 프레임 구분자이므로 이름에 들어가지 않도록 치환
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({filename}:{frame.f_lineno})".replace(";", ",")
+
+
+def _await_chain(coro):
+    """태스크의 코루틴이 대기 중인 지점까지의 프레임 목록 (바깥 -> 안쪽)과 대기 대상을 반환합니다."""
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is not None:
+            frames.append(frame)
+        awaited = getattr(coro, "cr_await", None)
+        if awaited is None:
+            awaited = getattr(coro, "ag_await", None)
+        if awaited is None or not (hasattr(awaited, "cr_frame") or hasattr(awaited, "ag_frame")):
+            return frames, awaited
+        coro = awaited
+    return frames, None
+
+
+class RequestSampler:
+    """
+    요청 하나의 벽시계(wall-clock) 샘플링 프로파일러
+
+    별도 스레드가 interval초마다 이벤트 루프 스레드를 확인합니다.
+
+    - 요청 태스크가 실행 중이면 루프 스레드의 실제 호출 스택 (태스크 코루틴 아래 부분만)
+    - 요청 태스크가 대기 중이면 코루틴 await 체인 + "[await 대상 타입]" (업스트림 응답 대기 등)
+
+    스택은 collapsed 형식("바깥;...;안쪽 횟수", flamegraph.pl/speedscope 입력)으로 집계합니다.
+    threadpool에서 실행되는 동기 코드는 요청 태스크의 대기 시간으로 집계됩니다.
+    """
+
+    def __init__(self, interval=0.005, max_seconds=60.0):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._task = asyncio.current_task()
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name="request-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            try:
+                stack = self._sample()
+            except Exception:
+                # 샘플링 중 프레임이 바뀐 경우 등은 건너뜀
+                continue
+            if stack:
+                self.stacks[";".join(stack)] += 1
+                self.samples += 1
+
+    def _sample(self):
+        task = self._task
+        root = task.get_coro()
+        if asyncio.current_task(self._loop) is task:
+            frame = sys._current_frames().get(self._thread_id)
+            root_frame = getattr(root, "cr_frame", None)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                if frame is root_frame:
+                    break
+                frame = frame.f_back
+            stack.reverse()
+            return stack
+
+        frames, awaited = _await_chain(root)
+        stack = [_frame_label(frame) for frame in frames]
+        stack.append(f"[await {type(awaited).__name__}]")
+        return stack
+
+    def collapsed(self):
+        """collapsed 형식 문자열"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """
+    프로파일 파일 저장소 (디렉터리, 워커 프로세스 간 공유)
+
+    프로파일마다 collapsed 스택 파일(<id>.collapsed)과 메타데이터(<id>.json)를 저장하고,
+    max_files개를 넘으면 오래된 프로파일부터 삭제합니다.
+    """
+
+    def __init__(self, directory, max_files=100):
+        self.directory = directory
+        self.max_files = max_files
+
+    @classmethod
+    def from_env(cls):
+        """
+        - PROFILING_DIR: 프로파일 저장 디렉터리 (기본값: 임시 디렉터리/illusion-note-profiles)
+        - PROFILING_MAX_FILES: 보관할 최대 프로파일 수 (기본값: 100)
+        """
+        return cls(
+            os.getenv("PROFILING_DIR") or os.path.join(tempfile.gettempdir(), "illusion-note-profiles"),
+            max_files=int(os.getenv("PROFILING_MAX_FILES", "100"))
+        )
+
+    def save(self, profile_id, collapsed, meta):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, f"{profile_id}.collapsed"), "w", encoding="utf-8") as f:
+            f.write(collapsed)
+        # 메타데이터를 마지막에 기록 (목록에는 메타데이터가 있는 프로파일만 표시)
+        with open(os.path.join(self.directory, f"{profile_id}.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        self._trim()
+
+    def _trim(self):
+        entries = self._meta_files()
+        for name in entries[self.max_files:]:
+            profile_id = name[:-len(".json")]
+            for suffix in (".json", ".collapsed"):
+                try:
+                    os.remove(os.path.join(self.directory, profile_id + suffix))
+                except FileNotFoundError:
+                    pass
+
+    def _meta_files(self):
+        """메타데이터 파일 이름 목록 (최신순, 프로파일 ID가 시각으로 시작)"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted((name for name in names if name.endswith(".json")), reverse=True)
+
+    def index(self, limit=50):
+        """최근 프로파일의 메타데이터 목록 (최신순)"""
+        profiles = []
+        for name in self._meta_files()[:limit]:
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return profiles
+
+    def load(self, profile_id):
+        """
+        collapsed 스택 문자열을 반환합니다. 없으면 None을 반환합니다.
+
+        Raises:
+            ValueError: 잘못된 프로파일 ID
+        """
+        if not profile_id.replace("-", "").isalnum():
+            raise ValueError(f"잘못된 프로파일 ID입니다: {profile_id}")
+        try:
+            with open(os.path.join(self.directory, f"{profile_id}.collapsed"), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+
+def check_token(expected, provided):
+    """프로파일링 토큰을 상수 시간으로 비교합니다."""
+    return bool(expected) and provided is not None and hmac.compare_digest(expected.encode(), provided.encode())
+
+
+class ProfilingMiddleware:
+    """
+    요청 단위 프로파일링 ASGI 미들웨어 (PROFILING_TOKEN이 설정된 경우에만 등록)
+
+    X-Profile-Token 헤더가 PROFILING_TOKEN과 일치하는 요청만 RequestSampler로 샘플링하고,
+    응답에 X-Profile-Id 헤더를 붙인 뒤 응답이 끝나면 ProfileStore에 저장합니다.
+    저장된 프로파일은 /debug/profiles 에서 조회합니다 (같은 헤더로 인증).
+    """
+
+    def __init__(self, app, token, store, interval=0.005, max_seconds=60.0, max_concurrent=2, excluded_prefixes=("/debug/profiles",)):
+        self.app = app
+        self.token = token
+        self.store = store
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.max_concurrent = max_concurrent
+        self.excluded_prefixes = tuple(excluded_prefixes)
+        self.active = 0
+
+    @classmethod
+    def options_from_env(cls):
+        """
+        환경 변수 설정을 app.add_middleware()에 넘길 인자로 반환합니다.
+
+        - PROFILING_TOKEN: 프로파일링을 요청할 때 X-Profile-Token 헤더로 보낼 토큰 (없으면 미들웨어 미등록)
+        - PROFILING_INTERVAL_MS: 샘플링 간격(ms) (기본값: 5)
+        - PROFILING_MAX_SECONDS: 요청 하나의 최대 샘플링 시간(초) (기본값: 60)
+        - PROFILING_MAX_CONCURRENT: 동시에 프로파일링할 최대 요청 수 (기본값: 2)
+        - PROFILING_DIR, PROFILING_MAX_FILES: ProfileStore.from_env 참고
+        """
+        return {
+            "token": os.getenv("PROFILING_TOKEN"),
+            "store": ProfileStore.from_env(),
+            "interval": float(os.getenv("PROFILING_INTERVAL_MS", "5")) / 1000,
+            "max_seconds": float(os.getenv("PROFILING_MAX_SECONDS", "60")),
+            "max_concurrent": int(os.getenv("PROFILING_MAX_CONCURRENT", "2"))
+        }
+
+    def _requested(self, scope):
+        for name, value in scope.get("headers", ()):
+            if name == PROFILE_HEADER:
+                return check_token(self.token, value.decode("latin-1"))
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["path"].startswith(self.excluded_prefixes)
+            or self.active >= self.max_concurrent
+            or not self._requested(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        # 프로파일 ID는 시각으로 시작하여 이름순 정렬이 최신순이 되도록 함
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                message["headers"] = list(message.get("headers", ())) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        sampler = RequestSampler(self.interval, self.max_seconds)
+        self.active += 1
+        started = time.time()
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            await asyncio.to_thread(sampler.stop)
+            self.active -= 1
+            meta = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status[0],
+                "started_at": started,
+                "duration_ms": round(duration * 1000, 2),
+                "samples": sampler.samples,
+                "interval_ms": self.interval * 1000,
+                "pid": os.getpid()
+            }
+            try:
+                await asyncio.to_thread(self.store.save, profile_id, sampler.collapsed(), meta)
+                logger.info("요청 프로파일 저장", extra=meta)
+            except OSError as e:
+                logger.warning(f"요청 프로파일 저장 실패: {e}", extra={"profile_id": profile_id})
@@ -1,18 +1,31 @@
-from fastapi import FastAPI
+import logging
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
 from app.routes import emotion_route, openai_route
 import os
 from dotenv import load_dotenv
+from app.core.log_config import setup_logging, shutdown_logging
+from app.core.metrics import MetricsMiddleware, MultiprocessMetrics, REGISTRY
+from app.core.admission import AdmissionMiddleware
+
+# 큐 기반 구조화 로깅 설정 (출력 I/O는 별도 스레드에서 처리)
+setup_logging()
+logger = logging.getLogger(__name__)
 
 # 안전하게 환경 변수 로드 시도
 try:
     load_dotenv()
 except Exception as e:
-    print(f"환경 변수 로드 중 오류 발생 (무시): {e}")
+    logger.warning(f"환경 변수 로드 중 오류 발생 (무시): {e}")
 
 app = FastAPI(title="Emotion Analysis API")
 
+# 부하 제어: LLM 경로 동시 처리 수 제한, 클라이언트 마감 시각 전달, 클라이언트별 속도 제한(ADMISSION_RATE_PER_SEC 설정 시)
+# (프록시 뒤에서 속도 제한을 켜면 ADMISSION_TRUST_FORWARDED=true 필요, 제한 값은 워커별)
+# (CORS 미들웨어 안쪽에 두어 거절 응답에도 CORS 헤더가 붙도록 가장 먼저 등록)
+if os.getenv("ADMISSION_ENABLED", "true").lower() == "true":
+    app.add_middleware(AdmissionMiddleware, **AdmissionMiddleware.options_from_env())
+
 # CORS 설정
 app.add_middleware(
     CORSMiddleware,
@@ -22,9 +35,20 @@ app.add_middleware(
     allow_headers=["*"],  # 모든 헤더 허용
 )
 
+# 라우트별 지연 시간/처리 중인 요청 수 기록 (가장 바깥쪽 미들웨어)
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(emotion_route.router)
 app.include_router(openai_route.router)
 
+# 요청 단위 프로파일링 (X-Profile-Token 헤더로 요청, 토큰이 없으면 미들웨어/라우트를 등록하지 않아 비용 없음)
+if os.getenv("PROFILING_TOKEN"):
+    from app.core.profiling import ProfilingMiddleware
+    from app.routes import profiling_route
+
+    app.add_middleware(ProfilingMiddleware, **ProfilingMiddleware.options_from_env())
+    app.include_router(profiling_route.router)
+
 @app.get("/")
 async def root():
     return {"message": "Hello World from Illusion Note Backend API"}
@@ -33,7 +57,58 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+# 운영 모드(gunicorn)에서 워커별 메트릭을 합쳐 출력 (METRICS_MULTIPROC_DIR가 없으면 프로세스 값만 출력)
+multiprocess_metrics = MultiprocessMetrics.from_env(REGISTRY)
+
+@app.on_event("startup")
+async def startup():
+    if multiprocess_metrics is not None:
+        multiprocess_metrics.start()
+
+@app.get("/metrics")
+async def metrics():
+    # Prometheus 텍스트 형식의 지연 시간/토큰/파싱 폴백 메트릭
+    if multiprocess_metrics is not None:
+        return Response(await multiprocess_metrics.render(), media_type=REGISTRY.CONTENT_TYPE)
+    return Response(REGISTRY.render(), media_type=REGISTRY.CONTENT_TYPE)
+
+@app.on_event("shutdown")
+async def shutdown():
+    # 처리 중인 작업 완료, 진행 중인 대화 요약 취소 후 공유 HTTP 커넥션 풀 정리
+    await openai_route.close_job_manager()
+    await openai_route.close_session_store()
+    await openai_route.close_openai_service()
+    # 저장 대기 중인 감정 분석 결과 저장
+    await openai_route.close_emotion_storage()
+    if multiprocess_metrics is not None:
+        await multiprocess_metrics.close()
+    # 큐에 남은 로그 출력
+    shutdown_logging()
+
+def warmup():
+    """
+    요청 처리 전에 읽기 전용 상태(감정 사전, 감정 분석기, 로컬 모델 가중치)를 미리 로드합니다.
+
+    운영 모드(gunicorn preload)에서는 워커 fork 전에 마스터 프로세스에서 호출되어,
+    로드된 객체를 모든 워커가 copy-on-write로 공유합니다. 업스트림 클라이언트, 캐시, 저장소처럼
+    커넥션이나 이벤트 루프에 묶인 객체는 워커별로 첫 사용 시 생성되므로 여기서 만들지 않습니다.
+    """
+    from app.models.lexicon_scorer import get_default_scorer
+
+    get_default_scorer()
+    analyzer = emotion_route.get_emotion_analyzer()
+    if analyzer.engine is not None:
+        analyzer.engine.load()
+    logger.info("사전 로드 완료", extra={"local_model": analyzer.engine is not None})
+
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
     host = os.getenv("HOST", "0.0.0.0")
-    uvicorn.run("app.main:app", host=host, port=port, reload=True) 
\ No newline at end of file
+
+    if os.getenv("APP_ENV", "development").lower() == "production":
+        # 운영 모드: gunicorn 마스터 + UvicornWorker 워커 풀 (설정은 app/core/gunicorn_conf.py)
+        os.execvp("gunicorn", ["gunicorn", "-c", "python:app.core.gunicorn_conf", "app.main:app"])
+
+    import uvicorn
+
+    uvicorn.run("app.main:app", host=host, port=port, reload=os.getenv("RELOAD", "true").lower() == "true")
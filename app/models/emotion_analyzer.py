@@ -1,13 +1,15 @@
 import os
-import torch
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+import json
+import logging
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 # 안전하게 환경 변수 로드 시도
 try:
     load_dotenv()
 except Exception as e:
-    print(f"환경 변수 로드 중 오류 발생 (무시): {e}")
+    logger.warning(f"환경 변수 로드 중 오류 발생 (무시): {e}")
 
 class EmotionAnalyzer:
     """감정 분석 및 응답 생성을 위한 클래스"""
@@ -16,12 +18,14 @@ class EmotionAnalyzer:
         # 모델 이름은 환경 변수에서 가져옴
         self.model_name = os.getenv("MODEL_NAME", "facebook/bart-large-cnn")
         
-        # 실제 프로덕션에서는 이 부분에 감정 분석 모델 로드 코드 추가
-        # 현재는 간단한 구현을 위해 모의 응답 사용
-        
-        # 실제 모델 로드시 아래와 같이 구현
-        # self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-        # self.model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
+        # 로컬 모델 사용 여부 (USE_LOCAL_MODEL=true 이면 요약을 로컬 모델로 생성)
+        # 모델은 첫 요청 시 프로세스당 한 번만 로드되며, 동시 요청은 마이크로 배치로 묶어 처리
+        self.engine = None
+        self.batcher = None
+        if os.getenv("USE_LOCAL_MODEL", "false").lower() == "true":
+            from app.models.inference_engine import Seq2SeqInferenceEngine, MicroBatcher
+            self.engine = Seq2SeqInferenceEngine.from_env(self.model_name)
+            self.batcher = MicroBatcher.from_env(self.engine.generate_batch)
         
         # 감정 매핑 (mood_id -> 한글 감정)
         self.emotion_map = {
@@ -56,6 +60,14 @@ class EmotionAnalyzer:
                 "angry": "깊은 호흡과 마음 챙김 명상을 시도해보세요. 불안한 생각이 떠오를 때 그것을 기록하고 분석하는 것이 도움이 될 수 있습니다. 필요하다면 전문가의 도움을 구하는 것도 고려해보세요."
             }
         }
+        
+        # 감정 x 모드 조합별 템플릿 응답과 미리 직렬화한 UTF-8 JSON 본문
+        # (로컬 모델이 꺼져 있으면 응답이 입력 텍스트와 무관하므로 요청마다 다시 만들 필요가 없음)
+        self.response_table = {
+            (mood_id, mode): self._encode(self._build_result(mood_id, mode))
+            for mode in self.mode_templates
+            for mood_id in self.emotion_map
+        }
 
     def analyze(self, text, mood_id, mode):
         """
@@ -69,16 +81,57 @@ class EmotionAnalyzer:
         Returns:
             dict: 감지된 감정, 요약, 응답을 포함한 딕셔너리
         """
-        # 실제 모델 사용시 아래와 같이 구현
-        # inputs = self.tokenizer(text, return_tensors="pt", max_length=512, truncation=True)
-        # outputs = self.model.generate(**inputs, max_length=150)
-        # summary = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+        if self.engine is None:
+            entry = self.response_table.get((mood_id, mode))
+            return dict(entry[0]) if entry is not None else self._build_result(mood_id, mode)
         
+        # 동기 호출 경로: 단건 배치로 바로 추론
+        summary = self.engine.generate_batch([text])[0]
+        return self._build_result(mood_id, mode, summary)
+    
+    async def analyze_async(self, text, mood_id, mode):
+        """
+        analyze()의 비동기 버전
+        
+        로컬 모델이 활성화된 경우 요청을 마이크로 배처에 넣어, 동시에 들어온 요청들과
+        하나의 패딩된 배치로 이벤트 루프 밖에서 추론합니다.
+        """
+        if self.batcher is None:
+            entry = self.response_table.get((mood_id, mode))
+            if entry is not None:
+                # 호출자가 결과를 수정해도 표가 바뀌지 않도록 복사본 반환
+                return dict(entry[0])
+            return self._build_result(mood_id, mode)
+        
+        summary = await self.batcher.submit(text)
+        return self._build_result(mood_id, mode, summary)
+    
+    async def analyze_body(self, text, mood_id, mode):
+        """
+        analyze_async() 결과를 UTF-8 JSON 본문(bytes)으로 반환합니다.
+        
+        템플릿 응답이면 미리 직렬화한 본문을 그대로 반환하므로, 라우트는 응답 모델 검증과
+        JSON 인코딩 없이 바로 응답할 수 있습니다.
+        """
+        if self.batcher is None:
+            entry = self.response_table.get((mood_id, mode))
+            if entry is not None:
+                return entry[1]
+        return self._encode(await self.analyze_async(text, mood_id, mode))[1]
+    
+    @staticmethod
+    def _encode(result):
+        # FastAPI JSONResponse와 같은 형식으로 직렬화 (응답 본문이 기존 경로와 동일)
+        body = json.dumps(result, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+        return result, body
+    
+    def _build_result(self, mood_id, mode, summary=None):
         # 현재는 사용자가 선택한 감정을 그대로 사용
         detected_emotion = self.emotion_map.get(mood_id, "알 수 없음")
         
-        # 간단한 요약 생성 (실제로는 모델이 생성)
-        summary = f"당신의 감정은 '{detected_emotion}'이에요. 입력하신 내용에서 '{detected_emotion}' 감정이 느껴집니다."
+        # 로컬 모델이 비활성화된 경우 간단한 요약 생성
+        if not summary:
+            summary = f"당신의 감정은 '{detected_emotion}'이에요. 입력하신 내용에서 '{detected_emotion}' 감정이 느껴집니다."
         
         # 모드에 따른 응답 생성
         response = self.mode_templates[mode][mood_id] if mode in self.mode_templates and mood_id in self.mode_templates[mode] else "응답을 생성할 수 없습니다."
@@ -0,0 +1,589 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import sqlite3
+import threading
+from collections import Counter
+from datetime import date, datetime, timezone
+
+from app.core.metrics import STORAGE_ROWS, STORAGE_QUEUE_DEPTH, STORAGE_FLUSH_DURATION
+
+logger = logging.getLogger(__name__)
+
+# supabase/init.sql의 익명 사용자 (users 테이블에 미리 생성되어 있음)
+ANONYMOUS_USER_ID = "00000000-0000-0000-0000-000000000000"
+
+# emotion_analysis 테이블의 저장 컬럼 (id는 자동 증가)
+COLUMNS = (
+    "user_id", "created_at", "text", "emotion", "response",
+    "analyze_text", "summary", "title", "response_type", "metadata"
+)
+
+# 큐 종료 표시
+_STOP = object()
+
+
+def is_integrity_error(error):
+    """
+    재시도해도 성공하지 않는 무결성 제약 위반(외래 키, NOT NULL 등)인지 확인합니다.
+
+    asyncpg 오류는 SQLSTATE 23xxx (integrity_constraint_violation) 클래스로 판단합니다.
+    """
+    if isinstance(error, sqlite3.IntegrityError):
+        return True
+    return str(getattr(error, "sqlstate", "") or "").startswith("23")
+
+
+def month_start(created_at):
+    """created_at(UTC)이 속한 달의 1일"""
+    return date(created_at.year, created_at.month, 1)
+
+
+def rollup_counts(records):
+    """
+    배치의 (user_id, 월, 감정)별 행 수를 셉니다.
+
+    Returns:
+        list: (user_id, 월 1일, 감정, 행 수) 목록
+    """
+    counts = Counter(
+        (record["user_id"], month_start(record["created_at"]), record["emotion"])
+        for record in records
+    )
+    return [key + (count,) for key, count in counts.items()]
+
+
+def month_range(year=None, year_month=None):
+    """
+    조회할 월 범위(첫 달 1일, 마지막 달 1일)를 계산합니다. 조건이 없으면 (None, None)
+
+    Raises:
+        ValueError: year_month가 YYYY-MM 형식이 아닌 경우
+    """
+    if year_month:
+        try:
+            year_part, month_part = year_month.split("-")
+            first = date(int(year_part), int(month_part), 1)
+        except ValueError:
+            raise ValueError(f"잘못된 년월 형식입니다 (YYYY-MM): {year_month}")
+        return first, first
+    if year:
+        return date(year, 1, 1), date(year, 12, 1)
+    return None, None
+
+
+def format_monthly_stats(rows):
+    """
+    (월 1일, 감정, 행 수) 목록을 월별 통계 목록으로 변환합니다 (최신 달이 먼저).
+
+    Returns:
+        list: [{"year", "month", "total", "emotions": {감정: 행 수}}]
+    """
+    months = {}
+    for month, emotion, count in rows:
+        if isinstance(month, str):
+            month = date.fromisoformat(month)
+        entry = months.setdefault(month, {"year": month.year, "month": month.month, "total": 0, "emotions": {}})
+        entry["total"] += count
+        entry["emotions"][emotion] = entry["emotions"].get(emotion, 0) + count
+    return [months[month] for month in sorted(months, reverse=True)]
+
+
+def build_record(text, result, user_id=None, mode="chat", mood_id="neutral", response_type="comfort", decision=None):
+    """
+    생성된 응답을 emotion_analysis 행(dict)으로 변환합니다.
+
+    Args:
+        text: 사용자가 입력한 일기 본문
+        result: detected_emotion, summary, response를 포함한 응답 dict
+        user_id: 사용자 UUID (없으면 익명 사용자)
+        mode: 응답 생성 모드 ('chat', 'analyze', 'summarize')
+        mood_id: 사용자가 선택한 감정 ID
+        response_type: 응답 유형 ('comfort', 'fact', 'advice')
+        decision: 라우팅 결정 (HybridRouter)
+    """
+    metadata = {"mode": mode, "mood_id": mood_id}
+    if decision:
+        metadata["decision"] = decision
+    return {
+        "user_id": str(user_id or ANONYMOUS_USER_ID),
+        "created_at": datetime.now(timezone.utc),
+        "text": text,
+        "emotion": result["detected_emotion"],
+        "response": result["response"],
+        "analyze_text": result["response"] if mode == "analyze" else None,
+        "summary": result.get("summary"),
+        "title": None,
+        "response_type": response_type,
+        "metadata": metadata
+    }
+
+
+class PostgresStorageBackend:
+    """
+    asyncpg 커넥션 풀 기반 저장소 (asyncpg 필요)
+
+    배치 하나를 unnest()를 사용한 INSERT 한 문장으로 저장합니다 (왕복 1회).
+    월별 감정 집계(emotion_monthly_stats)는 supabase/init.sql의 문장 단위 트리거가
+    같은 트랜잭션에서 갱신하므로 다른 서비스에서 저장한 행도 집계됩니다.
+    """
+
+    INSERT_SQL = (
+        f"INSERT INTO emotion_analysis ({', '.join(COLUMNS)}) "
+        "SELECT * FROM unnest($1::uuid[], $2::timestamptz[], $3::text[], $4::text[], $5::text[], "
+        "$6::text[], $7::text[], $8::text[], $9::text[], $10::jsonb[])"
+    )
+    STATS_SQL = (
+        "SELECT month, emotion, count FROM emotion_monthly_stats "
+        "WHERE user_id = $1::uuid AND ($2::date IS NULL OR month BETWEEN $2::date AND $3::date)"
+    )
+    BACKFILL_SQL = (
+        "INSERT INTO emotion_monthly_stats (user_id, month, emotion, count) "
+        "SELECT user_id, date_trunc('month', created_at AT TIME ZONE 'UTC')::date, emotion, count(*) "
+        "FROM emotion_analysis WHERE ($1::uuid IS NULL OR user_id = $1::uuid) GROUP BY 1, 2, 3"
+    )
+    USERS_SQL = "SELECT id::text FROM users WHERE id = ANY($1::uuid[])"
+
+    def __init__(self, dsn, min_size=1, max_size=5, statement_cache_size=100):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.statement_cache_size = statement_cache_size
+        self._pool = None
+        self._pool_lock = asyncio.Lock()
+
+    async def pool(self):
+        """커넥션 풀을 반환합니다. 최초 호출 시 생성합니다."""
+        if self._pool is None:
+            async with self._pool_lock:
+                if self._pool is None:
+                    import asyncpg
+                    self._pool = await asyncpg.create_pool(
+                        self.dsn,
+                        min_size=self.min_size,
+                        max_size=self.max_size,
+                        # PgBouncer(트랜잭션 모드) 사용 시 0으로 설정
+                        statement_cache_size=self.statement_cache_size
+                    )
+        return self._pool
+
+    async def insert_many(self, records):
+        columns = [[] for _ in COLUMNS]
+        for record in records:
+            for values, name in zip(columns, COLUMNS):
+                value = record[name]
+                values.append(json.dumps(value, ensure_ascii=False) if name == "metadata" else value)
+
+        pool = await self.pool()
+        async with pool.acquire() as conn:
+            await conn.execute(self.INSERT_SQL, *columns)
+
+    async def existing_users(self, user_ids):
+        """users 테이블에 있는 사용자 ID 집합을 반환합니다."""
+        pool = await self.pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(self.USERS_SQL, list(user_ids))
+        return {row[0] for row in rows}
+
+    async def monthly_stats(self, user_id, first_month=None, last_month=None):
+        pool = await self.pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(self.STATS_SQL, str(user_id), first_month, last_month)
+        return [(row["month"], row["emotion"], row["count"]) for row in rows]
+
+    async def backfill(self, user_id=None):
+        """emotion_analysis 전체(또는 사용자 한 명)로 월별 집계를 다시 만듭니다. 집계 행 수를 반환합니다."""
+        user_id = str(user_id) if user_id else None
+        where = "($1::uuid IS NULL OR user_id = $1::uuid)"
+        pool = await self.pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                # 재생성 중에는 emotion_analysis 쓰기를 막아 (SHARE 잠금) 누락/중복 집계를 방지
+                await conn.execute("LOCK TABLE emotion_analysis IN SHARE MODE")
+                await conn.execute(f"DELETE FROM emotion_monthly_stats WHERE {where}", user_id)
+                await conn.execute(self.BACKFILL_SQL, user_id)
+                return await conn.fetchval(f"SELECT count(*) FROM emotion_monthly_stats WHERE {where}", user_id)
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+
+class SQLiteStorageBackend:
+    """
+    로컬 개발/테스트용 SQLite 저장소
+
+    emotion_analysis, emotion_monthly_stats와 같은 컬럼의 테이블을 만들고, 배치 하나와 월별 집계
+    갱신을 트랜잭션 하나로 저장합니다. 쓰기는 이벤트 루프를 막지 않도록 스레드에서 실행합니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS emotion_analysis ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "user_id TEXT NOT NULL, "
+            "created_at TEXT NOT NULL, "
+            "text TEXT NOT NULL, "
+            "emotion TEXT NOT NULL, "
+            "response TEXT NOT NULL, "
+            "analyze_text TEXT, "
+            "summary TEXT, "
+            "title TEXT, "
+            "response_type TEXT NOT NULL, "
+            "metadata TEXT DEFAULT '{}')"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS emotion_monthly_stats ("
+            "user_id TEXT NOT NULL, "
+            "month TEXT NOT NULL, "
+            "emotion TEXT NOT NULL, "
+            "count INTEGER NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (user_id, month, emotion))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS emotion_analysis_user_id_created_at_idx ON emotion_analysis (user_id, created_at)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS emotion_analysis_created_at_idx ON emotion_analysis (created_at)")
+        self._conn.commit()
+
+    def _insert_many(self, records):
+        rows = [
+            tuple(
+                json.dumps(record[name], ensure_ascii=False) if name == "metadata"
+                else record[name].isoformat() if name == "created_at"
+                else record[name]
+                for name in COLUMNS
+            )
+            for record in records
+        ]
+        rollups = [
+            (user_id, month.isoformat(), emotion, count)
+            for user_id, month, emotion, count in rollup_counts(records)
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO emotion_analysis ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})",
+                rows
+            )
+            self._conn.executemany(
+                "INSERT INTO emotion_monthly_stats (user_id, month, emotion, count) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (user_id, month, emotion) DO UPDATE SET count = count + excluded.count",
+                rollups
+            )
+
+    async def insert_many(self, records):
+        await asyncio.to_thread(self._insert_many, records)
+
+    async def existing_users(self, user_ids):
+        # 로컬 저장소에는 users 테이블이 없으므로 모든 사용자를 허용
+        return set(user_ids)
+
+    def _monthly_stats(self, user_id, first_month, last_month):
+        query = "SELECT month, emotion, count FROM emotion_monthly_stats WHERE user_id = ?"
+        params = [str(user_id)]
+        if first_month is not None:
+            query += " AND month BETWEEN ? AND ?"
+            params += [first_month.isoformat(), last_month.isoformat()]
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    async def monthly_stats(self, user_id, first_month=None, last_month=None):
+        return await asyncio.to_thread(self._monthly_stats, user_id, first_month, last_month)
+
+    def _backfill(self, user_id):
+        where, params = ("user_id = ?", [str(user_id)]) if user_id else ("1 = 1", [])
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM emotion_monthly_stats WHERE {where}", params)
+            self._conn.execute(
+                "INSERT INTO emotion_monthly_stats (user_id, month, emotion, count) "
+                "SELECT user_id, substr(created_at, 1, 7) || '-01', emotion, count(*) "
+                f"FROM emotion_analysis WHERE {where} GROUP BY 1, 2, 3",
+                params
+            )
+            return self._conn.execute(f"SELECT count(*) FROM emotion_monthly_stats WHERE {where}", params).fetchone()[0]
+
+    async def backfill(self, user_id=None):
+        """emotion_analysis 전체(또는 사용자 한 명)로 월별 집계를 다시 만듭니다. 집계 행 수를 반환합니다."""
+        return await asyncio.to_thread(self._backfill, user_id)
+
+    async def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class EmotionStorage:
+    """
+    쓰기 지연(write-behind) 방식의 감정 분석 결과 저장소
+
+    - enqueue()는 큐에 넣기만 하고 바로 반환하므로 요청 처리가 DB를 기다리지 않습니다.
+    - 백그라운드 작업이 큐를 비우며 batch_size개가 모이거나 첫 항목 이후 flush_interval이 지나면
+      여러 행을 한 번에 저장합니다 (그룹 커밋).
+    - 큐가 가득 차면 요청을 막지 않고 해당 결과를 버립니다 (dropped 카운터).
+    - users 테이블에 없는 사용자의 행과 무결성 제약을 위반한 행은 재시도 없이 해당 행만 거부합니다
+      (rejected 카운터). 같은 배치의 다른 행은 그대로 저장됩니다.
+    - close()는 큐에 남은 결과를 모두 저장한 뒤 종료합니다.
+    """
+
+    def __init__(self, backend, batch_size=100, flush_interval=0.5, max_queue_size=10000, max_retries=3, max_known_users=10000):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.max_retries = max_retries
+        self.max_known_users = max_known_users
+
+        # users 테이블에서 확인한 사용자 ID (배치마다 조회하지 않도록 캐시)
+        self._known_users = {ANONYMOUS_USER_ID}
+
+        self._queue = None
+        self._worker = None
+        self._closing = False
+
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.rejected = 0
+        self.batches = 0
+
+    @classmethod
+    def from_env(cls):
+        """
+        환경 변수 설정으로 저장소를 생성합니다. EMOTION_STORAGE_URL이 없으면 None을 반환합니다.
+
+        - EMOTION_STORAGE_URL: postgresql://... (asyncpg) 또는 sqlite:///경로 (로컬 개발용)
+        - EMOTION_STORAGE_BATCH_SIZE: 한 번에 저장할 최대 행 수 (기본값: 100)
+        - EMOTION_STORAGE_FLUSH_MS: 첫 행이 들어온 뒤 저장까지 최대 대기 시간 (기본값: 500)
+        - EMOTION_STORAGE_QUEUE_SIZE: 저장 대기 큐 최대 크기 (기본값: 10000)
+        - EMOTION_STORAGE_POOL_SIZE: Postgres 커넥션 풀 최대 크기 (기본값: 5)
+        - EMOTION_STORAGE_STATEMENT_CACHE_SIZE: asyncpg 문장 캐시 크기, PgBouncer 사용 시 0 (기본값: 100)
+        """
+        url = os.getenv("EMOTION_STORAGE_URL")
+        if not url:
+            return None
+
+        return cls(
+            cls.create_backend(url),
+            batch_size=int(os.getenv("EMOTION_STORAGE_BATCH_SIZE", "100")),
+            flush_interval=int(os.getenv("EMOTION_STORAGE_FLUSH_MS", "500")) / 1000,
+            max_queue_size=int(os.getenv("EMOTION_STORAGE_QUEUE_SIZE", "10000"))
+        )
+
+    @staticmethod
+    def create_backend(url):
+        """
+        저장소 URL로 백엔드를 생성합니다.
+
+        Raises:
+            ValueError: 지원하지 않는 URL
+        """
+        if url.startswith("sqlite:///"):
+            return SQLiteStorageBackend(url[len("sqlite:///"):])
+        if url.startswith(("postgres://", "postgresql://")):
+            return PostgresStorageBackend(
+                url,
+                max_size=int(os.getenv("EMOTION_STORAGE_POOL_SIZE", "5")),
+                statement_cache_size=int(os.getenv("EMOTION_STORAGE_STATEMENT_CACHE_SIZE", "100"))
+            )
+        raise ValueError("EMOTION_STORAGE_URL은 postgresql:// 또는 sqlite:/// 로 시작해야 합니다")
+
+    async def monthly_stats(self, user_id, year=None, year_month=None):
+        """
+        사용자의 월별 감정 통계를 집계 테이블에서 조회합니다 (조회 비용은 월 수에 비례).
+
+        Args:
+            user_id: 사용자 UUID
+            year: 특정 연도만 조회 (선택)
+            year_month: 특정 년월(YYYY-MM)만 조회 (선택, year보다 우선)
+
+        Returns:
+            list: [{"year", "month", "total", "emotions": {감정: 행 수}}] (최신 달이 먼저)
+        """
+        first_month, last_month = month_range(year, year_month)
+        rows = await self.backend.monthly_stats(user_id, first_month, last_month)
+        stats = format_monthly_stats(rows)
+        if year_month and not stats:
+            # 특정 년월 조회는 기록이 없어도 해당 월 항목 하나를 반환
+            stats = [{"year": first_month.year, "month": first_month.month, "total": 0, "emotions": {}}]
+        return stats
+
+    async def backfill(self, user_id=None):
+        """
+        기존 emotion_analysis 행으로 월별 집계를 다시 만듭니다.
+
+        Args:
+            user_id: 특정 사용자만 재생성 (없으면 전체)
+
+        Returns:
+            int: 재생성된 집계 행 수
+        """
+        return await self.backend.backfill(user_id)
+
+    def enqueue(self, record):
+        """
+        저장할 행을 큐에 넣습니다. 기다리지 않으며, 큐가 가득 찼거나 종료 중이면 버립니다.
+
+        Returns:
+            bool: 큐에 넣었는지 여부
+        """
+        if self._closing:
+            self.dropped += 1
+            STORAGE_ROWS.inc(("dropped",))
+            return False
+
+        if self._worker is None:
+            # 실행 중인 이벤트 루프가 필요하므로 첫 저장 요청 시 작업 시작
+            self._queue = asyncio.Queue(self.max_queue_size)
+            self._worker = asyncio.ensure_future(self._run())
+
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            STORAGE_ROWS.inc(("dropped",))
+            logger.warning("감정 분석 저장 큐가 가득 차 결과를 버립니다", extra={"queue_size": self.max_queue_size})
+            return False
+        STORAGE_QUEUE_DEPTH.set(value=self._queue.qsize())
+        return True
+
+    async def _next_batch(self):
+        """
+        다음 배치를 모읍니다.
+
+        Returns:
+            tuple: (행 목록, 종료 표시를 만났는지 여부)
+        """
+        loop = asyncio.get_running_loop()
+        first = await self._queue.get()
+        if first is _STOP:
+            return [], True
+
+        batch = [first]
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                record = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0 or self._closing:
+                    break
+                try:
+                    record = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+            if record is _STOP:
+                return batch, True
+            batch.append(record)
+        return batch, False
+
+    async def _run(self):
+        while True:
+            batch, stopping = await self._next_batch()
+            STORAGE_QUEUE_DEPTH.set(value=self._queue.qsize())
+            if batch:
+                batch = await self._reject_unknown_users(batch)
+            if batch:
+                await self._write(batch)
+            if stopping:
+                return
+
+    def _reject(self, records, reason):
+        self.rejected += len(records)
+        STORAGE_ROWS.inc(("rejected",), len(records))
+        logger.error(f"감정 분석 결과 저장 거부: {reason}", extra={"rows": len(records)})
+
+    async def _reject_unknown_users(self, batch):
+        """
+        users 테이블에 없는 사용자의 행을 거부하고 나머지 행을 반환합니다.
+
+        확인된 사용자 ID는 캐시하므로 새 사용자가 있는 배치에서만 조회합니다.
+        조회에 실패하면 걸러내지 않고 저장 단계(무결성 오류 시 행 단위 거부)에 맡깁니다.
+        """
+        unknown = {record["user_id"] for record in batch} - self._known_users
+        if not unknown:
+            return batch
+        try:
+            existing = await self.backend.existing_users(unknown)
+        except Exception as e:
+            logger.warning(f"사용자 확인 실패: {e}", extra={"users": len(unknown)})
+            return batch
+
+        if len(self._known_users) + len(existing) > self.max_known_users:
+            self._known_users = {ANONYMOUS_USER_ID}
+        self._known_users.update(existing)
+        missing = unknown - existing
+        if not missing:
+            return batch
+        self._reject([record for record in batch if record["user_id"] in missing], "등록되지 않은 사용자")
+        return [record for record in batch if record["user_id"] not in missing]
+
+    async def _write(self, batch):
+        """
+        배치를 저장합니다. 실패하면 지수 백오프로 재시도하고, 끝내 실패하면 버립니다.
+
+        무결성 제약 위반은 재시도하지 않고 배치를 반으로 나눠 다시 저장하여,
+        혼자서도 위반하는 행만 거부합니다 (잘못된 행 k개당 O(k log n)번 저장).
+        """
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                await self.backend.insert_many(batch)
+            except Exception as e:
+                if is_integrity_error(e):
+                    if len(batch) == 1:
+                        self._reject(batch, e)
+                        return
+                    middle = len(batch) // 2
+                    await self._write(batch[:middle])
+                    await self._write(batch[middle:])
+                    return
+                if attempt < self.max_retries:
+                    logger.warning(f"감정 분석 결과 저장 실패, 재시도: {e}", extra={"rows": len(batch), "attempt": attempt + 1})
+                    await asyncio.sleep(0.5 * (2 ** attempt))
+                    continue
+                self.failed += len(batch)
+                STORAGE_ROWS.inc(("failed",), len(batch))
+                logger.error(f"감정 분석 결과 저장 실패: {e}", extra={"rows": len(batch)})
+                return
+
+            STORAGE_FLUSH_DURATION.observe((), time.perf_counter() - start)
+            self.written += len(batch)
+            self.batches += 1
+            STORAGE_ROWS.inc(("written",), len(batch))
+            logger.debug("감정 분석 결과 저장", extra={"rows": len(batch)})
+            return
+
+    async def close(self, timeout=30.0):
+        """
+        새 저장 요청을 받지 않고, 큐에 남은 결과를 모두 저장한 뒤 저장소를 닫습니다.
+        """
+        self._closing = True
+        if self._worker is not None:
+            await self._queue.put(_STOP)
+            try:
+                await asyncio.wait_for(self._worker, timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.error("감정 분석 저장 큐 정리 시간 초과", extra={"remaining": self._queue.qsize()})
+        await self.backend.close()
+
+    def stats(self):
+        return {
+            "backend": type(self.backend).__name__,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_batch_size": round(self.written / self.batches, 2) if self.batches else 0.0
+        }
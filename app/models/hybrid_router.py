@@ -0,0 +1,148 @@
+import os
+import time
+import logging
+from collections import Counter
+from app.models.lexicon_scorer import get_default_scorer
+from app.core.metrics import ROUTE_DECISIONS
+
+logger = logging.getLogger(__name__)
+
+# 감정 사전의 감정 -> 앱의 mood_id
+# 앱에서 'angry'는 '불안'으로 표시되므로 두려움(fear)도 'angry'로 매핑
+LEXICON_TO_MOOD = {
+    "happy": "happy",
+    "sad": "sad",
+    "tired": "tired",
+    "angry": "angry",
+    "fear": "angry"
+}
+
+
+class HybridRouter:
+    """
+    로컬 분석과 OpenAI 호출 사이의 신뢰도 기반 라우팅 계층
+
+    1. 감정 사전으로 빠르게 감정을 추정
+    2. 부정 표현("안 행복해", "not happy")이나 대조 표현("행복했지만 피곤했다")이 있으면 OpenAIService로 전달
+    3. 신뢰도가 임계값 이상이고 사용자가 선택한 mood_id와 일치하면 EmotionAnalyzer 템플릿으로 바로 응답
+    4. 그 외에는 OpenAIService로 전달
+
+    라우팅 결정은 decisions 카운터와 route_decisions_total 메트릭에 기록됩니다.
+    """
+
+    # 라우팅 결정 종류
+    LOCAL = "local"
+    EMPTY = "empty"
+    LLM_DISABLED = "llm_disabled"
+    LLM_MODE = "llm_mode"
+    LLM_CONTEXT = "llm_context"
+    LLM_NEGATED = "llm_negated"
+    LLM_MIXED = "llm_mixed"
+    LLM_LOW_CONFIDENCE = "llm_low_confidence"
+    LLM_MOOD_MISMATCH = "llm_mood_mismatch"
+
+    def __init__(self, openai_service, emotion_analyzer, scorer=None, enabled=True, threshold=0.8, local_modes=("chat",)):
+        self.openai_service = openai_service
+        self.emotion_analyzer = emotion_analyzer
+        self.scorer = scorer or get_default_scorer()
+        self.enabled = enabled
+        self.threshold = threshold
+        self.local_modes = set(local_modes)
+
+        self.decisions = Counter()
+        self.estimate_seconds = 0.0
+
+    @classmethod
+    def from_env(cls, openai_service, emotion_analyzer):
+        """
+        환경 변수 설정으로 라우터를 생성합니다.
+
+        - HYBRID_ROUTING_ENABLED: 로컬 응답 사용 여부 (기본값: true)
+        - HYBRID_CONFIDENCE_THRESHOLD: 로컬 응답에 필요한 최소 신뢰도 (기본값: 0.8)
+        - HYBRID_LOCAL_MODES: 로컬 응답을 허용할 모드 목록, 쉼표 구분 (기본값: chat)
+        """
+        return cls(
+            openai_service,
+            emotion_analyzer,
+            enabled=os.getenv("HYBRID_ROUTING_ENABLED", "true").lower() == "true",
+            threshold=float(os.getenv("HYBRID_CONFIDENCE_THRESHOLD", "0.8")),
+            local_modes=[mode.strip() for mode in os.getenv("HYBRID_LOCAL_MODES", "chat").split(",") if mode.strip()]
+        )
+
+    def decide(self, text, mode, mood_id, response_type="comfort", context=""):
+        """
+        로컬 응답 가능 여부를 결정합니다.
+
+        Returns:
+            tuple: (결정, 로컬 추정 결과 dict 또는 None)
+        """
+        if not self.enabled:
+            return self.LLM_DISABLED, None
+        if mode not in self.local_modes or response_type not in self.emotion_analyzer.mode_templates:
+            # 로컬 템플릿이 없는 모드/응답 유형
+            return self.LLM_MODE, None
+        if context:
+            # 이어지는 대화는 맥락을 반영해야 하므로 항상 LLM 사용
+            return self.LLM_CONTEXT, None
+
+        start = time.perf_counter()
+        estimate = self.scorer.score(text)
+        self.estimate_seconds += time.perf_counter() - start
+
+        # 사전 매칭은 부정/대조 표현의 의미를 반영하지 못하므로 LLM 사용
+        if estimate["negated"]:
+            return self.LLM_NEGATED, estimate
+        if estimate["mixed"]:
+            return self.LLM_MIXED, estimate
+        if estimate["confidence"] < self.threshold:
+            return self.LLM_LOW_CONFIDENCE, estimate
+        if LEXICON_TO_MOOD.get(estimate["dominant"]) != mood_id:
+            return self.LLM_MOOD_MISMATCH, estimate
+        return self.LOCAL, estimate
+
+    async def generate_response(self, text, mode="chat", mood_id="neutral", response_type="comfort", context=""):
+        """
+        라우팅 결정에 따라 로컬 템플릿 또는 OpenAI로 응답을 생성합니다.
+
+        Returns:
+            tuple: (응답 dict, 라우팅 결정)
+        """
+        decision, estimate = self.decide(text, mode, mood_id, response_type, context) if text else (self.EMPTY, None)
+        self.decisions[decision] += 1
+        ROUTE_DECISIONS.inc((decision,))
+
+        if decision == self.LOCAL:
+            logger.info("로컬 응답 사용", extra={"mood_id": mood_id, "confidence": estimate["confidence"], "sampled": True})
+            # EmotionAnalyzer의 모드는 OpenAI 경로의 응답 유형(comfort/fact/advice)에 해당
+            result = await self.emotion_analyzer.analyze_async(text, mood_id, response_type)
+            return result, decision
+
+        # 빈 텍스트(EMPTY)는 OpenAIService가 업스트림 호출 없이 안내 응답을 반환
+        result = await self.openai_service.generate_response(
+            text=text,
+            mode=mode,
+            mood_id=mood_id,
+            response_type=response_type,
+            context=context
+        )
+        return result, decision
+
+    def stats(self):
+        """라우팅 결정별 카운터를 반환합니다."""
+        total = sum(self.decisions.values())
+        estimates = (
+            self.decisions[self.LOCAL]
+            + self.decisions[self.LLM_NEGATED]
+            + self.decisions[self.LLM_MIXED]
+            + self.decisions[self.LLM_LOW_CONFIDENCE]
+            + self.decisions[self.LLM_MOOD_MISMATCH]
+        )
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "local_modes": sorted(self.local_modes),
+            "total": total,
+            "decisions": dict(self.decisions),
+            "local_ratio": round(self.decisions[self.LOCAL] / total, 4) if total else 0.0,
+            "avg_estimate_us": round(self.estimate_seconds / estimates * 1e6, 2) if estimates > 0 else 0.0
+        }
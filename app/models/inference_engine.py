@@ -0,0 +1,203 @@
+import os
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class Seq2SeqInferenceEngine:
+    """
+    CPU 전용 노드를 위한 Seq2Seq 추론 엔진
+
+    - 모델은 첫 사용 시 프로세스당 한 번만 로드
+    - 그래디언트 없이(inference_mode) 추론
+    - 선택적으로 nn.Linear 계층에 int8 동적 양자화 적용
+
+    테스트나 오프라인 환경에서는 model/tokenizer 객체를 직접 주입할 수 있습니다.
+    (예: 작은 BartConfig로 생성한 BartForConditionalGeneration)
+    """
+
+    def __init__(self, model_name=None, quantize=False, max_input_length=512, max_output_length=150,
+                 num_beams=1, num_threads=None, model=None, tokenizer=None):
+        self.model_name = model_name
+        self.quantize = quantize
+        self.max_input_length = max_input_length
+        self.max_output_length = max_output_length
+        self.num_beams = num_beams
+        self.num_threads = num_threads
+
+        self.model = model
+        self.tokenizer = tokenizer
+        self._lock = threading.Lock()
+        self._loaded = False
+        if model is not None and tokenizer is not None:
+            self._prepare_model()
+
+    @classmethod
+    def from_env(cls, model_name):
+        """환경 변수 설정으로 엔진을 생성합니다."""
+        num_threads = os.getenv("LOCAL_MODEL_THREADS")
+        return cls(
+            model_name=model_name,
+            quantize=os.getenv("LOCAL_MODEL_QUANTIZE", "false").lower() == "true",
+            max_input_length=int(os.getenv("LOCAL_MODEL_MAX_INPUT_LENGTH", "512")),
+            max_output_length=int(os.getenv("LOCAL_MODEL_MAX_OUTPUT_LENGTH", "150")),
+            num_beams=int(os.getenv("LOCAL_MODEL_NUM_BEAMS", "1")),
+            num_threads=int(num_threads) if num_threads else None
+        )
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def load(self):
+        """모델과 토크나이저를 로드합니다. 이미 로드된 경우 아무 작업도 하지 않습니다."""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            # torch/transformers는 임포트에만 수 초가 걸리므로 실제 로드 시점까지 지연
+            from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+            logger.info("로컬 모델 로드 시작", extra={"model_name": self.model_name})
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            self.model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
+            self._prepare_model()
+            logger.info("로컬 모델 로드 완료", extra={"model_name": self.model_name, "quantize": self.quantize})
+
+    def _prepare_model(self):
+        import torch
+
+        if self.num_threads:
+            torch.set_num_threads(self.num_threads)
+
+        self.model.eval()
+        if self.quantize:
+            # nn.Linear 가중치를 int8로 동적 양자화 (CPU 추론 속도 및 메모리 개선)
+            self.model = torch.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        self._loaded = True
+
+    def generate_batch(self, texts):
+        """
+        여러 텍스트를 하나의 패딩된 배치로 요약합니다.
+
+        Args:
+            texts: 입력 텍스트 목록
+
+        Returns:
+            list: 입력 순서와 동일한 생성 결과 문자열 목록
+        """
+        import torch
+
+        self.load()
+
+        inputs = self.tokenizer(
+            list(texts),
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=self.max_input_length
+        )
+        with torch.inference_mode():
+            outputs = self.model.generate(
+                **inputs,
+                max_length=self.max_output_length,
+                num_beams=self.num_beams
+            )
+        return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+
+class MicroBatcher:
+    """
+    동적 마이크로 배처
+
+    동시에 들어온 요청을 최대 max_wait_ms 동안 모아 한 번의 배치로 실행합니다.
+    배치는 전용 스레드에서 실행되므로 이벤트 루프를 블로킹하지 않으며,
+    배치가 실행되는 동안 도착한 요청은 다음 배치로 모입니다.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=16, max_wait_ms=5.0):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        # 추론은 한 번에 하나의 배치만 실행 (연산 내부 병렬화는 torch 스레드가 담당)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="micro-batcher")
+        self._queue = None
+        self._worker = None
+        self._loop = None
+
+        # 배치 크기 통계
+        self.batches = 0
+        self.items = 0
+
+    @classmethod
+    def from_env(cls, batch_fn):
+        return cls(
+            batch_fn,
+            max_batch_size=int(os.getenv("LOCAL_MODEL_MAX_BATCH", "16")),
+            max_wait_ms=float(os.getenv("LOCAL_MODEL_MAX_WAIT_MS", "5"))
+        )
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, item):
+        """항목 하나를 배치 대기열에 넣고 결과를 기다립니다."""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            # 대기 시간 또는 최대 배치 크기에 도달할 때까지 요청 수집
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # 대기 중 취소된 요청은 제외
+            batch = [(item, future) for item, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, self.batch_fn, [item for item, _ in batch]
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0
+        }
@@ -0,0 +1,439 @@
+import os
+import hmac
+import json
+import time
+import uuid
+import heapq
+import socket
+import asyncio
+import hashlib
+import logging
+import ipaddress
+import contextvars
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+EXPIRED = "expired"
+
+# 처리 중 오류의 원인을 공개할 수 없을 때 작업 오류로 기록하는 문구
+JOB_FAILED_MESSAGE = "작업을 처리하는 중 문제가 발생했습니다"
+
+
+class JobQueueFullError(Exception):
+    """대기 중인 작업 수가 max_queue_size에 도달한 경우"""
+
+
+def is_public_address(address):
+    """공인 유니캐스트 주소인지 확인합니다 (사설/루프백/링크 로컬/예약/멀티캐스트 주소는 False)."""
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+class MemoryJobBackend:
+    """
+    프로세스 메모리 작업 저장소
+
+    작업 레코드는 만료 시각과 함께 dict에 보관하고, 만료 시각 힙으로 오래된 레코드를 정리합니다.
+    작업을 제출한 프로세스의 워커만 처리할 수 있습니다 (서버리스에서는 RedisJobBackend 사용).
+    """
+
+    def __init__(self):
+        self._jobs = {}  # job_id -> (expires_at, job)
+        self._expiry = []  # (expires_at, job_id) 힙 (갱신된 항목은 꺼낼 때 무시)
+        self._queue = None
+
+    def _pending(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        return self._queue
+
+    def _sweep(self, now):
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, job_id = heapq.heappop(self._expiry)
+            entry = self._jobs.get(job_id)
+            if entry is not None and entry[0] == expires_at:
+                del self._jobs[job_id]
+
+    async def save(self, job, ttl):
+        now = time.time()
+        self._sweep(now)
+        expires_at = now + ttl
+        self._jobs[job["job_id"]] = (expires_at, job)
+        heapq.heappush(self._expiry, (expires_at, job["job_id"]))
+
+    async def load(self, job_id):
+        entry = self._jobs.get(job_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del self._jobs[job_id]
+            return None
+        return dict(entry[1])
+
+    async def push(self, job_id):
+        self._pending().put_nowait(job_id)
+
+    async def pop(self, timeout):
+        """대기열에서 작업 ID 하나를 꺼냅니다. timeout초 동안 없으면 None"""
+        try:
+            return await asyncio.wait_for(self._pending().get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def queue_size(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def close(self):
+        pass
+
+
+class RedisJobBackend:
+    """
+    Redis 호환 서버 기반 작업 저장소 (redis 패키지 필요)
+
+    작업 레코드는 {prefix}job:{id} 키에 JSON 문자열과 TTL로 저장하고, 대기열은
+    {prefix}queue 리스트(LPUSH/BRPOP)를 사용합니다. API 프로세스와 워커 프로세스
+    (python -m app.cli.job_worker)가 서로 다른 인스턴스에 있어도 작업을 주고받을 수 있습니다.
+    """
+
+    def __init__(self, url, prefix="illusion-note:"):
+        # redis는 이 백엔드를 사용할 때만 필요
+        import redis.asyncio as redis
+
+        self.url = url
+        self.prefix = prefix
+        self._client = redis.from_url(url, decode_responses=True)
+
+    def _key(self, job_id):
+        return f"{self.prefix}job:{job_id}"
+
+    async def save(self, job, ttl):
+        await self._client.set(self._key(job["job_id"]), json.dumps(job, ensure_ascii=False), ex=max(1, int(ttl)))
+
+    async def load(self, job_id):
+        value = await self._client.get(self._key(job_id))
+        return json.loads(value) if value is not None else None
+
+    async def push(self, job_id):
+        await self._client.lpush(f"{self.prefix}queue", job_id)
+
+    async def pop(self, timeout):
+        item = await self._client.brpop(f"{self.prefix}queue", timeout=max(1, int(timeout)))
+        return item[1] if item else None
+
+    async def queue_size(self):
+        return await self._client.llen(f"{self.prefix}queue")
+
+    async def close(self):
+        await self._client.aclose()
+
+
+class JobManager:
+    """
+    비동기 작업 관리자
+
+    - submit()은 작업 레코드를 저장하고 대기열에 넣은 뒤 바로 작업 ID를 반환
+    - workers개의 워커 태스크가 대기열에서 작업을 꺼내 process(request) 코루틴으로 처리
+    - 대기열에서 job_ttl초 넘게 기다린 작업은 실행하지 않고 expired로 기록
+    - 완료된 작업의 결과는 result_ttl초 동안 조회 가능
+    - webhook_url이 있으면 완료 시 작업 결과를 POST (JOB_WEBHOOK_SECRET이 있으면 HMAC 서명 헤더 포함)
+    """
+
+    def __init__(self, process, backend, workers=4, job_ttl=3600, result_ttl=600, max_queue_size=1000,
+                 webhook_timeout=10.0, webhook_retries=3, webhook_secret=None, webhook_allowed_hosts=(),
+                 webhook_allow_private=False):
+        """
+        Args:
+            process: 요청 dict를 받아 결과 dict를 반환하는 코루틴 함수
+                     (발생한 예외에 detail 속성이 있으면 그 문구만 작업 오류로 기록하고, 없으면 고정 문구 기록)
+            backend: MemoryJobBackend 또는 RedisJobBackend
+            workers: 동시에 처리할 최대 작업 수 (0이면 제출만 하고 처리하지 않음)
+            job_ttl: 작업이 대기열에서 기다릴 수 있는 최대 시간(초)
+            result_ttl: 완료된 작업 결과의 보관 시간(초)
+            max_queue_size: 최대 대기 작업 수
+            webhook_timeout: 웹훅 요청 1건의 타임아웃(초)
+            webhook_retries: 웹훅 전송 최대 시도 횟수
+            webhook_secret: 웹훅 본문 HMAC-SHA256 서명 키
+            webhook_allowed_hosts: 허용할 웹훅 호스트 목록 (비어 있으면 모든 호스트 허용)
+            webhook_allow_private: 사설/루프백/링크 로컬 주소로 해석되는 웹훅 호스트 허용 여부 (SSRF 방지를 위해 기본 거부)
+        """
+        self.process = process
+        self.backend = backend
+        self.workers = workers
+        self.job_ttl = job_ttl
+        self.result_ttl = result_ttl
+        self.max_queue_size = max_queue_size
+        self.webhook_timeout = webhook_timeout
+        self.webhook_retries = max(1, webhook_retries)
+        self.webhook_secret = webhook_secret.encode() if webhook_secret else None
+        self.webhook_allowed_hosts = set(webhook_allowed_hosts)
+        self.webhook_allow_private = webhook_allow_private
+
+        self._tasks = []
+        self._running = 0
+        self._http_client = None
+        self._closing = False
+
+        # 튜닝용 카운터
+        self.counts = {"submitted": 0, "rejected": 0, SUCCEEDED: 0, FAILED: 0, EXPIRED: 0, "webhook_failures": 0}
+
+    @classmethod
+    def from_env(cls, process):
+        """
+        환경 변수 설정으로 작업 관리자를 생성합니다.
+
+        - JOB_QUEUE_URL: redis://, rediss:// 또는 unix:// (유닉스 소켓)이면 Redis 호환 서버, 없으면 프로세스 메모리 (기본값: 없음)
+        - JOB_QUEUE_PREFIX: Redis 키 접두사 (기본값: illusion-note:)
+        - JOB_WORKERS: 이 프로세스에서 실행할 워커 수, 0이면 제출만 받음 (기본값: 4)
+        - JOB_TTL: 작업 대기 최대 시간(초) (기본값: 3600)
+        - JOB_RESULT_TTL: 완료된 결과 보관 시간(초) (기본값: 600)
+        - JOB_MAX_QUEUE: 최대 대기 작업 수 (기본값: 1000)
+        - JOB_WEBHOOK_TIMEOUT / JOB_WEBHOOK_RETRIES: 웹훅 타임아웃(초)/최대 시도 횟수 (기본값: 10 / 3)
+        - JOB_WEBHOOK_SECRET: 웹훅 X-Webhook-Signature 서명 키 (기본값: 없음)
+        - JOB_WEBHOOK_ALLOWED_HOSTS: 허용할 웹훅 호스트, 쉼표 구분 (기본값: 모든 공인 호스트)
+        - JOB_WEBHOOK_ALLOW_PRIVATE: 사설/루프백/링크 로컬 주소의 웹훅 허용, 로컬 개발용 (기본값: false)
+        """
+        url = os.getenv("JOB_QUEUE_URL")
+        if not url:
+            backend = MemoryJobBackend()
+        elif url.startswith(("redis://", "rediss://", "unix://")):
+            backend = RedisJobBackend(url, prefix=os.getenv("JOB_QUEUE_PREFIX", "illusion-note:"))
+        else:
+            raise ValueError("JOB_QUEUE_URL은 redis://, rediss:// 또는 unix:// 로 시작해야 합니다")
+
+        allowed_hosts = [host.strip() for host in os.getenv("JOB_WEBHOOK_ALLOWED_HOSTS", "").split(",") if host.strip()]
+        return cls(
+            process,
+            backend,
+            workers=int(os.getenv("JOB_WORKERS", "4")),
+            job_ttl=float(os.getenv("JOB_TTL", "3600")),
+            result_ttl=float(os.getenv("JOB_RESULT_TTL", "600")),
+            max_queue_size=int(os.getenv("JOB_MAX_QUEUE", "1000")),
+            webhook_timeout=float(os.getenv("JOB_WEBHOOK_TIMEOUT", "10")),
+            webhook_retries=int(os.getenv("JOB_WEBHOOK_RETRIES", "3")),
+            webhook_secret=os.getenv("JOB_WEBHOOK_SECRET") or None,
+            webhook_allowed_hosts=allowed_hosts,
+            webhook_allow_private=os.getenv("JOB_WEBHOOK_ALLOW_PRIVATE", "false").lower() == "true"
+        )
+
+    async def validate_webhook(self, url):
+        """
+        웹훅 URL을 검사합니다.
+
+        호스트 이름을 해석하여 사설/루프백/링크 로컬/예약 주소가 하나라도 있으면 거부합니다
+        (webhook_allow_private가 아닌 경우). 전송 직전에도 다시 검사하고 검사한 주소로만 연결하여
+        제출 후 또는 검사와 연결 사이에 DNS 응답이 바뀐 경우(DNS rebinding)를 막습니다.
+
+        Returns:
+            list: 검사를 통과한 IP 주소 목록 (webhook_allow_private이면 None)
+
+        Raises:
+            ValueError: http(s)가 아니거나, 허용되지 않은 호스트이거나, 공인 주소가 아닌 경우
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError("webhook_url은 http(s) URL이어야 합니다")
+        if self.webhook_allowed_hosts and parts.hostname not in self.webhook_allowed_hosts:
+            raise ValueError(f"허용되지 않은 웹훅 호스트입니다: {parts.hostname}")
+        if self.webhook_allow_private:
+            return None
+
+        try:
+            port = parts.port or (443 if parts.scheme == "https" else 80)
+            addresses = await self._resolve_host(parts.hostname, port)
+        except (OSError, ValueError):
+            raise ValueError(f"웹훅 호스트 주소를 확인할 수 없습니다: {parts.hostname}")
+        if not addresses or not all(is_public_address(address) for address in addresses):
+            raise ValueError(f"공인 주소가 아닌 웹훅 호스트입니다: {parts.hostname}")
+        return addresses
+
+    @staticmethod
+    async def _resolve_host(hostname, port):
+        """호스트 이름을 IP 주소 목록으로 해석합니다 (getaddrinfo 순서 유지)."""
+        infos = await asyncio.get_running_loop().getaddrinfo(hostname, port, type=socket.SOCK_STREAM)
+        return list(dict.fromkeys(info[4][0] for info in infos))
+
+    def start(self):
+        """워커 태스크를 시작합니다. 이미 시작되었으면 아무 작업도 하지 않습니다."""
+        if self._tasks or self.workers <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        for index in range(self.workers):
+            # 제출한 요청의 컨텍스트(마감 시각 등)를 물려받지 않도록 빈 컨텍스트에서 생성
+            task = contextvars.Context().run(loop.create_task, self._worker(index))
+            self._tasks.append(task)
+
+    async def submit(self, request, webhook_url=None):
+        """
+        작업을 제출합니다.
+
+        Args:
+            request: process()에 전달할 요청 dict
+            webhook_url: 완료 시 결과를 받을 URL (선택)
+
+        Returns:
+            dict: 작업 레코드
+
+        Raises:
+            JobQueueFullError: 대기 작업 수가 가득 찬 경우
+        """
+        if await self.backend.queue_size() >= self.max_queue_size:
+            self.counts["rejected"] += 1
+            raise JobQueueFullError("대기 중인 작업이 너무 많습니다")
+
+        self.start()
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": QUEUED,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "request": request,
+            "webhook_url": webhook_url,
+            "webhook_status": None,
+            "result": None,
+            "error": None
+        }
+        await self.backend.save(job, self.job_ttl + self.result_ttl)
+        await self.backend.push(job["job_id"])
+        self.counts["submitted"] += 1
+        return job
+
+    async def get(self, job_id):
+        """작업 레코드를 반환합니다. 없거나 만료되었으면 None을 반환합니다."""
+        return await self.backend.load(job_id)
+
+    @staticmethod
+    def public_view(job):
+        """클라이언트에 반환할 작업 정보 (요청 본문과 웹훅 주소 제외)"""
+        return {key: value for key, value in job.items() if key not in ("request", "webhook_url")}
+
+    async def _worker(self, index):
+        while not self._closing:
+            try:
+                job_id = await self.backend.pop(timeout=1.0)
+                if job_id is None:
+                    continue
+                job = await self.backend.load(job_id)
+                if job is None or job["status"] != QUEUED:
+                    continue
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 저장소 오류 등으로 워커가 종료되지 않도록 기록 후 계속
+                logger.exception(f"작업 워커 오류: {e}", extra={"worker": index})
+                await asyncio.sleep(1.0)
+
+    async def _run(self, job):
+        now = time.time()
+        if now - job["created_at"] > self.job_ttl:
+            await self._finish(job, EXPIRED, error="작업 대기 시간이 초과되었습니다")
+            return
+
+        job.update(status=RUNNING, started_at=now)
+        await self.backend.save(job, self.job_ttl + self.result_ttl)
+        self._running += 1
+        try:
+            result = await self.process(job["request"])
+        except Exception as e:
+            # 원인 오류(업스트림 응답, 키 일부 등)는 로그에만 남기고 조회/웹훅에는 안내 문구만 노출
+            logger.exception(f"작업 처리 실패: {e}", extra={"job_id": job["job_id"]})
+            await self._finish(job, FAILED, error=getattr(e, "detail", None) or JOB_FAILED_MESSAGE)
+        else:
+            await self._finish(job, SUCCEEDED, result=result)
+        finally:
+            self._running -= 1
+
+    async def _finish(self, job, status, result=None, error=None):
+        job.update(status=status, finished_at=time.time(), result=result, error=error)
+        self.counts[status] += 1
+        # 폴링하는 클라이언트가 웹훅 전송을 기다리지 않도록 결과를 먼저 저장
+        await self.backend.save(job, self.result_ttl)
+        if job.get("webhook_url"):
+            job["webhook_status"] = await self._deliver_webhook(job)
+            await self.backend.save(job, self.result_ttl)
+
+    async def _deliver_webhook(self, job):
+        """
+        완료된 작업을 웹훅으로 전송합니다.
+        성공하면 HTTP 상태 코드, 실패하면 'failed', 주소 검사에서 거부되면 'rejected'를 반환합니다.
+        """
+        import httpx
+
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(timeout=self.webhook_timeout)
+
+        body = json.dumps(self.public_view(job), ensure_ascii=False).encode("utf-8")
+        headers = {"Content-Type": "application/json", "X-Job-Id": job["job_id"]}
+        if self.webhook_secret:
+            signature = hmac.new(self.webhook_secret, body, hashlib.sha256).hexdigest()
+            headers["X-Webhook-Signature"] = f"sha256={signature}"
+
+        try:
+            addresses = await self.validate_webhook(job["webhook_url"])
+        except ValueError as e:
+            logger.warning(f"웹훅 전송 거부: {e}", extra={"job_id": job["job_id"]})
+            self.counts["webhook_failures"] += 1
+            return "rejected"
+
+        url = httpx.URL(job["webhook_url"])
+        extensions = {}
+        if addresses:
+            # 검사한 주소로 직접 연결 (httpx가 다시 DNS를 조회하지 않도록), Host 헤더와 TLS SNI/인증서 검증은 원래 호스트 기준
+            headers["Host"] = url.netloc.decode("ascii")
+            if url.scheme == "https":
+                extensions["sni_hostname"] = url.host
+            url = url.copy_with(host=addresses[0].split("%", 1)[0])
+
+        for attempt in range(self.webhook_retries):
+            try:
+                response = await self._http_client.post(url, content=body, headers=headers, extensions=extensions)
+                if response.status_code < 500:
+                    return response.status_code
+            except httpx.HTTPError as e:
+                logger.warning(f"웹훅 전송 실패: {e}", extra={"job_id": job["job_id"], "attempt": attempt + 1})
+            if attempt + 1 < self.webhook_retries:
+                await asyncio.sleep(2 ** attempt)
+
+        self.counts["webhook_failures"] += 1
+        return "failed"
+
+    async def close(self, timeout=30.0):
+        """
+        워커를 종료합니다. 처리 중인 작업은 timeout초까지 기다립니다.
+
+        프로세스 메모리 백엔드의 대기 작업은 함께 사라지고, Redis 백엔드의 대기 작업은 다른 워커가 처리합니다.
+        """
+        self._closing = True
+        if self._tasks:
+            _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        await self.backend.close()
+
+    async def stats(self):
+        """대기/처리 중 작업 수와 상태별 카운터를 반환합니다."""
+        return {
+            "backend": type(self.backend).__name__,
+            "workers": self.workers,
+            "running": self._running,
+            "queued": await self.backend.queue_size(),
+            "max_queue_size": self.max_queue_size,
+            "job_ttl": self.job_ttl,
+            "result_ttl": self.result_ttl,
+            **self.counts
+        }
@@ -0,0 +1,342 @@
+import math
+import bisect
+from collections import deque
+
+
+# 감정별 가중치 사전 (한국어 + 영어)
+# 한국어는 어간 기준 부분 문자열로 매칭하고, 영어는 단어 경계를 확인하여 매칭
+EMOTION_LEXICON = {
+    "happy": {
+        "행복": 1.0, "기쁘": 1.0, "기쁨": 1.0, "즐거": 0.9, "즐겁": 0.9, "신나": 0.9, "신났": 0.9,
+        "좋았": 0.6, "좋아": 0.5, "설레": 0.8, "뿌듯": 0.9, "만족": 0.7, "감사": 0.7, "고마": 0.6,
+        "웃었": 0.6, "웃음": 0.6, "재밌": 0.7, "재미있": 0.7, "최고": 0.6, "사랑": 0.6, "편안": 0.5,
+        "happy": 1.0, "happiness": 1.0, "joy": 1.0, "joyful": 1.0, "glad": 0.9, "delighted": 1.0,
+        "excited": 0.9, "grateful": 0.8, "thankful": 0.8, "proud": 0.8, "fun": 0.6, "great": 0.5,
+        "love": 0.6, "loved": 0.6, "wonderful": 0.8, "awesome": 0.7, "content": 0.5, "smile": 0.6,
+    },
+    "sad": {
+        "슬프": 1.0, "슬픔": 1.0, "슬펐": 1.0, "우울": 1.0, "눈물": 0.9, "울었": 0.9, "울고": 0.8,
+        "서운": 0.8, "서럽": 0.9, "외로": 0.9, "외롭": 0.9, "허전": 0.7, "상실": 0.8, "그립": 0.6,
+        "그리워": 0.6, "속상": 0.9, "실망": 0.8, "후회": 0.7, "비참": 1.0, "절망": 1.0, "공허": 0.8,
+        "sad": 1.0, "sadness": 1.0, "unhappy": 0.9, "depressed": 1.0, "miserable": 1.0, "cried": 0.9,
+        "crying": 0.9, "tears": 0.8, "lonely": 0.9, "heartbroken": 1.0, "disappointed": 0.8,
+        "regret": 0.7, "hopeless": 1.0, "empty": 0.6, "grief": 1.0, "miss": 0.4,
+    },
+    "angry": {
+        "화나": 1.0, "화났": 1.0, "화가": 0.9, "짜증": 0.9, "분노": 1.0, "열받": 1.0, "억울": 0.8,
+        "답답": 0.7, "빡치": 1.0, "미워": 0.8, "싫어": 0.6, "어이없": 0.7, "괘씸": 0.9,
+        "angry": 1.0, "anger": 1.0, "mad": 0.8, "furious": 1.0, "outraged": 1.0, "annoyed": 0.8,
+        "irritated": 0.8, "frustrated": 0.8, "hate": 0.8, "resent": 0.8, "upset": 0.7,
+    },
+    "fear": {
+        "불안": 1.0, "걱정": 0.9, "두렵": 1.0, "두려": 1.0, "무섭": 1.0, "무서": 1.0, "긴장": 0.7,
+        "초조": 0.9, "겁나": 0.9, "겁이": 0.9, "떨렸": 0.6, "막막": 0.7, "조마조마": 0.9,
+        "afraid": 1.0, "scared": 1.0, "terrified": 1.0, "fearful": 1.0, "anxious": 1.0, "anxiety": 1.0,
+        "worried": 0.9, "worry": 0.8, "nervous": 0.8, "panic": 1.0, "stressed": 0.7, "stress": 0.6,
+    },
+    "surprise": {
+        "놀랐": 1.0, "놀라": 0.9, "깜짝": 1.0, "당황": 0.8, "충격": 0.9, "의외": 0.7, "신기": 0.6,
+        "surprised": 1.0, "shocked": 1.0, "amazed": 0.9, "astonished": 1.0, "unexpected": 0.7,
+        "stunned": 0.9, "wow": 0.6,
+    },
+    "tired": {
+        "피곤": 1.0, "지쳤": 1.0, "지치": 1.0, "지침": 0.9, "힘들": 0.8, "힘든": 0.8, "녹초": 1.0,
+        "졸리": 0.7, "졸려": 0.7, "무기력": 1.0, "기운이 없": 0.9, "번아웃": 1.0, "야근": 0.6,
+        "tired": 1.0, "exhausted": 1.0, "weary": 0.9, "sleepy": 0.7, "drained": 1.0, "burnout": 1.0,
+        "burned out": 1.0, "fatigue": 1.0, "worn out": 1.0,
+    },
+}
+
+# 뒤에 오는 감정 표현을 부정하는 단어 (예: "안 행복해", "not happy at all", "don't feel happy")
+# 한국어 "안"/"못"은 "불안", "잘못"과 구분되도록 앞쪽 단어 경계와 뒤따르는 공백까지 매칭
+NEGATION_PREFIXES = ("안 ", "못 ", "not", "no", "never", "cannot", "n't", "n’t", "hardly", "without")
+
+# 앞에 오는 감정 표현을 부정하는 어미 (예: "행복하지 않았다", "기쁘지 못했다", "걱정 없이", "슬픈 건 아니")
+NEGATION_SUFFIXES = ("지 않", "지않", "지 못", "지못", "지도 않", "지는 않", "지 말", "없", "아니")
+
+# 감정이 섞여 있을 수 있음을 나타내는 대조 표현 (예: "행복했지만 피곤했다")
+CONTRAST_CUES = ("지만", "그런데", "근데", "그러나", "반면", "그래도", "but", "however", "although", "though")
+
+# 부정 범위를 끊는 문장/절 구분 문자
+CLAUSE_BREAKS = frozenset(".,!?;:\n")
+
+# 부정 단어와 감정 표현 사이에 허용하는 최대 단어 수/글자 수, 감정 표현과 부정 어미 사이 최대 글자 수
+NEGATION_PREFIX_WORDS = 3
+NEGATION_PREFIX_GAP = 30
+NEGATION_SUFFIX_GAP = 6
+
+
+class AhoCorasickAutomaton:
+    """
+    다중 패턴 문자열 매칭 오토마톤 (Aho-Corasick)
+
+    사전의 모든 용어를 하나의 트라이로 컴파일하여, 본문을 한 번만 훑으면서
+    겹치는 매칭까지 모두 찾습니다. 탐색 비용은 본문 길이 + 매칭 수에 비례하며
+    사전 크기와 무관합니다.
+    """
+
+    def __init__(self, patterns):
+        """
+        Args:
+            patterns: (패턴 문자열, 페이로드) 목록
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        self._lengths = []
+        self._payloads = []
+
+        for pattern, payload in patterns:
+            if not pattern:
+                continue
+            node = 0
+            for ch in pattern:
+                next_node = self._goto[node].get(ch)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][ch] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                node = next_node
+            self._output[node] = self._output[node] + (len(self._payloads),)
+            self._lengths.append(len(pattern))
+            self._payloads.append(payload)
+
+        self._build_failure_links()
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                # 접미사로 끝나는 패턴의 출력도 함께 보고
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def __len__(self):
+        return len(self._payloads)
+
+    def iter_matches(self, text):
+        """
+        본문에서 모든 매칭을 찾습니다.
+
+        Yields:
+            tuple: (시작 위치, 끝 위치, 페이로드)
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        lengths = self._lengths
+        payloads = self._payloads
+
+        node = 0
+        for index, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pattern_id in output[node]:
+                end = index + 1
+                yield end - lengths[pattern_id], end, payloads[pattern_id]
+
+
+class LexiconScorer:
+    """
+    가중치 감정 사전 기반 점수 계산기
+
+    본문을 한 번 스캔하여 감정별 점수(0~1)와 매칭된 구간을 반환합니다.
+    부정 표현("안 행복해", "not happy")이 걸린 감정 표현은 점수에서 제외하고,
+    부정/대조 표현이 있었는지 함께 반환하여 호출자가 사전 추정을 신뢰할지 판단할 수 있게 합니다.
+    """
+
+    # 매칭 종류 (감정 용어는 감정 이름을 그대로 사용)
+    NEGATION_PREFIX = "negation_prefix"
+    NEGATION_SUFFIX = "negation_suffix"
+    CONTRAST = "contrast"
+
+    def __init__(self, lexicon=None, negation_prefixes=NEGATION_PREFIXES, negation_suffixes=NEGATION_SUFFIXES,
+                 contrast_cues=CONTRAST_CUES):
+        lexicon = lexicon or EMOTION_LEXICON
+        self.emotions = list(lexicon)
+
+        patterns = []
+        for emotion, terms in lexicon.items():
+            for term, weight in terms.items():
+                normalized = term.lower()
+                patterns.append((normalized, (term, emotion, float(weight), normalized.isascii())))
+        self.term_count = len(patterns)
+
+        # 부정/대조 표현도 같은 오토마톤에 넣어 본문을 한 번만 스캔
+        for kind, cues in (
+            (self.NEGATION_PREFIX, negation_prefixes),
+            (self.NEGATION_SUFFIX, negation_suffixes),
+            (self.CONTRAST, contrast_cues)
+        ):
+            for cue in cues:
+                normalized = cue.lower()
+                patterns.append((normalized, (cue, kind, 0.0, normalized.isascii())))
+        self.automaton = AhoCorasickAutomaton(patterns)
+
+    @staticmethod
+    def _is_word_char(ch):
+        return ch.isascii() and ch.isalnum()
+
+    def _at_word_boundary(self, text, start, end, ascii_term, term):
+        """용어가 단어 경계에 있는지 확인합니다 (한국어 용어는 어간 매칭이므로 경계를 보지 않음)."""
+        if term.startswith(("n'", "n’")):
+            # 축약형 부정은 단어 끝에서만 확인 (예: "don't", "didn’t")
+            return not (end < len(text) and self._is_word_char(text[end]))
+        if ascii_term:
+            # 영어 용어는 단어 경계에서만 매칭 (예: "sad"가 "crusade"에 매칭되지 않도록)
+            return not (
+                (start > 0 and self._is_word_char(text[start - 1]))
+                or (end < len(text) and self._is_word_char(text[end]))
+            )
+        if term.endswith(" "):
+            # "안 ", "못 "은 독립된 단어일 때만 부정으로 봄 ("불안 ", "잘못 " 제외)
+            return start == 0 or not text[start - 1].isalnum()
+        return True
+
+    @staticmethod
+    def _in_scope(text, start, end, contrasts):
+        """text[start:end]가 절 구분 문자나 대조 표현 없이 이어지면 True"""
+        if start > end:
+            return False
+        index = bisect.bisect_left(contrasts, start)
+        if index < len(contrasts) and contrasts[index] < end:
+            return False
+        return not any(ch in CLAUSE_BREAKS for ch in text[start:end])
+
+    def _apply_negation(self, text, matches, prefixes, suffixes, contrasts):
+        """
+        부정 표현이 걸린 감정 매칭에 negated 표시를 합니다.
+
+        matches는 끝 위치 순(오토마톤 보고 순서), prefixes/suffixes/contrasts는 시작 위치 순입니다.
+        """
+        # 감정 용어 안에 포함된 부정 표현은 무시 (예: "기운이 없"의 "없")
+        covered = set()
+        for match in matches:
+            covered.update(range(match["start"], match["end"]))
+
+        by_start = sorted(matches, key=lambda match: match["start"])
+        starts = [match["start"] for match in by_start]
+        ends = [match["end"] for match in matches]
+
+        for cue_start, cue_end in prefixes:
+            if cue_start in covered:
+                continue
+            # 부정 단어 뒤 가장 가까운 감정 표현 (같은 절, NEGATION_PREFIX_WORDS 단어 이내)
+            index = bisect.bisect_left(starts, cue_end)
+            if index == len(starts):
+                continue
+            target = by_start[index]
+            gap = text[cue_end:target["start"]]
+            if (
+                len(gap) <= NEGATION_PREFIX_GAP
+                and len(gap.split()) <= NEGATION_PREFIX_WORDS
+                and self._in_scope(text, cue_end, target["start"], contrasts)
+            ):
+                target["negated"] = True
+
+        for cue_start, cue_end in suffixes:
+            if cue_start in covered:
+                continue
+            # 부정 어미 앞 가장 가까운 감정 표현 (같은 절, NEGATION_SUFFIX_GAP 글자 이내)
+            index = bisect.bisect_right(ends, cue_start) - 1
+            if index < 0:
+                continue
+            target = matches[index]
+            if cue_start - target["end"] <= NEGATION_SUFFIX_GAP and self._in_scope(text, target["end"], cue_start, contrasts):
+                target["negated"] = True
+
+    def score(self, text):
+        """
+        텍스트의 감정 점수를 계산합니다.
+
+        Args:
+            text: 분석할 텍스트
+
+        Returns:
+            dict: {
+                "emotions": 감정별 점수 (0~1, 매칭 가중치 합에 대해 포화),
+                "matches": 매칭된 구간 목록,
+                "dominant": 가장 강한 감정 (매칭이 없으면 None),
+                "confidence": 지배 감정의 신뢰도 (0~1),
+                "negated": 부정 표현이 걸려 점수에서 제외된 매칭 수,
+                "mixed": 감정 표현과 함께 대조 표현("하지만", "but" 등)이 있는지 여부
+            }
+        """
+        lowered = (text or "").lower()
+        raw = dict.fromkeys(self.emotions, 0.0)
+        matches = []
+        prefixes = []
+        suffixes = []
+        contrasts = []
+
+        for start, end, (term, kind, weight, ascii_term) in self.automaton.iter_matches(lowered):
+            if not self._at_word_boundary(lowered, start, end, ascii_term, term.lower()):
+                continue
+            if kind == self.NEGATION_PREFIX:
+                prefixes.append((start, end))
+            elif kind == self.NEGATION_SUFFIX:
+                suffixes.append((start, end))
+            elif kind == self.CONTRAST:
+                contrasts.append(start)
+            else:
+                matches.append({
+                    "term": term,
+                    "emotion": kind,
+                    "start": start,
+                    "end": end,
+                    "weight": weight,
+                    "negated": False
+                })
+
+        # 오토마톤은 끝 위치 순으로 보고하므로 부정/대조 표현 위치는 시작 위치 순으로 정렬
+        prefixes.sort()
+        suffixes.sort()
+        contrasts.sort()
+        self._apply_negation(lowered, matches, prefixes, suffixes, contrasts)
+        for match in matches:
+            if not match["negated"]:
+                raw[match["emotion"]] += match["weight"]
+
+        emotions = {emotion: round(1.0 - math.exp(-value), 4) for emotion, value in raw.items()}
+
+        total = sum(raw.values())
+        dominant = None
+        confidence = 0.0
+        if total > 0:
+            dominant = max(raw, key=raw.get)
+            # 지배 감정의 비중 x 전체 감정 강도
+            confidence = round((raw[dominant] / total) * (1.0 - math.exp(-total)), 4)
+
+        return {
+            "emotions": emotions,
+            "matches": matches,
+            "dominant": dominant,
+            "confidence": confidence,
+            "negated": sum(1 for match in matches if match["negated"]),
+            "mixed": bool(contrasts and matches)
+        }
+
+    def score_batch(self, texts):
+        """여러 텍스트의 감정 점수를 입력 순서대로 계산합니다."""
+        return [self.score(text) for text in texts]
+
+
+# 컴파일 비용이 있으므로 모듈 단위로 공유
+_default_scorer = None
+
+
+def get_default_scorer():
+    """기본 감정 사전으로 컴파일된 LexiconScorer 싱글톤을 반환합니다."""
+    global _default_scorer
+    if _default_scorer is None:
+        _default_scorer = LexiconScorer()
+    return _default_scorer
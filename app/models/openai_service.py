@@ -1,39 +1,133 @@
 import os
-import traceback
-from openai import OpenAI
+import json
+import time
+import asyncio
+import logging
 from dotenv import load_dotenv
+from app.models.response_cache import ResponseCache
+from app.models.stream_parser import IncrementalJSONFieldParser
+from app.models.prompt_builder import PromptBuilder
+from app.models.upstream_resilience import UpstreamResilience, CircuitOpenError
+from app.models.upstream_pool import UpstreamPool
+from app.core.admission import deadline_remaining, DeadlineExceededError
+from app.core.metrics import journal_labels, observe_stage, record_usage, UPSTREAM_IN_FLIGHT, PARSE_FALLBACKS, FALLBACK_RESPONSES, ADMISSION_REJECTIONS
+
+logger = logging.getLogger(__name__)
 
 # 안전하게 환경 변수 로드 시도
 try:
     load_dotenv()
 except Exception as e:
-    print(f"환경 변수 로드 중 오류 발생 (무시): {e}")
+    logger.warning(f"환경 변수 로드 중 오류 발생 (무시): {e}")
+
+class UpstreamError(Exception):
+    """
+    응답을 생성하지 못한 경우 (대체 응답도 사용할 수 없음)
+    
+    메시지에는 원인 오류가 포함되므로 로그/CLI용으로만 사용하고,
+    클라이언트에는 status_code와 detail(고정 안내 문구)만 전달합니다.
+    """
+    
+    DETAILS = {
+        502: "응답 생성에 실패했습니다.",
+        503: "응답 생성 서비스를 일시적으로 사용할 수 없습니다. 잠시 후 다시 시도해주세요."
+    }
+    
+    def __init__(self, message, status_code=502):
+        super().__init__(message)
+        self.status_code = status_code
+        self.detail = self.DETAILS[status_code]
 
 class OpenAIService:
     """OpenAI API 연동을 위한 서비스 클래스"""
     
-    def __init__(self):
+    # 응답 JSON의 필수 필드
+    RESPONSE_FIELDS = ("detected_emotion", "summary", "response")
+    
+    def __init__(self, fallback_analyzer=None):
+        """
+        Args:
+            fallback_analyzer: 업스트림 장애 시 템플릿 응답을 제공할 EmotionAnalyzer (없으면 UpstreamError)
+        """
+        # openai/httpx 임포트는 비용이 크므로 서비스가 실제로 생성될 때 로드 (콜드 스타트 단축)
+        import httpx
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient, APIConnectionError
+        
         # 환경 변수에서 직접 OpenAI API 키 가져오기 (시스템 환경 변수 우선)
         api_key = os.environ.get("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY")
         
         if not api_key or api_key == "your-api-key-here":
-            print("경고: 유효한 OPENAI_API_KEY가 환경 변수에 설정되지 않았습니다.")
+            logger.warning("유효한 OPENAI_API_KEY가 환경 변수에 설정되지 않았습니다.")
             api_key = None  # OpenAI 클라이언트가 기본값을 사용하도록
             
-        self.client = OpenAI(api_key=api_key)
         self.model = os.environ.get("OPENAI_MODEL") or os.getenv("OPENAI_MODEL", "gpt-4o-mini")
         
+        # 동시성 및 타임아웃 설정
+        # - OPENAI_MAX_CONCURRENCY: 워커 하나에서 동시에 진행할 수 있는 최대 API 호출 수
+        # - OPENAI_TIMEOUT: 호출 1건당 타임아웃(초, 동시성 대기 시간 포함)
+        self.max_concurrency = int(os.getenv("OPENAI_MAX_CONCURRENCY", "256"))
+        self.timeout = float(os.getenv("OPENAI_TIMEOUT", "30"))
+        max_keepalive = int(os.getenv("OPENAI_MAX_KEEPALIVE", "64"))
+        
+        # 모든 요청이 공유하는 커넥션 풀 (요청마다 새 연결을 맺지 않도록)
+        self.http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=max_keepalive
+            ),
+            timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 5.0))
+        )
+        
+        # 비동기 클라이언트 - 이벤트 루프를 블로킹하지 않음
+        # OPENAI_BASE_URL: API 주소 변경 (예: 부하 테스트용 benchmarks/fake_openai.py)
+        # 재시도는 UpstreamResilience가 담당하므로 클라이언트 자체 재시도는 끔
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=os.getenv("OPENAI_BASE_URL") or None,
+            http_client=self.http_client,
+            max_retries=0
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        # 여러 API 키/주소/모델에 분산하는 업스트림 풀 (OPENAI_UPSTREAMS, 없으면 위 단일 클라이언트 사용)
+        # 대상별 클라이언트도 같은 커넥션 풀을 공유 (httpx는 호스트별로 연결을 관리)
+        self.pool = UpstreamPool.from_env(
+            lambda key, base_url: AsyncOpenAI(api_key=key, base_url=base_url, http_client=self.http_client, max_retries=0),
+            self.model,
+            self.max_concurrency
+        )
+        
+        # 재시도/백오프, 서킷 브레이커, 헤지 요청 (OPENAI_RETRY_*, OPENAI_CIRCUIT_*, OPENAI_HEDGE_*)
+        self.resilience = UpstreamResilience.from_env(retryable_exceptions=(APIConnectionError,))
+        self.fallback_analyzer = fallback_analyzer
+        
+        # 배치 요청 설정
+        # - OPENAI_BATCH_CONCURRENCY: 배치 하나에서 동시에 처리할 최대 항목 수
+        # - OPENAI_BATCH_MAX_SIZE: 배치 하나에 허용되는 최대 항목 수
+        self.batch_concurrency = int(os.getenv("OPENAI_BATCH_CONCURRENCY", "32"))
+        self.batch_max_size = int(os.getenv("OPENAI_BATCH_MAX_SIZE", "500"))
+        
+        # 토큰 예산 기반 프롬프트 생성기
+        self.prompt_builder = PromptBuilder.from_env(self.model)
+        
+        # 응답 캐시 (OPENAI_CACHE_SIZE=0 이면 비활성화)
+        self.cache = ResponseCache.from_env()
+        
         # API 키 마스킹하여 로그 출력
         masked_key = "없음"
         if api_key:
             masked_key = api_key[:5] + "..." + "*" * 10
-        print(f"OpenAI 설정: 모델={self.model}, API 키={masked_key}")
+        logger.info("OpenAI 설정", extra={"model": self.model, "api_key": masked_key, "max_concurrency": self.max_concurrency, "timeout": self.timeout})
+        if self.pool is not None:
+            logger.info("업스트림 풀 설정", extra={"targets": [target.name for target in self.pool.targets]})
         
         # 모드별 프롬프트 템플릿
+        # 업스트림 프롬프트 접두사 캐시가 적중하도록 고정 지시문을 앞에, 요청마다 달라지는
+        # 감정/응답 유형/일기 본문을 뒤에 배치합니다.
         self.prompt_templates = {
-            "chat": "다음은 사용자의 일기입니다: {text}\n\n사용자가 선택한 감정은 '{emotion}'이며, 응답 유형은 '{response_type}'입니다.\n\n위 내용에 대해 선택된 감정과 응답 유형에 맞게 공감하며 대화하듯이 응답해주세요. 다음 형식으로 JSON 응답을 생성해주세요: {{\"detected_emotion\": \"{emotion}\", \"summary\": \"일기 내용 요약\", \"response\": \"공감하는 응답\"}}",
-            "analyze": "다음은 사용자의 일기입니다: {text}\n\n사용자가 선택한 감정은 '{emotion}'이며, 응답 유형은 '{response_type}'입니다.\n\n이 글에서 느껴지는 감정과 심리상태를 분석해주세요. 그리고 사용자가 선택한 응답 유형({response_type})에 맞는 답변을 제공해주세요. 다음 형식으로 JSON 응답을 생성해주세요: {{\"detected_emotion\": \"{emotion}\", \"summary\": \"분석 요약\", \"response\": \"상세 분석 내용\"}}",
-            "summarize": "다음은 사용자의 일기입니다: {text}\n\n사용자가 선택한 감정은 '{emotion}'이며, 응답 유형은 '{response_type}'입니다.\n\n이 내용을 간결하게 요약해주세요. 그리고 사용자가 선택한 응답 유형({response_type})에 맞는 답변을 제공해주세요. 다음 형식으로 JSON 응답을 생성해주세요: {{\"detected_emotion\": \"{emotion}\", \"summary\": \"일기 요약\", \"response\": \"요약에 대한 코멘트\"}}"
+            "chat": "사용자의 일기에 대해 사용자가 선택한 감정과 응답 유형에 맞게 공감하며 대화하듯이 응답해주세요. 다음 형식으로 JSON 응답을 생성해주세요: {{\"detected_emotion\": \"사용자가 선택한 감정\", \"summary\": \"일기 내용 요약\", \"response\": \"공감하는 응답\"}}\n\n사용자가 선택한 감정은 '{emotion}'이며, 응답 유형은 '{response_type}'입니다.\n\n다음은 사용자의 일기입니다: {text}",
+            "analyze": "사용자의 일기에서 느껴지는 감정과 심리상태를 분석해주세요. 그리고 사용자가 선택한 응답 유형에 맞는 답변을 제공해주세요. 다음 형식으로 JSON 응답을 생성해주세요: {{\"detected_emotion\": \"사용자가 선택한 감정\", \"summary\": \"분석 요약\", \"response\": \"상세 분석 내용\"}}\n\n사용자가 선택한 감정은 '{emotion}'이며, 응답 유형은 '{response_type}'입니다.\n\n다음은 사용자의 일기입니다: {text}",
+            "summarize": "사용자의 일기 내용을 간결하게 요약해주세요. 그리고 사용자가 선택한 응답 유형에 맞는 답변을 제공해주세요. 다음 형식으로 JSON 응답을 생성해주세요: {{\"detected_emotion\": \"사용자가 선택한 감정\", \"summary\": \"일기 요약\", \"response\": \"요약에 대한 코멘트\"}}\n\n사용자가 선택한 감정은 '{emotion}'이며, 응답 유형은 '{response_type}'입니다.\n\n다음은 사용자의 일기입니다: {text}"
         }
         
         # 감정 매핑 (한글 <-> 영어)
@@ -80,7 +174,78 @@ class OpenAIService:
             "advice": "당신은 일기장 앱을 사용하는 사용자와 대화하는 AI 비서입니다. 사용자의 상황과 감정에 기반하여 실용적인 조언과 해결책을 제공합니다. 공감도 중요하지만, 주로 사용자가 상황을 개선할 수 있는 구체적인 조언에 집중하세요."
         }
     
-    def generate_response(self, text, mode="chat", mood_id="neutral", response_type="comfort", context=""):
+    async def aclose(self):
+        """공유 HTTP 커넥션 풀을 정리합니다."""
+        # 업스트림 풀의 대상별 클라이언트도 같은 커넥션 풀을 사용하므로 한 번만 닫으면 됨
+        await self.client.close()
+        if self.cache is not None:
+            self.cache.close()
+    
+    async def _create_completion(self, system_message, prompt, max_tokens=500, temperature=0.7, labels=None, stage="upstream"):
+        """
+        동시성 제한, 재시도/서킷 브레이커/헤지 요청을 적용하여 Chat Completions API를 호출합니다.
+        
+        타임아웃(OPENAI_TIMEOUT)은 세마포어 대기, 재시도, 백오프를 모두 포함합니다.
+        labels(journal_labels)가 주어지면 시도별 업스트림 대기 시간, 진행 중인 호출 수, 토큰 사용량을 기록합니다.
+        """
+        async def _attempt():
+            async with self._semaphore:
+                if labels is None:
+                    return await self._request_completion(system_message, prompt, max_tokens, temperature)
+                
+                # 세마포어 대기 시간은 제외하고 업스트림 응답 시간만 기록
+                start = time.perf_counter()
+                UPSTREAM_IN_FLIGHT.inc(labels)
+                try:
+                    response = await self._request_completion(system_message, prompt, max_tokens, temperature)
+                finally:
+                    UPSTREAM_IN_FLIGHT.dec(labels)
+                    observe_stage(stage, labels, start)
+                record_usage(response.usage, labels)
+                return response
+        
+        # 헤지 요청은 일기 응답 생성에만 사용 (청크 요약은 동시에 여러 건이 나가므로 제외)
+        return await self.resilience.call(_attempt, self._upstream_budget(), hedge=(stage == "upstream"))
+    
+    def _upstream_budget(self):
+        """
+        업스트림 호출에 사용할 시간 예산(초)을 반환합니다.
+        
+        클라이언트가 보낸 마감 시각(X-Request-Timeout-Ms 등)이 있으면 남은 예산으로 줄이고,
+        이미 지났으면 업스트림을 호출하지 않도록 DeadlineExceededError를 발생시킵니다.
+        """
+        remaining = deadline_remaining()
+        if remaining is None:
+            return self.timeout
+        if remaining <= 0:
+            ADMISSION_REJECTIONS.inc(("deadline_exceeded",))
+            raise DeadlineExceededError("클라이언트 응답 대기 시간이 지나 업스트림 호출을 생략했습니다")
+        return min(self.timeout, remaining)
+    
+    async def _request_completion(self, system_message, prompt, max_tokens, temperature):
+        return await self._chat_completion(
+            messages=[
+                {"role": "system", "content": system_message},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+    
+    async def _chat_completion(self, **kwargs):
+        """
+        Chat Completions API를 한 번 호출합니다.
+        
+        업스트림 풀이 설정되어 있으면 대상을 골라 그 대상의 클라이언트와 모델로 호출합니다
+        (스트리밍은 첫 응답까지를 대상의 지연 시간으로 기록).
+        """
+        if self.pool is None:
+            return await self.client.chat.completions.create(model=self.model, timeout=self.timeout, **kwargs)
+        return await self.pool.call(
+            lambda target: target.client.chat.completions.create(model=target.model, timeout=self.timeout, **kwargs)
+        )
+    
+    async def generate_response(self, text, mode="chat", mood_id="neutral", response_type="comfort", context=""):
         """
         입력된 텍스트에 대한 OpenAI 응답 생성
         
@@ -93,83 +258,384 @@ class OpenAIService:
             
         Returns:
             dict: 감지된 감정, 요약, 응답을 포함한 딕셔너리
+            
+        Raises:
+            UpstreamError: 재시도할 수 없는 업스트림 오류(인증, 잘못된 요청 등, 502) 또는
+                           대체 응답 없이 업스트림 장애가 발생한 경우 (503)
         """
-        print(f"OpenAI 요청 시작: mode={mode}, mood_id={mood_id}, response_type={response_type}")
+        logger.debug("OpenAI 요청 시작", extra={"mode": mode, "mood_id": mood_id, "response_type": response_type})
         
         if not text:
-            print("경고: 빈 텍스트가 입력되었습니다.")
+            logger.warning("빈 텍스트가 입력되었습니다.")
             return {
                 "detected_emotion": "알 수 없음",
                 "summary": "텍스트가 입력되지 않았습니다.",
                 "response": "텍스트를 입력해주세요."
             }
         
+        try:
+            return await self._generate_cached(text, mode, mood_id, response_type, context)
+        except Exception as e:
+            reason = self._fallback_reason(e)
+            if reason is None:
+                logger.exception(f"OpenAI API 오류: {e}")
+                raise self._upstream_error(e, reason) from e
+            
+            logger.warning(f"OpenAI 업스트림 장애, 대체 응답 사용: {e}", extra={"reason": reason, "timeout": self.timeout})
+            return await self._fallback_response(text, mood_id, response_type, reason, e)
+    
+    def _fallback_reason(self, error):
+        """업스트림 장애로 대체 응답을 사용할 오류면 사유를, 아니면 None을 반환합니다."""
+        if isinstance(error, CircuitOpenError):
+            return "circuit_open"
+        if isinstance(error, DeadlineExceededError):
+            return "deadline"
+        if isinstance(error, asyncio.TimeoutError):
+            return "timeout"
+        if self.resilience.retry_policy.classify(error) is not None:
+            return "upstream_error"
+        return None
+    
+    @staticmethod
+    def _upstream_error(error, reason):
+        """업스트림 장애(reason이 있으면 503)와 재시도할 수 없는 오류(502)를 UpstreamError로 변환합니다."""
+        return UpstreamError(str(error) or type(error).__name__, status_code=502 if reason is None else 503)
+    
+    async def _fallback_response(self, text, mood_id, response_type, reason, error):
+        """
+        업스트림 장애 시 EmotionAnalyzer의 템플릿 응답을 반환합니다.
+        
+        Raises:
+            UpstreamError: fallback_analyzer가 없는 경우 (503)
+        """
+        if self.fallback_analyzer is None:
+            raise self._upstream_error(error, reason) from error
+        FALLBACK_RESPONSES.inc((reason,))
+        # EmotionAnalyzer의 모드는 OpenAI 경로의 응답 유형(comfort/fact/advice)에 해당
+        return await self.fallback_analyzer.analyze_async(text, mood_id, response_type)
+    
+    async def _generate_cached(self, text, mode, mood_id, response_type, context):
+        """
+        캐시를 거쳐 응답을 생성합니다. API 오류는 호출자에게 그대로 전달됩니다.
+        """
+        if self.cache is None:
+            return await self._generate(text, mode, mood_id, response_type, context)
+        
+        # 동일한 요청은 캐시 또는 진행 중인 호출 결과를 재사용
+        cache_key = self.cache.make_key(text, mode, mood_id, response_type, context, self.model)
+        return await self.cache.get_or_compute(
+            cache_key,
+            lambda: self._generate(text, mode, mood_id, response_type, context)
+        )
+    
+    async def generate_batch(self, entries, max_concurrency=None):
+        """
+        여러 일기를 동시성 제한 하에 병렬로 처리합니다.
+        
+        Args:
+            entries: generate_response() 인자(text, mode, mood_id, response_type, context)를 담은 dict 목록
+            max_concurrency: 배치 내 최대 동시 호출 수 (OPENAI_BATCH_CONCURRENCY 이하로 제한)
+            
+        Returns:
+            list: 입력 순서와 동일한 항목별 결과
+                  {"index", "success", "result", "error", "status"}
+                  실패 항목의 error는 UpstreamError.detail과 같은 고정 안내 문구이고,
+                  status는 /generate가 반환할 상태 코드입니다 (원인 오류는 로그에만 기록).
+        """
+        limit = self.batch_concurrency
+        if max_concurrency:
+            limit = max(1, min(max_concurrency, self.batch_concurrency))
+        semaphore = asyncio.Semaphore(limit)
+        
+        logger.info("OpenAI 배치 요청 시작", extra={"items": len(entries), "concurrency": limit})
+        
+        async def _run(index, entry):
+            if not entry.get("text"):
+                return {"index": index, "success": False, "result": None, "error": "텍스트가 입력되지 않았습니다.", "status": 400}
+            
+            async with semaphore:
+                try:
+                    result = await self._generate_cached(
+                        entry["text"],
+                        entry.get("mode", "chat"),
+                        entry.get("mood_id", "neutral"),
+                        entry.get("response_type", "comfort"),
+                        entry.get("context", "")
+                    )
+                    return {"index": index, "success": True, "result": result, "error": None, "status": 200}
+                except Exception as e:
+                    # 원인 오류는 로그에만 남기고 결과에는 고정 안내 문구와 상태 코드만 포함
+                    error = self._upstream_error(e, self._fallback_reason(e))
+                    logger.warning(f"OpenAI 배치 항목 오류: {e}", extra={"index": index, "status": error.status_code})
+                    return {"index": index, "success": False, "result": None, "error": error.detail, "status": error.status_code}
+        
+        # gather는 입력 순서대로 결과를 반환
+        results = await asyncio.gather(*(_run(i, entry) for i, entry in enumerate(entries)))
+        
+        failed = sum(1 for item in results if not item["success"])
+        logger.info("OpenAI 배치 요청 완료", extra={"succeeded": len(results) - failed, "failed": failed})
+        return results
+    
+    async def stream_response(self, text, mode="chat", mood_id="neutral", response_type="comfort", context=""):
+        """
+        OpenAI 응답을 스트리밍으로 생성합니다.
+        
+        Args:
+            generate_response()와 동일
+            
+        Yields:
+            tuple: (이벤트명, 데이터)
+                - ("token", {"delta": 수신한 토큰 텍스트})
+                - ("field", {"name": 필드명, "value": 값}) - JSON 필드가 완성될 때마다
+                - ("error", {"message": 안내 문구, "status": HTTP 상태 코드}) - 오류 시 마지막에 한 번
+                - ("done", 최종 응답 dict) - 정상 완료 시 마지막에 한 번 (error 이후에는 전송하지 않음)
+        """
+        logger.debug("OpenAI 스트리밍 요청 시작", extra={"mode": mode, "mood_id": mood_id, "response_type": response_type})
+        
+        if not text:
+            logger.warning("빈 텍스트가 입력되었습니다.")
+            yield "done", {
+                "detected_emotion": "알 수 없음",
+                "summary": "텍스트가 입력되지 않았습니다.",
+                "response": "텍스트를 입력해주세요."
+            }
+            return
+        
+        emotion_kr = self.emotion_map.get(mood_id, "보통")
+        
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(text, mode, mood_id, response_type, context, self.model)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                for name in self.RESPONSE_FIELDS:
+                    yield "field", {"name": name, "value": cached[name]}
+                yield "done", cached
+                return
+        
+        labels = journal_labels(mode, mood_id, response_type)
+        parser = IncrementalJSONFieldParser(self.RESPONSE_FIELDS)
+        upstream_start = None
+        try:
+            # 긴 일기는 이 단계에서 청크 요약을 거침
+            start = time.perf_counter()
+            system_message, prompt, emotion_kr = await self._build_prompt(text, mode, mood_id, response_type, context, labels)
+            observe_stage("prompt_build", labels, start)
+            
+            async with self._semaphore:
+                upstream_start = time.perf_counter()
+                UPSTREAM_IN_FLIGHT.inc(labels)
+                # 연결(첫 응답) 단계만 재시도/서킷 브레이커 적용, 토큰 수신 이후에는 재시도하지 않음
+                stream = await self.resilience.call(
+                    lambda: self._chat_completion(
+                        messages=[
+                            {"role": "system", "content": system_message},
+                            {"role": "user", "content": prompt}
+                        ],
+                        temperature=0.7,
+                        max_tokens=500,
+                        stream=True,
+                        stream_options={"include_usage": True}  # 마지막 청크로 토큰 사용량 수신
+                    ),
+                    self._upstream_budget()
+                )
+                
+                chunks = stream.__aiter__()
+                while True:
+                    # 토큰 사이 대기 시간에 타임아웃 적용
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=self.timeout)
+                    except StopAsyncIteration:
+                        break
+                    
+                    if not chunk.choices:
+                        record_usage(getattr(chunk, "usage", None), labels)
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if not delta:
+                        continue
+                    
+                    yield "token", {"delta": delta}
+                    for name, value in parser.feed(delta):
+                        # 감정값은 사용자가 선택한 감정 우선
+                        if name == "detected_emotion":
+                            value = emotion_kr
+                        yield "field", {"name": name, "value": value}
+        except Exception as e:
+            if upstream_start is not None:
+                UPSTREAM_IN_FLIGHT.dec(labels)
+                upstream_start = None
+            
+            reason = self._fallback_reason(e)
+            if reason is not None and not parser.text and self.fallback_analyzer is not None:
+                # 토큰을 받기 전에 업스트림 장애가 확인되면 템플릿 응답으로 대체
+                logger.warning(f"OpenAI 업스트림 장애, 대체 응답 사용: {e}", extra={"reason": reason})
+                result = await self._fallback_response(text, mood_id, response_type, reason, e)
+                for name in self.RESPONSE_FIELDS:
+                    yield "field", {"name": name, "value": result[name]}
+                yield "done", result
+                return
+            
+            # 원인 오류는 로그에만 남기고 클라이언트에는 고정 안내 문구 전달
+            error = self._upstream_error(e, reason)
+            logger.warning(f"OpenAI 스트리밍 오류: {e}", extra={"status": error.status_code})
+            yield "error", {"message": error.detail, "status": error.status_code}
+            return
+        finally:
+            # 클라이언트 연결 종료로 제너레이터가 닫힌 경우에도 진행 중 카운트 정리
+            if upstream_start is not None:
+                UPSTREAM_IN_FLIGHT.dec(labels)
+        
+        observe_stage("upstream", labels, upstream_start)
+        response_text = parser.text.strip()
+        logger.info("OpenAI 스트리밍 응답 완료", extra={"response_length": len(response_text), "sampled": True})
+        
+        # 이미 보낸 field 이벤트와 같은 값으로 최종 결과 구성 (코드 블록/설명 문구로 감싼 JSON도 그대로 사용)
+        # 완성되지 않은 필드만 전체 응답 파싱 결과(JSON이 아니면 구조화된 응답)로 채움
+        start = time.perf_counter()
+        missing = [name for name in self.RESPONSE_FIELDS if name not in parser.completed]
+        parsed = self._parse_response(response_text, mode, emotion_kr, labels) if missing else {}
+        result = {name: parser.completed[name] if name in parser.completed else parsed[name] for name in self.RESPONSE_FIELDS}
+        # 감정값은 사용자가 선택한 감정 우선
+        result["detected_emotion"] = emotion_kr
+        observe_stage("parse", labels, start)
+        for name in missing:
+            yield "field", {"name": name, "value": result[name]}
+        
+        if cache_key is not None:
+            await self.cache.set(cache_key, result)
+        
+        yield "done", result
+    
+    async def _build_prompt(self, text, mode, mood_id, response_type, context, labels=None):
+        """
+        시스템 메시지와 사용자 프롬프트를 생성합니다.
+        
+        일기 본문이 토큰 예산을 초과하면 청크별 요약으로 줄인 본문을 사용합니다.
+        
+        Returns:
+            tuple: (system_message, prompt, emotion_kr)
+        """
         # 감정과 응답 유형 한글 변환
         emotion_kr = self.emotion_map.get(mood_id, "보통")
         response_type_kr = self.response_type_map.get(response_type, "위로")
         
+        if self.prompt_builder.needs_reduction(text):
+            text = await self._reduce_long_text(text, labels)
+        
+        # 시스템 메시지 선택
+        system_message = self.system_messages.get(response_type, self.system_messages["comfort"])
+        
         # 프롬프트 생성
-        prompt = self.prompt_templates.get(mode, self.prompt_templates["chat"]).format(
-            text=text, 
+        system_message, prompt = self.prompt_builder.build(
+            system_message,
+            self.prompt_templates.get(mode, self.prompt_templates["chat"]),
+            text=text,
             emotion=emotion_kr,
-            response_type=response_type_kr
+            response_type=response_type_kr,
+            context=context
         )
         
-        if context:
-            prompt += f"\n추가 컨텍스트: {context}"
-        
-        # 시스템 메시지 선택
-        system_message = self.system_messages.get(response_type, self.system_messages["comfort"])
+        return system_message, prompt, emotion_kr
+    
+    async def _reduce_long_text(self, text, labels=None):
+        """
+        긴 일기를 청크로 나누어 동시에 요약(map)하고, 요약본을 합쳐(reduce) 반환합니다.
+        """
+        chunks = self.prompt_builder.split_chunks(text)
+        logger.info("긴 일기 요약 시작", extra={"text_length": len(text), "chunks": len(chunks)})
         
-        try:
-            print(f"OpenAI API 호출: 모델={self.model}, 텍스트 길이={len(text)}, 감정={emotion_kr}, 응답유형={response_type_kr}")
-            
-            # OpenAI API 호출 - 최신 클라이언트 사용
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=500
+        async def _summarize(index, chunk):
+            system_message, prompt = self.prompt_builder.build_chunk_prompt(chunk, index, len(chunks))
+            response = await self._create_completion(
+                system_message,
+                prompt,
+                max_tokens=self.prompt_builder.chunk_summary_tokens,
+                temperature=0.3,
+                labels=labels,
+                stage="chunk_upstream"
             )
+            return response.choices[0].message.content.strip()
+        
+        summaries = await asyncio.gather(*(_summarize(i, chunk) for i, chunk in enumerate(chunks, 1)))
+        return self.prompt_builder.join_summaries(summaries)
+    
+    async def summarize_conversation(self, summary, turns, labels=None):
+        """
+        이전 누적 요약과 대화 턴들을 합쳐 새 누적 요약을 생성합니다 (SessionStore의 백그라운드 요약용).
+        
+        Args:
+            summary: 이전 누적 요약 (없으면 빈 문자열)
+            turns: [(사용자 일기, 응답)] 목록
+            labels: 메트릭 레이블
             
-            # 응답 텍스트 추출
-            response_text = response.choices[0].message.content.strip()
-            print(f"OpenAI 응답 받음: 응답 길이={len(response_text)}")
+        Returns:
+            str: 새 누적 요약
+        """
+        system_message, prompt = self.prompt_builder.build_conversation_summary_prompt(summary, turns)
+        response = await self._create_completion(
+            system_message,
+            prompt,
+            max_tokens=self.prompt_builder.conversation_summary_tokens,
+            temperature=0.3,
+            labels=labels,
+            stage="session_summary"
+        )
+        return response.choices[0].message.content.strip()
+    
+    async def _generate(self, text, mode, mood_id, response_type, context):
+        """
+        OpenAI API를 호출하여 구조화된 응답을 생성합니다. API 오류는 호출자에게 그대로 전달됩니다.
+        """
+        labels = journal_labels(mode, mood_id, response_type)
+        
+        start = time.perf_counter()
+        system_message, prompt, emotion_kr = await self._build_prompt(text, mode, mood_id, response_type, context, labels)
+        observe_stage("prompt_build", labels, start)
+        
+        logger.debug("OpenAI API 호출", extra={"model": self.model, "text_length": len(text), "emotion": emotion_kr, "response_type": response_type})
+        
+        # OpenAI API 호출 - 비동기 클라이언트 사용
+        response = await self._create_completion(system_message, prompt, labels=labels)
+        
+        # 응답 텍스트 추출
+        response_text = response.choices[0].message.content.strip()
+        logger.debug("OpenAI 응답 받음", extra={"response_length": len(response_text)})
+        
+        start = time.perf_counter()
+        result = self._parse_response(response_text, mode, emotion_kr, labels)
+        observe_stage("parse", labels, start)
+        return result
+    
+    def _parse_response(self, response_text, mode, emotion_kr, labels=None):
+        """
+        모델 응답 텍스트를 파싱하고, JSON 형식이 아니면 구조화된 응답으로 변환합니다.
+        
+        변환한 경우 labels(journal_labels) 기준으로 파싱 폴백 횟수를 기록합니다.
+        """
+        # API가 JSON 형식으로 응답하지 않은 경우 처리
+        try:
+            # JSON 응답을 파싱해봅니다
+            json_response = json.loads(response_text)
             
-            # API가 JSON 형식으로 응답하지 않은 경우 처리
-            try:
-                # JSON 응답을 파싱해봅니다
-                import json
-                json_response = json.loads(response_text)
-                
-                # JSON 파싱에 성공했으면 필요한 필드 확인
-                if "detected_emotion" in json_response and "summary" in json_response and "response" in json_response:
-                    # 감정값 표준화 - 하지만 사용자가 선택한 감정 우선
-                    json_response["detected_emotion"] = emotion_kr
-                    print("OpenAI 응답 처리 완료: JSON 형식 응답 사용")
-                    return json_response
-                else:
-                    # 필드 누락된 경우 수동 생성
-                    print("경고: OpenAI 응답이 필요한 필드를 포함하지 않음, 구조화된 응답으로 변환")
-                    return self._generate_structured_response(response_text, mode, emotion_kr)
-            except json.JSONDecodeError as e:
-                # JSON 파싱에 실패한 경우 수동 생성
-                print(f"경고: OpenAI 응답이 유효한 JSON이 아님, 구조화된 응답으로 변환: {e}")
+            # JSON 파싱에 성공했으면 필요한 필드 확인
+            if isinstance(json_response, dict) and "detected_emotion" in json_response and "summary" in json_response and "response" in json_response:
+                # 감정값 표준화 - 하지만 사용자가 선택한 감정 우선
+                json_response["detected_emotion"] = emotion_kr
+                logger.debug("OpenAI 응답 처리 완료: JSON 형식 응답 사용")
+                return json_response
+            else:
+                # 필드 누락된 경우 수동 생성
+                logger.warning("OpenAI 응답이 필요한 필드를 포함하지 않음, 구조화된 응답으로 변환")
+                if labels is not None:
+                    PARSE_FALLBACKS.inc(("missing_fields",) + labels)
                 return self._generate_structured_response(response_text, mode, emotion_kr)
-            
-        except Exception as e:
-            error_detail = traceback.format_exc()
-            print(f"OpenAI API 오류: {e}")
-            print(f"상세 오류 내용:\n{error_detail}")
-            
-            return {
-                "detected_emotion": emotion_kr,
-                "summary": "응답 생성 중 오류가 발생했습니다.",
-                "response": f"응답 생성 중 오류가 발생했습니다: {str(e)}"
-            }
+        except json.JSONDecodeError as e:
+            # JSON 파싱에 실패한 경우 수동 생성
+            logger.warning(f"OpenAI 응답이 유효한 JSON이 아님, 구조화된 응답으로 변환: {e}")
+            if labels is not None:
+                PARSE_FALLBACKS.inc(("invalid_json",) + labels)
+            return self._generate_structured_response(response_text, mode, emotion_kr)
     
     def _generate_structured_response(self, text, mode, emotion):
         """
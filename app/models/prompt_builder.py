@@ -0,0 +1,163 @@
+import os
+import re
+import math
+
+# 문장/문단 경계 (마침표, 물음표, 느낌표, 줄바꿈 뒤의 공백)
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?。！？\n])\s+")
+
+
+class TokenCounter:
+    """
+    프롬프트 토큰 수 계산기
+
+    tiktoken이 설치되어 있으면 모델 인코딩으로 정확히 계산하고,
+    없으면 문자 종류별 근사치(영문 약 4자당 1토큰, 한글 등 비ASCII 문자 1자당 1토큰)를 사용합니다.
+    """
+
+    def __init__(self, model=None):
+        self._encoding = None
+        try:
+            import tiktoken
+            try:
+                self._encoding = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("o200k_base")
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("o200k_base")
+        except ImportError:
+            pass
+
+    @property
+    def exact(self):
+        return self._encoding is not None
+
+    def count(self, text):
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+
+        ascii_chars = sum(1 for ch in text if ch.isascii())
+        return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+class PromptBuilder:
+    """
+    토큰 예산 기반 프롬프트 생성기
+
+    - 시스템 메시지와 템플릿의 고정 부분을 프롬프트 앞쪽에 두어, 요청마다 바이트 단위로 동일한
+      접두사가 유지되도록 합니다 (업스트림 프롬프트 접두사 캐시 적중용).
+    - 예산을 초과하는 긴 일기는 청크로 나누어 각각 요약(map)한 뒤, 요약본을 합쳐(reduce)
+      최종 프롬프트에 사용합니다. 청크 요약은 동시에 실행되므로 지연 시간은 청크 하나 기준입니다.
+    """
+
+    # 청크 요약용 고정 프롬프트 (접두사 캐시 적중을 위해 변하지 않는 부분을 앞에 배치)
+    CHUNK_SYSTEM_MESSAGE = "당신은 일기장 앱의 요약 도우미입니다. 긴 일기의 일부 구간을 받아, 사건과 감정, 심리 상태를 빠짐없이 간결하게 요약합니다."
+    CHUNK_PROMPT_PREFIX = "다음은 긴 일기의 한 구간입니다. 등장한 사건, 감정, 생각을 중심으로 3~5문장으로 요약해주세요. 요약문만 출력하세요.\n\n구간 {index}/{total}:\n"
+    REDUCED_TEXT_HEADER = "(긴 일기를 구간별로 요약한 내용입니다)\n"
+
+    # 대화 세션 누적 요약용 고정 프롬프트
+    CONVERSATION_SYSTEM_MESSAGE = "당신은 일기장 앱의 대화 기록 요약 도우미입니다. 사용자와 AI 비서의 대화를 이후 대화에 필요한 맥락만 남겨 간결하게 요약합니다."
+    CONVERSATION_PROMPT_PREFIX = "이전 요약과 새 대화를 합쳐 하나의 요약으로 갱신해주세요. 사용자가 겪은 사건, 감정의 변화, 이미 받은 조언을 중심으로 5문장 이내로 작성하고 요약문만 출력하세요.\n\n"
+
+    def __init__(self, max_input_tokens=2000, chunk_tokens=1500, max_chunks=8, chunk_summary_tokens=200,
+                 conversation_summary_tokens=300, counter=None):
+        self.max_input_tokens = max_input_tokens
+        self.chunk_tokens = chunk_tokens
+        self.max_chunks = max_chunks
+        self.chunk_summary_tokens = chunk_summary_tokens
+        self.conversation_summary_tokens = conversation_summary_tokens
+        self.counter = counter or TokenCounter()
+
+    @classmethod
+    def from_env(cls, model=None):
+        """
+        환경 변수 설정으로 생성기를 만듭니다.
+
+        - PROMPT_MAX_INPUT_TOKENS: 일기 본문에 허용되는 최대 토큰 수 (기본값: 2000)
+        - PROMPT_CHUNK_TOKENS: 청크 하나의 목표 토큰 수 (기본값: 1500)
+        - PROMPT_MAX_CHUNKS: 최대 청크 수, 초과 시 청크 크기를 늘림 (기본값: 8)
+        - PROMPT_CHUNK_SUMMARY_TOKENS: 청크 요약의 max_tokens (기본값: 200)
+        - PROMPT_CONVERSATION_SUMMARY_TOKENS: 대화 세션 누적 요약의 max_tokens (기본값: 300)
+        """
+        return cls(
+            max_input_tokens=int(os.getenv("PROMPT_MAX_INPUT_TOKENS", "2000")),
+            chunk_tokens=int(os.getenv("PROMPT_CHUNK_TOKENS", "1500")),
+            max_chunks=int(os.getenv("PROMPT_MAX_CHUNKS", "8")),
+            chunk_summary_tokens=int(os.getenv("PROMPT_CHUNK_SUMMARY_TOKENS", "200")),
+            conversation_summary_tokens=int(os.getenv("PROMPT_CONVERSATION_SUMMARY_TOKENS", "300")),
+            counter=TokenCounter(model)
+        )
+
+    def count_tokens(self, text):
+        return self.counter.count(text)
+
+    def needs_reduction(self, text):
+        """본문이 토큰 예산을 초과하는지 확인합니다."""
+        # 근사치로도 예산의 절반에 못 미치면 정확한 계산 생략
+        if len(text) * 2 < self.max_input_tokens:
+            return False
+        return self.count_tokens(text) > self.max_input_tokens
+
+    def split_chunks(self, text):
+        """
+        본문을 문장 경계 기준으로 토큰 예산 이하의 청크로 나눕니다.
+
+        청크 수가 max_chunks를 넘지 않도록 필요하면 청크 크기를 늘립니다.
+        """
+        total_tokens = self.count_tokens(text)
+        budget = max(self.chunk_tokens, math.ceil(total_tokens / self.max_chunks))
+
+        chunks = []
+        current = []
+        current_tokens = 0
+        for sentence in self._split_sentences(text, budget):
+            tokens = self.count_tokens(sentence)
+            if current and current_tokens + tokens > budget:
+                chunks.append(" ".join(current))
+                current = []
+                current_tokens = 0
+            current.append(sentence)
+            current_tokens += tokens
+        if current:
+            chunks.append(" ".join(current))
+        return chunks
+
+    def _split_sentences(self, text, budget):
+        for sentence in _SENTENCE_BOUNDARY.split(text.strip()):
+            if not sentence:
+                continue
+            tokens = self.count_tokens(sentence)
+            if tokens <= budget:
+                yield sentence
+                continue
+            # 문장 하나가 예산보다 길면 글자 수 비율로 자름
+            step = max(1, len(sentence) * budget // tokens)
+            for start in range(0, len(sentence), step):
+                yield sentence[start:start + step]
+
+    def build_chunk_prompt(self, chunk, index, total):
+        """청크 요약 요청의 (시스템 메시지, 프롬프트)를 생성합니다."""
+        return self.CHUNK_SYSTEM_MESSAGE, self.CHUNK_PROMPT_PREFIX.format(index=index, total=total) + chunk
+
+    def join_summaries(self, summaries):
+        """청크 요약들을 최종 프롬프트에 넣을 본문으로 합칩니다."""
+        return self.REDUCED_TEXT_HEADER + "\n".join(
+            f"[{index}] {summary.strip()}" for index, summary in enumerate(summaries, 1)
+        )
+
+    def build_conversation_summary_prompt(self, summary, turns):
+        """대화 세션 누적 요약 요청의 (시스템 메시지, 프롬프트)를 생성합니다."""
+        prompt = self.CONVERSATION_PROMPT_PREFIX + f"이전 요약: {summary or '(없음)'}\n\n새 대화:\n"
+        prompt += "\n".join(f"사용자: {text}\n응답: {response}" for text, response in turns)
+        return self.CONVERSATION_SYSTEM_MESSAGE, prompt
+
+    def build(self, system_message, template, text, emotion, response_type, context=""):
+        """
+        최종 (시스템 메시지, 프롬프트)를 생성합니다.
+
+        템플릿은 고정 지시문이 앞에, 감정/응답 유형/일기 본문이 뒤에 오도록 작성되어 있어야
+        요청 간 접두사가 동일하게 유지됩니다. 추가 컨텍스트는 항상 맨 뒤에 붙입니다.
+        """
+        prompt = template.format(text=text, emotion=emotion, response_type=response_type)
+        if context:
+            prompt += f"\n추가 컨텍스트: {context}"
+        return system_message, prompt
@@ -0,0 +1,288 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import contextvars
+import unicodedata
+from collections import OrderedDict
+
+from app.core.admission import deadline_remaining, DeadlineExceededError
+
+
+class SQLiteCacheBackend:
+    """
+    재시작 후에도 유지되는 SQLite 기반 디스크 캐시 저장소
+
+    여러 워커 프로세스가 같은 파일을 열면 프로세스 간 공유 캐시로 동작합니다
+    (/dev/shm 같은 tmpfs에 두면 디스크 I/O 없이 공유 메모리 캐시로 사용 가능).
+    max_entries를 넘으면 만료 시각이 가장 이른 항목부터 제거합니다.
+    """
+
+    # 정리 작업은 set() 호출 이 횟수마다 한 번 실행
+    TRIM_EVERY = 256
+
+    def __init__(self, path, max_entries=None):
+        self.path = path
+        self.max_entries = max_entries
+        self._sets = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS response_cache_expires_at_idx ON response_cache (expires_at)"
+        )
+
+    def get(self, key):
+        """만료되지 않은 값을 반환하고, 없으면 None을 반환합니다."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at <= time.time():
+                self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                return None
+        return json.loads(value), expires_at
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), expires_at)
+            )
+            self._sets += 1
+            if self._sets % self.TRIM_EVERY == 0:
+                self._trim()
+
+    def _trim(self):
+        self._conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (time.time(),))
+        if self.max_entries:
+            self._conn.execute(
+                "DELETE FROM response_cache WHERE key IN ("
+                "SELECT key FROM response_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def purge_expired(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (time.time(),))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """
+    LRU + TTL 응답 캐시
+
+    - 메모리 계층: OrderedDict 기반 LRU, 항목별 만료 시간(TTL) 적용
+    - 디스크 계층(선택): SQLite 파일에 저장하여 재시작 후에도 재사용.
+      멀티 워커 배포에서는 워커들이 같은 파일을 공유하므로 한 워커가 만든 응답을 다른 워커도 재사용
+    - 단일 비행(single-flight): 같은 키로 동시에 들어온 요청은 업스트림 호출 1건을 공유
+    """
+
+    def __init__(self, max_size=1024, ttl=3600, disk_path=None, disk_max_entries=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._inflight = {}  # key -> asyncio.Task
+        self._disk = SQLiteCacheBackend(disk_path, disk_max_entries) if disk_path else None
+
+        # 튜닝용 카운터
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_env(cls):
+        """환경 변수 설정으로 캐시를 생성합니다. 크기가 0이면 None을 반환합니다."""
+        max_size = int(os.getenv("OPENAI_CACHE_SIZE", "1024"))
+        if max_size <= 0:
+            return None
+        ttl = float(os.getenv("OPENAI_CACHE_TTL", "3600"))
+        disk_path = os.getenv("OPENAI_CACHE_PATH") or None
+        disk_max_entries = int(os.getenv("OPENAI_CACHE_DISK_MAX_ENTRIES", "100000"))
+        return cls(max_size=max_size, ttl=ttl, disk_path=disk_path, disk_max_entries=disk_max_entries)
+
+    @staticmethod
+    def make_key(text, mode, mood_id, response_type, context, model):
+        """
+        정규화된 (text, mode, mood_id, response_type, context, model) 튜플로 캐시 키를 생성합니다.
+
+        유니코드 정규화(NFC)와 공백 정리를 적용하여 재전송된 동일 일기가 같은 키를 갖도록 합니다.
+        """
+        def _normalize_text(value):
+            return " ".join(unicodedata.normalize("NFC", value or "").split())
+
+        def _normalize_option(value):
+            return (value or "").strip().lower()
+
+        payload = json.dumps([
+            _normalize_text(text),
+            _normalize_option(mode),
+            _normalize_option(mood_id),
+            _normalize_option(response_type),
+            _normalize_text(context),
+            model
+        ], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _get_memory(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_memory(self, key, value, expires_at):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_compute(self, key, factory):
+        """
+        캐시된 값을 반환하거나, 없으면 factory()를 한 번만 실행하여 결과를 캐시합니다.
+
+        Args:
+            key: make_key()로 생성한 캐시 키
+            factory: 결과 dict를 반환하는 코루틴 함수. None을 반환하면 캐시하지 않음
+
+        Returns:
+            dict: 호출자별 사본
+
+        Raises:
+            DeadlineExceededError: 호출자의 마감 시각(request_deadline)이 이미 지났거나 (factory를 실행하지 않음)
+                                   마감 시각까지 결과가 나오지 않은 경우 (공유 작업은 다른 대기자를 위해 계속 진행)
+        """
+        value = self._get_memory(key)
+        if value is not None:
+            self.hits += 1
+            return dict(value)
+
+        # 마감 시각이 지난 호출자는 아무도 기다리지 않을 업스트림 호출을 시작하지 않음
+        remaining = deadline_remaining()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceededError("요청 마감 시각이 지났습니다")
+
+        task = self._inflight.get(key)
+        if task is not None:
+            # 이미 같은 키로 진행 중인 업스트림 호출에 합류
+            self.coalesced += 1
+        else:
+            # 공유 작업이 첫 호출자의 마감 시각(request_deadline)을 물려받지 않도록 빈 컨텍스트에서 생성
+            task = contextvars.Context().run(asyncio.ensure_future, self._compute(key, factory))
+            task.add_done_callback(self._on_task_done)
+            self._inflight[key] = task
+
+        # 선행 요청이 취소되어도 공유 작업은 계속 진행되도록 shield 적용,
+        # 마감 시각은 호출자마다 따로 적용
+        if remaining is None:
+            value = await asyncio.shield(task)
+        else:
+            try:
+                value = await asyncio.wait_for(asyncio.shield(task), timeout=remaining)
+            except asyncio.TimeoutError:
+                if task.done() and not task.cancelled() and task.exception() is not None:
+                    raise
+                raise DeadlineExceededError("요청 마감 시각까지 응답이 생성되지 않았습니다")
+        return dict(value) if value is not None else None
+
+    async def get(self, key):
+        """
+        캐시된 값을 조회합니다 (메모리 → 디스크 순). 없으면 None을 반환합니다.
+        """
+        value = self._get_memory(key)
+        if value is None and self._disk is not None:
+            cached = await asyncio.to_thread(self._disk.get, key)
+            if cached is not None:
+                value, expires_at = cached
+                self.disk_hits += 1
+                self._set_memory(key, value, expires_at)
+
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return dict(value)
+
+    async def set(self, key, value):
+        """값을 캐시에 저장합니다."""
+        expires_at = time.time() + self.ttl
+        self._set_memory(key, value, expires_at)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.set, key, value, expires_at)
+
+    async def _compute(self, key, factory):
+        try:
+            if self._disk is not None:
+                cached = await asyncio.to_thread(self._disk.get, key)
+                if cached is not None:
+                    value, expires_at = cached
+                    self.hits += 1
+                    self.disk_hits += 1
+                    self._set_memory(key, value, expires_at)
+                    return value
+
+            self.misses += 1
+            value = await factory()
+            if value is not None:
+                await self.set(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    @staticmethod
+    def _on_task_done(task):
+        # 대기자가 모두 취소된 경우에도 "exception was never retrieved" 경고가 남지 않도록 처리
+        if not task.cancelled():
+            task.exception()
+
+    def clear(self):
+        self._entries.clear()
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+
+    def stats(self):
+        """히트/미스/합류 카운터와 현재 크기를 반환합니다."""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "disk_enabled": self._disk is not None,
+            "disk_path": self._disk.path if self._disk is not None else None,
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0
+        }
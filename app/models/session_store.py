@@ -0,0 +1,267 @@
+import os
+import hmac
+import time
+import uuid
+import asyncio
+import secrets
+import logging
+import contextvars
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationSession:
+    """
+    서버에 보관하는 대화 세션 하나 (누적 요약 + 아직 요약되지 않은 최근 대화)
+
+    생성 시 발급한 token(세션 비밀값)을 가진 호출자, 또는 세션을 만든 인증 사용자만 사용할 수 있습니다.
+    """
+
+    __slots__ = ("session_id", "user_id", "token", "summary", "turns", "created_at", "expires_at", "summarized_turns", "_summarizing")
+
+    def __init__(self, session_id, user_id, expires_at):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.token = secrets.token_urlsafe(32)
+        self.summary = ""
+        self.turns = []  # [(사용자 일기, 응답)]
+        self.created_at = time.time()
+        self.expires_at = expires_at
+        self.summarized_turns = 0
+        self._summarizing = None  # 진행 중인 요약 asyncio.Task
+
+    def is_owned_by(self, user_id=None, token=None):
+        """세션 비밀값이 맞거나, 인증 사용자가 세션을 만든 사용자이면 True"""
+        if token and hmac.compare_digest(token.encode(), self.token.encode()):
+            return True
+        return self.user_id is not None and user_id is not None and str(user_id) == str(self.user_id)
+
+    def info(self):
+        return {
+            "session_id": self.session_id,
+            "user_id": self.user_id,
+            "created_at": self.created_at,
+            "expires_at": self.expires_at,
+            "turns": self.summarized_turns + len(self.turns),
+            "summarized_turns": self.summarized_turns,
+            "pending_turns": len(self.turns),
+            "summary": self.summary,
+            "summarizing": self._summarizing is not None
+        }
+
+
+class SessionStore:
+    """
+    LRU + TTL 대화 세션 저장소 (프로세스 메모리)
+
+    - 세션 수가 max_sessions를 넘으면 가장 오래 사용하지 않은 세션부터 제거하고,
+      ttl초 동안 사용하지 않은 세션은 만료됩니다.
+    - 매 턴의 대화 컨텍스트는 "누적 요약 + 최근 대화"로 구성되며 history_tokens 예산을 넘지 않습니다.
+    - 최근 대화가 keep_turns의 2배를 넘거나 예산을 넘으면 최근 keep_turns개만 남기고 오래된 턴을
+      백그라운드에서 누적 요약에 합칩니다 (요약 호출은 대략 keep_turns 턴마다 한 번).
+      요약이 끝나기 전(또는 실패한 경우)에도 컨텍스트는 예산에 맞게 오래된 턴부터 잘라서 사용합니다.
+    """
+
+    SUMMARY_HEADER = "이전 대화 요약: "
+    RECENT_HEADER = "최근 대화:"
+    TURN_FORMAT = "사용자: {text}\n응답: {response}"
+
+    def __init__(self, summarize, counter, max_sessions=10000, ttl=1800, history_tokens=800, keep_turns=4):
+        """
+        Args:
+            summarize: (이전 요약, [(일기, 응답)]) -> 새 요약 문자열을 반환하는 코루틴 함수
+            counter: 토큰 수 계산기 (PromptBuilder.counter)
+            max_sessions: 보관할 최대 세션 수
+            ttl: 세션 만료 시간(초, 마지막 사용 기준)
+            history_tokens: 한 턴의 프롬프트에 넣을 대화 컨텍스트 토큰 예산
+            keep_turns: 요약하지 않고 원문으로 유지할 최근 턴 수
+        """
+        self.summarize = summarize
+        self.counter = counter
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.history_tokens = history_tokens
+        self.keep_turns = max(1, keep_turns)
+        self._sessions = OrderedDict()  # session_id -> ConversationSession
+
+        # 튜닝용 카운터
+        self.created = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.summaries = 0
+        self.summary_failures = 0
+        self.truncations = 0
+
+    @classmethod
+    def from_env(cls, summarize, counter):
+        """
+        환경 변수 설정으로 저장소를 생성합니다.
+
+        - SESSION_MAX_COUNT: 보관할 최대 세션 수 (기본값: 10000)
+        - SESSION_TTL: 세션 만료 시간(초) (기본값: 1800)
+        - SESSION_HISTORY_TOKENS: 턴마다 프롬프트에 넣을 대화 컨텍스트 토큰 예산 (기본값: 800)
+        - SESSION_KEEP_TURNS: 요약하지 않고 유지할 최근 턴 수 (기본값: 4)
+        """
+        return cls(
+            summarize,
+            counter,
+            max_sessions=int(os.getenv("SESSION_MAX_COUNT", "10000")),
+            ttl=float(os.getenv("SESSION_TTL", "1800")),
+            history_tokens=int(os.getenv("SESSION_HISTORY_TOKENS", "800")),
+            keep_turns=int(os.getenv("SESSION_KEEP_TURNS", "4"))
+        )
+
+    def create(self, user_id=None):
+        """새 세션을 생성합니다."""
+        now = time.time()
+        self._sweep(now)
+        session = ConversationSession(uuid.uuid4().hex, user_id, now + self.ttl)
+        self._sessions[session.session_id] = session
+        self.created += 1
+        while len(self._sessions) > self.max_sessions:
+            _, evicted = self._sessions.popitem(last=False)
+            self._discard(evicted)
+            self.evictions += 1
+        return session
+
+    def _sweep(self, now):
+        # 사용 순서대로 정렬되어 있고 TTL이 같으므로 앞쪽의 만료된 세션만 확인하면 됨
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.expires_at > now:
+                break
+            del self._sessions[session.session_id]
+            self._discard(session)
+            self.expirations += 1
+
+    def get(self, session_id, user_id=None, token=None):
+        """
+        세션을 반환하고 만료 시간을 연장합니다.
+
+        없거나 만료되었거나, 세션 비밀값(token)/인증 사용자(user_id)가 맞지 않으면 None을 반환합니다
+        (다른 사용자의 세션이 있는지 알 수 없도록 없는 경우와 구분하지 않음).
+        """
+        session = self._sessions.get(session_id)
+        if session is None or not session.is_owned_by(user_id, token):
+            return None
+        now = time.time()
+        if session.expires_at <= now:
+            del self._sessions[session_id]
+            self._discard(session)
+            self.expirations += 1
+            return None
+        session.expires_at = now + self.ttl
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def delete(self, session_id, user_id=None, token=None):
+        """세션을 삭제합니다. 삭제했으면 True를 반환합니다 (소유자 확인은 get()과 같음)."""
+        session = self._sessions.get(session_id)
+        if session is None or not session.is_owned_by(user_id, token):
+            return False
+        del self._sessions[session_id]
+        self._discard(session)
+        return True
+
+    @staticmethod
+    def _discard(session):
+        if session._summarizing is not None:
+            session._summarizing.cancel()
+            session._summarizing = None
+
+    def _format_turn(self, turn):
+        return self.TURN_FORMAT.format(text=turn[0], response=turn[1])
+
+    def build_context(self, session):
+        """
+        이번 턴 프롬프트에 넣을 대화 컨텍스트를 만듭니다 (history_tokens 예산 이내).
+
+        누적 요약을 먼저 넣고, 남은 예산 안에서 최근 턴부터 거꾸로 채웁니다.
+        """
+        parts = []
+        budget = self.history_tokens
+        if session.summary:
+            summary = self.SUMMARY_HEADER + session.summary
+            budget -= self.counter.count(summary)
+            parts.append(summary)
+
+        recent = []
+        for turn in reversed(session.turns):
+            formatted = self._format_turn(turn)
+            tokens = self.counter.count(formatted)
+            if tokens > budget:
+                self.truncations += 1
+                break
+            budget -= tokens
+            recent.append(formatted)
+
+        if recent:
+            parts.append(self.RECENT_HEADER)
+            parts.extend(reversed(recent))
+        return "\n".join(parts)
+
+    def append_turn(self, session, text, response, labels=None):
+        """
+        완료된 턴을 세션에 추가하고, 필요하면 오래된 턴의 백그라운드 요약을 시작합니다.
+
+        Args:
+            session: 대상 세션
+            text: 사용자 일기
+            response: 생성된 응답 문장
+            labels: 요약 호출의 메트릭 레이블
+        """
+        session.turns.append((text, response))
+        if session._summarizing is None and self._needs_summary(session):
+            # 요청의 마감 시각(request_deadline)을 물려받지 않도록 빈 컨텍스트에서 생성
+            session._summarizing = contextvars.Context().run(asyncio.ensure_future, self._fold(session, labels))
+
+    def _needs_summary(self, session):
+        if len(session.turns) > self.keep_turns * 2:
+            return True
+        return sum(self.counter.count(self._format_turn(turn)) for turn in session.turns) > self.history_tokens
+
+    async def _fold(self, session, labels):
+        """최근 keep_turns개를 남기고 오래된 턴을 누적 요약에 합칩니다 (세션당 동시에 하나만 실행)."""
+        try:
+            while self._needs_summary(session):
+                # 예산만 넘은 경우에도 최소 한 턴은 요약
+                count = max(1, len(session.turns) - self.keep_turns)
+                folded = session.turns[:count]
+                session.summary = await self.summarize(session.summary, folded, labels)
+                # 요약하는 동안 추가된 턴은 뒤에 붙으므로 앞쪽 count개만 제거
+                del session.turns[:count]
+                session.summarized_turns += count
+                self.summaries += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # 다음 턴에서 다시 시도 (그동안 컨텍스트는 예산에 맞게 잘라서 사용)
+            self.summary_failures += 1
+            logger.warning("대화 요약 실패", extra={"session_id": session.session_id, "error": str(e)})
+        finally:
+            session._summarizing = None
+
+    async def close(self):
+        """진행 중인 요약 작업을 취소합니다."""
+        tasks = [session._summarizing for session in self._sessions.values() if session._summarizing is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self):
+        """세션 수와 요약/제거 카운터를 반환합니다."""
+        return {
+            "size": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "ttl": self.ttl,
+            "history_tokens": self.history_tokens,
+            "keep_turns": self.keep_turns,
+            "created": self.created,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "summaries": self.summaries,
+            "summary_failures": self.summary_failures,
+            "truncations": self.truncations,
+            "summarizing": sum(1 for session in self._sessions.values() if session._summarizing is not None)
+        }
@@ -0,0 +1,87 @@
+import json
+
+
+class IncrementalJSONFieldParser:
+    """
+    스트리밍으로 도착하는 JSON 텍스트에서 최상위 문자열 필드를 점진적으로 추출하는 파서
+
+    모델 응답 {"detected_emotion": ..., "summary": ..., "response": ...} 를 토큰 단위로 받으면서,
+    각 필드의 문자열 값이 닫히는 즉시 해당 필드를 반환합니다.
+    JSON 앞뒤의 설명 문구나 코드 블록 표시(```json)는 무시합니다.
+    """
+
+    def __init__(self, fields):
+        self.fields = set(fields)
+        self.completed = {}
+
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._pending_key = None  # 값 대기 전의 키 문자열
+        self._current_key = None  # ':' 이후 값을 기다리는 키
+
+    def feed(self, chunk):
+        """
+        새 텍스트 조각을 추가하고, 이번 조각으로 완성된 필드 목록을 반환합니다.
+
+        Returns:
+            list: (필드명, 값) 튜플 목록
+        """
+        if not chunk:
+            return []
+        self.text += chunk
+        text = self.text
+
+        found = []
+        i = self._pos
+        length = len(text)
+        while i < length:
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        field = self._on_string(text[self._string_start:i + 1])
+                        if field is not None:
+                            found.append(field)
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth = max(0, self._depth - 1)
+            elif ch == ":" and self._depth == 1:
+                self._current_key = self._pending_key
+                self._pending_key = None
+            elif ch == "," and self._depth == 1:
+                self._pending_key = None
+                self._current_key = None
+            i += 1
+
+        self._pos = i
+        return found
+
+    def _on_string(self, raw):
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            return None
+
+        if self._current_key is None:
+            self._pending_key = value
+            return None
+
+        key = self._current_key
+        self._current_key = None
+        if key in self.fields and key not in self.completed:
+            self.completed[key] = value
+            return key, value
+        return None
@@ -0,0 +1,254 @@
+import os
+import json
+import time
+import asyncio
+import logging
+
+from app.core.admission import TokenBucketLimiter
+from app.core.metrics import UPSTREAM_TARGET_REQUESTS, UPSTREAM_TARGET_IN_FLIGHT, UPSTREAM_TARGET_LATENCY
+from app.models.upstream_resilience import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+# 대상 상태와 무관한 요청 오류 (잘못된 요청 본문 등)는 대상 오류율에 반영하지 않음
+_REQUEST_ERROR_STATUSES = (400, 404, 422)
+
+
+class UpstreamTarget:
+    """
+    업스트림 대상 하나 (API 키 + 주소 + 모델)
+
+    대상별 동시 호출 수 제한, 초당 요청 수 예산(토큰 버킷), 지연 시간/오류율 EWMA를 가집니다.
+    """
+
+    def __init__(self, name, client, model, max_concurrency=64, rate_per_sec=0.0, burst=None):
+        self.name = name
+        self.client = client
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.limiter = TokenBucketLimiter(rate_per_sec, burst or max(1, int(rate_per_sec)), max_clients=1) if rate_per_sec > 0 else None
+
+        self.in_flight = 0
+        self.latency = None  # 지연 시간 EWMA(초), 표본이 없으면 None
+        self.error_rate = 0.0  # 오류율 EWMA (0~1)
+        self.consecutive_failures = 0
+        self.available_at = 0.0  # 속도 제한/오류로 쉬는 중이면 다시 사용할 수 있는 시각 (monotonic)
+
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "model": self.model,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "latency_ewma_ms": round(self.latency * 1000, 2) if self.latency is not None else None,
+            "error_rate_ewma": round(self.error_rate, 4),
+            "cooling_down_s": round(max(0.0, self.available_at - time.monotonic()), 3),
+            "requests": self.requests,
+            "errors": self.errors,
+            "throttled": self.throttled
+        }
+
+
+class UpstreamPool:
+    """
+    지연 시간 기반 업스트림 대상 풀
+
+    호출마다 사용 가능한 대상 중 "예상 대기 시간"이 가장 짧은 대상을 고릅니다.
+
+        점수 = 지연 시간 EWMA × (진행 중인 호출 수 + 1) ÷ (1 - 오류율 EWMA)
+
+    - 진행 중인 호출이 max_concurrency에 도달했거나 쉬는 중인 대상은 제외
+    - 아직 표본이 없는 대상은 가장 빠른 대상의 지연 시간으로 가정하여 먼저 시도되도록 함
+    - 선택한 대상의 초당 요청 예산이 없으면 예산이 찰 때까지 쉬게 하고 다음 대상을 선택
+    - 429 응답은 Retry-After 등이 지정한 시간, 연속 실패로 오류율이 error_threshold를 넘으면
+      error_cooldown초 동안 쉬게 함 (이후 다시 선택되어 회복 여부를 확인)
+    - 사용 가능한 대상이 없으면 다른 호출이 끝나거나 쉬는 시간이 지날 때까지 대기
+    """
+
+    def __init__(self, targets, ewma_alpha=0.2, error_threshold=0.5, error_cooldown=5.0):
+        if not targets:
+            raise ValueError("업스트림 대상이 하나 이상 필요합니다")
+        self.targets = list(targets)
+        self.ewma_alpha = ewma_alpha
+        self.error_threshold = error_threshold
+        self.error_cooldown = error_cooldown
+        self._changed = None  # 대상 상태 변경 알림 (이벤트 루프 안에서 생성)
+
+    @classmethod
+    def from_env(cls, client_factory, default_model, default_max_concurrency=64):
+        """
+        OPENAI_UPSTREAMS(JSON 배열)로 대상 풀을 생성합니다. 설정이 없으면 None을 반환합니다.
+
+        항목 형식:
+            {"name": "key-a", "api_key_env": "OPENAI_API_KEY_A", "base_url": "...", "model": "gpt-4o-mini",
+             "max_concurrency": 64, "rate_per_sec": 50, "burst": 100}
+
+        api_key 대신 api_key_env로 키를 담은 환경 변수 이름을 지정할 수 있습니다.
+        base_url, model, max_concurrency는 생략하면 기본 설정(OPENAI_BASE_URL, OPENAI_MODEL 등)을 사용합니다.
+
+        - OPENAI_UPSTREAM_EWMA_ALPHA: EWMA 가중치 (기본값: 0.2)
+        - OPENAI_UPSTREAM_ERROR_THRESHOLD: 대상을 쉬게 하는 오류율 (기본값: 0.5)
+        - OPENAI_UPSTREAM_ERROR_COOLDOWN: 오류로 쉬는 시간(초) (기본값: 5)
+
+        Args:
+            client_factory: (api_key, base_url) -> AsyncOpenAI 클라이언트
+            default_model: model이 없는 대상의 모델
+            default_max_concurrency: max_concurrency가 없는 대상의 동시 호출 수
+        """
+        raw = os.getenv("OPENAI_UPSTREAMS")
+        if not raw:
+            return None
+        entries = json.loads(raw)
+
+        targets = []
+        for index, entry in enumerate(entries):
+            api_key = entry.get("api_key")
+            if entry.get("api_key_env"):
+                api_key = os.getenv(entry["api_key_env"])
+            targets.append(UpstreamTarget(
+                name=entry.get("name") or f"upstream-{index}",
+                client=client_factory(api_key or os.getenv("OPENAI_API_KEY"), entry.get("base_url") or os.getenv("OPENAI_BASE_URL") or None),
+                model=entry.get("model") or default_model,
+                max_concurrency=int(entry.get("max_concurrency", default_max_concurrency)),
+                rate_per_sec=float(entry.get("rate_per_sec", 0)),
+                burst=entry.get("burst")
+            ))
+        return cls(
+            targets,
+            ewma_alpha=float(os.getenv("OPENAI_UPSTREAM_EWMA_ALPHA", "0.2")),
+            error_threshold=float(os.getenv("OPENAI_UPSTREAM_ERROR_THRESHOLD", "0.5")),
+            error_cooldown=float(os.getenv("OPENAI_UPSTREAM_ERROR_COOLDOWN", "5"))
+        )
+
+    def _select(self, now):
+        """사용 가능한 대상 중 점수가 가장 낮은 대상을 반환합니다. 없으면 None"""
+        known = [target.latency for target in self.targets if target.latency is not None]
+        optimistic = min(known) if known else 1.0
+
+        best = None
+        best_score = None
+        for target in self.targets:
+            if target.available_at > now or target.in_flight >= target.max_concurrency:
+                continue
+            latency = target.latency if target.latency is not None else optimistic
+            score = latency * (target.in_flight + 1) / max(0.1, 1.0 - target.error_rate)
+            if best is None or score < best_score:
+                best, best_score = target, score
+        return best
+
+    async def acquire(self):
+        """대상을 하나 골라 진행 중인 호출 수를 늘리고 반환합니다. 사용 가능한 대상이 없으면 대기합니다."""
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        while True:
+            now = time.monotonic()
+            target = self._select(now)
+            while target is not None:
+                wait = target.limiter.acquire(target.name) if target.limiter is not None else 0.0
+                if wait <= 0:
+                    target.in_flight += 1
+                    target.requests += 1
+                    UPSTREAM_TARGET_IN_FLIGHT.set((target.name,), target.in_flight)
+                    return target
+                # 초당 요청 예산 소진: 예산이 찰 때까지 제외하고 다음 대상 선택
+                target.throttled += 1
+                target.available_at = now + wait
+                target = self._select(now)
+
+            # 모든 대상이 가득 찼거나 쉬는 중: 호출 종료 알림 또는 가장 이른 복귀 시각까지 대기
+            resume = [target.available_at - now for target in self.targets if target.available_at > now]
+            timeout = min(resume) if resume else None
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def release(self, target):
+        """acquire()로 얻은 대상의 진행 중인 호출 수를 줄입니다."""
+        target.in_flight -= 1
+        UPSTREAM_TARGET_IN_FLIGHT.set((target.name,), target.in_flight)
+        if self._changed is not None:
+            # 대기 중인 호출을 모두 깨움 (set 후 바로 clear해도 이미 대기 중인 호출은 깨어남)
+            self._changed.set()
+            self._changed.clear()
+
+    def record(self, target, elapsed, error=None):
+        """
+        호출 결과를 대상의 지연 시간/오류율 EWMA에 반영합니다.
+
+        Args:
+            target: 호출한 대상
+            elapsed: 호출 시간(초, 스트리밍은 첫 응답까지)
+            error: 실패한 경우 예외
+        """
+        alpha = self.ewma_alpha
+        if error is not None:
+            status = getattr(error, "status_code", None)
+            if status in _REQUEST_ERROR_STATUSES:
+                return
+
+        failed = error is not None
+        if not failed or elapsed > (target.latency or 0.0):
+            # 빠르게 실패한 호출(연결 거부 등)은 지연 시간을 낮추지 않도록 제외하고,
+            # 타임아웃처럼 오래 걸린 실패는 "최소 이만큼 느리다"는 표본으로 사용
+            self._observe_latency(target, elapsed)
+        target.error_rate = (1 - alpha) * target.error_rate + alpha * (1.0 if failed else 0.0)
+        UPSTREAM_TARGET_REQUESTS.inc((target.name, "error" if failed else "success"))
+
+        if not failed:
+            target.consecutive_failures = 0
+            return
+
+        target.errors += 1
+        target.consecutive_failures += 1
+        cooldown = 0.0
+        if getattr(error, "status_code", None) == 429:
+            cooldown = RetryPolicy.server_delay(error) or 1.0
+        elif target.consecutive_failures >= 2 and target.error_rate >= self.error_threshold:
+            cooldown = self.error_cooldown
+        if cooldown > 0:
+            target.available_at = max(target.available_at, time.monotonic() + cooldown)
+            logger.info("업스트림 대상 일시 제외", extra={
+                "target": target.name,
+                "cooldown_s": round(cooldown, 3),
+                "error_rate": round(target.error_rate, 3)
+            })
+
+    def _observe_latency(self, target, elapsed):
+        alpha = self.ewma_alpha
+        target.latency = elapsed if target.latency is None else (1 - alpha) * target.latency + alpha * elapsed
+        UPSTREAM_TARGET_LATENCY.set((target.name,), round(target.latency, 4))
+
+    async def call(self, request):
+        """
+        대상을 골라 request(target) 코루틴을 실행하고 결과를 기록합니다.
+
+        Args:
+            request: UpstreamTarget을 받아 업스트림을 한 번 호출하는 코루틴 함수
+        """
+        target = await self.acquire()
+        start = time.monotonic()
+        try:
+            result = await request(target)
+        except asyncio.CancelledError:
+            # 헤지 요청에서 진 쪽, 전체 타임아웃 등 호출자가 취소한 경우는 오류로 세지 않지만
+            # 이미 평소보다 오래 걸렸다면 느려졌다는 표본으로 사용
+            elapsed = time.monotonic() - start
+            if target.latency is not None and elapsed > target.latency:
+                self._observe_latency(target, elapsed)
+            raise
+        except Exception as e:
+            self.record(target, time.monotonic() - start, e)
+            raise
+        else:
+            self.record(target, time.monotonic() - start)
+            return result
+        finally:
+            self.release(target)
+
+    def stats(self):
+        return {"targets": [target.stats() for target in self.targets]}
@@ -0,0 +1,348 @@
+import os
+import re
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+from app.core.metrics import (
+    UPSTREAM_RETRIES,
+    UPSTREAM_RETRY_DELAY,
+    UPSTREAM_FAILURES,
+    CIRCUIT_STATE,
+    CIRCUIT_TRANSITIONS,
+    CIRCUIT_REJECTIONS,
+    HEDGE_REQUESTS,
+    HEDGE_DELAY
+)
+
+logger = logging.getLogger(__name__)
+
+# x-ratelimit-reset-* 헤더 형식 (예: "1s", "6m0s", "20ms")
+_RESET_DURATION = re.compile(r"^(?:(\d+)h)?(?:(\d+)m(?!s))?(?:(\d+(?:\.\d+)?)s)?(?:(\d+)ms)?$")
+
+
+class CircuitOpenError(Exception):
+    """서킷 브레이커가 열려 있어 업스트림을 호출하지 않은 경우"""
+
+
+class RetryPolicy:
+    """
+    지수 백오프 + 지터 재시도 정책
+
+    재시도 간격은 full jitter(0 ~ base * 2^n 사이 임의 값)를 사용하고,
+    응답에 Retry-After / retry-after-ms / x-ratelimit-reset-requests 헤더가 있으면 그 이상 기다립니다.
+    """
+
+    def __init__(self, max_attempts=3, base_delay=0.25, max_delay=8.0, retryable_exceptions=()):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable_exceptions = tuple(retryable_exceptions)
+
+    def classify(self, error):
+        """
+        재시도할 수 있는 오류면 사유 문자열을, 아니면 None을 반환합니다.
+        """
+        if isinstance(error, asyncio.TimeoutError):
+            return "timeout"
+        status = getattr(error, "status_code", None)
+        if status == 429:
+            return "rate_limited"
+        if status is not None and (status >= 500 or status in (408, 409)):
+            return "server_error"
+        if self.retryable_exceptions and isinstance(error, self.retryable_exceptions):
+            return "connection"
+        return None
+
+    def backoff(self, retry_number, error=None):
+        """retry_number번째 재시도 전 대기 시간(초)"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** retry_number)))
+        server_delay = self.server_delay(error)
+        if server_delay is not None:
+            # 서버가 지정한 시간 + 동시 재시도가 몰리지 않도록 약간의 지터
+            delay = server_delay + random.uniform(0, self.base_delay)
+        return delay
+
+    @staticmethod
+    def server_delay(error):
+        """오류 응답의 속도 제한 헤더가 지정한 대기 시간(초), 없으면 None"""
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+        if not headers:
+            return None
+
+        value = headers.get("retry-after-ms")
+        if value:
+            try:
+                return float(value) / 1000
+            except ValueError:
+                pass
+
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+
+        value = headers.get("x-ratelimit-reset-requests")
+        if value:
+            match = _RESET_DURATION.match(value.strip())
+            if match and any(match.groups()):
+                hours, minutes, seconds, millis = match.groups()
+                return (
+                    int(hours or 0) * 3600
+                    + int(minutes or 0) * 60
+                    + float(seconds or 0)
+                    + int(millis or 0) / 1000
+                )
+        return None
+
+
+class CircuitBreaker:
+    """
+    연속 실패 기반 서킷 브레이커
+
+    - closed: 정상 호출. 연속 실패가 failure_threshold에 도달하면 open
+    - open: reset_timeout 동안 호출하지 않고 즉시 실패 (대체 응답 사용)
+    - half_open: reset_timeout 이후 시험 호출 1건만 허용. 성공하면 closed, 실패하면 다시 open
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def enabled(self):
+        return self.failure_threshold > 0
+
+    def _transition(self, state):
+        if state == self.state:
+            return
+        logger.warning("업스트림 서킷 상태 변경", extra={"from_state": self.state, "to_state": state, "failures": self.failures})
+        self.state = state
+        CIRCUIT_STATE.set(value=self._STATE_VALUES[state])
+        CIRCUIT_TRANSITIONS.inc((state,))
+
+    def allow(self):
+        """호출 가능 여부를 반환합니다. half_open에서는 시험 호출 1건만 허용합니다."""
+        if not self.enabled or self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self._transition(self.HALF_OPEN)
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self._probe_in_flight = False
+        self._transition(self.CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.enabled and (self.state == self.HALF_OPEN or self.failures >= self.failure_threshold):
+            self.opened_at = time.monotonic()
+            self._transition(self.OPEN)
+
+    def release(self):
+        """업스트림 상태와 무관한 오류(잘못된 요청 등)로 끝난 시험 호출의 슬롯을 반환합니다."""
+        self._probe_in_flight = False
+
+
+class LatencyTracker:
+    """
+    최근 업스트림 성공 응답 지연 시간의 분위수 추적기
+
+    sample_size개의 최근 값을 보관하고, 분위수는 refresh_every개가 추가될 때마다 다시 계산합니다.
+    """
+
+    def __init__(self, quantile=0.95, sample_size=256, min_samples=20, refresh_every=16):
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.refresh_every = refresh_every
+        self._samples = deque(maxlen=sample_size)
+        self._since_refresh = 0
+        self._value = None
+
+    def add(self, seconds):
+        self._samples.append(seconds)
+        self._since_refresh += 1
+        if self._since_refresh >= self.refresh_every and len(self._samples) >= self.min_samples:
+            ordered = sorted(self._samples)
+            self._value = ordered[min(len(ordered) - 1, int(len(ordered) * self.quantile))]
+            self._since_refresh = 0
+
+    @property
+    def value(self):
+        """분위수 값(초). 표본이 부족하면 None"""
+        return self._value
+
+
+class UpstreamResilience:
+    """
+    업스트림 호출 복원력 계층
+
+    한 번의 호출을 다음 순서로 감쌉니다.
+        1. 서킷 브레이커 확인 (열려 있으면 CircuitOpenError로 즉시 실패)
+        2. 시도 (헤징 사용 시 p95 지연 후에도 응답이 없으면 두 번째 요청을 보내 먼저 온 응답 사용)
+        3. 재시도 가능한 오류면 마감 시간 안에서 백오프 후 재시도
+        4. 최종 결과를 서킷 브레이커와 지연 시간 추적기에 기록
+
+    모든 결정은 app.core.metrics의 카운터로 기록됩니다.
+    """
+
+    def __init__(self, retry_policy=None, circuit_breaker=None, hedge_enabled=False, hedge_min_delay=0.05, latency_tracker=None):
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.hedge_enabled = hedge_enabled
+        self.hedge_min_delay = hedge_min_delay
+        self.latency = latency_tracker or LatencyTracker()
+
+    @classmethod
+    def from_env(cls, retryable_exceptions=()):
+        """
+        환경 변수 설정으로 복원력 계층을 생성합니다.
+
+        - OPENAI_RETRY_MAX_ATTEMPTS: 재시도를 포함한 최대 시도 횟수 (기본값: 3)
+        - OPENAI_RETRY_BASE_DELAY: 백오프 기본 간격(초) (기본값: 0.25)
+        - OPENAI_RETRY_MAX_DELAY: 백오프 최대 간격(초) (기본값: 8)
+        - OPENAI_CIRCUIT_FAILURE_THRESHOLD: 서킷을 여는 연속 실패 횟수, 0이면 비활성화 (기본값: 5)
+        - OPENAI_CIRCUIT_RESET_TIMEOUT: 서킷이 열린 뒤 시험 호출까지의 시간(초) (기본값: 30)
+        - OPENAI_HEDGE_ENABLED: 헤지 요청 사용 여부 (기본값: false)
+        - OPENAI_HEDGE_QUANTILE: 헤지 요청 지연 기준 분위수 (기본값: 0.95)
+        - OPENAI_HEDGE_MIN_DELAY: 헤지 요청 최소 지연(초) (기본값: 0.05)
+        """
+        return cls(
+            retry_policy=RetryPolicy(
+                max_attempts=int(os.getenv("OPENAI_RETRY_MAX_ATTEMPTS", "3")),
+                base_delay=float(os.getenv("OPENAI_RETRY_BASE_DELAY", "0.25")),
+                max_delay=float(os.getenv("OPENAI_RETRY_MAX_DELAY", "8")),
+                retryable_exceptions=retryable_exceptions
+            ),
+            circuit_breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv("OPENAI_CIRCUIT_FAILURE_THRESHOLD", "5")),
+                reset_timeout=float(os.getenv("OPENAI_CIRCUIT_RESET_TIMEOUT", "30"))
+            ),
+            hedge_enabled=os.getenv("OPENAI_HEDGE_ENABLED", "false").lower() == "true",
+            hedge_min_delay=float(os.getenv("OPENAI_HEDGE_MIN_DELAY", "0.05")),
+            latency_tracker=LatencyTracker(quantile=float(os.getenv("OPENAI_HEDGE_QUANTILE", "0.95")))
+        )
+
+    def hedge_delay(self):
+        """헤지 요청을 보낼 지연 시간(초). 헤징을 사용하지 않거나 표본이 부족하면 None"""
+        if not self.hedge_enabled or self.latency.value is None:
+            return None
+        return max(self.hedge_min_delay, self.latency.value)
+
+    async def call(self, attempt, timeout, hedge=False):
+        """
+        attempt()를 복원력 정책에 따라 실행합니다.
+
+        Args:
+            attempt: 업스트림을 한 번 호출하는 코루틴 함수
+            timeout: 재시도와 백오프를 모두 포함한 전체 마감 시간(초)
+            hedge: 헤지 요청 허용 여부 (스트리밍 등 중복 실행이 불가능한 호출은 False)
+
+        Raises:
+            CircuitOpenError: 서킷이 열려 있는 경우
+            asyncio.TimeoutError: 마감 시간 초과
+            Exception: 재시도할 수 없는 오류 또는 재시도 후에도 실패한 마지막 오류
+        """
+        if not self.circuit_breaker.allow():
+            CIRCUIT_REJECTIONS.inc()
+            raise CircuitOpenError("업스트림 장애로 OpenAI 호출이 일시 중단되었습니다")
+
+        deadline = time.monotonic() + timeout
+        retry_number = 0
+        while True:
+            start = time.monotonic()
+            try:
+                delay = self.hedge_delay() if hedge else None
+                remaining = deadline - start
+                if delay is not None and delay < remaining:
+                    result = await asyncio.wait_for(self._hedged(attempt, delay), timeout=remaining)
+                else:
+                    result = await asyncio.wait_for(attempt(), timeout=remaining)
+            except asyncio.CancelledError:
+                # 호출자가 취소한 경우 (클라이언트 연결 종료 등)
+                self.circuit_breaker.release()
+                raise
+            except Exception as e:
+                reason = self.retry_policy.classify(e)
+                if reason is None:
+                    # 업스트림 상태와 무관한 오류 (인증, 잘못된 요청 등)
+                    self.circuit_breaker.release()
+                    raise
+
+                retry_number += 1
+                backoff = self.retry_policy.backoff(retry_number, e)
+                if (
+                    retry_number >= self.retry_policy.max_attempts
+                    or self.circuit_breaker.state != CircuitBreaker.CLOSED
+                    or time.monotonic() + backoff >= deadline
+                ):
+                    UPSTREAM_FAILURES.inc((reason,))
+                    self.circuit_breaker.record_failure()
+                    raise
+
+                UPSTREAM_RETRIES.inc((reason,))
+                UPSTREAM_RETRY_DELAY.observe((reason,), backoff)
+                logger.info("업스트림 재시도", extra={"reason": reason, "retry": retry_number, "backoff_s": round(backoff, 3), "sampled": True})
+                await asyncio.sleep(backoff)
+                continue
+
+            self.latency.add(time.monotonic() - start)
+            if self.hedge_enabled and self.latency.value is not None:
+                HEDGE_DELAY.set(value=round(max(self.hedge_min_delay, self.latency.value), 4))
+            self.circuit_breaker.record_success()
+            return result
+
+    async def _hedged(self, attempt, delay):
+        """
+        첫 요청이 delay 안에 끝나지 않으면 두 번째 요청을 보내고, 먼저 성공한 응답을 반환합니다.
+        """
+        primary = asyncio.ensure_future(attempt())
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return primary.result()
+
+            HEDGE_REQUESTS.inc(("launched",))
+            hedge = asyncio.ensure_future(attempt())
+            tasks.append(hedge)
+
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        HEDGE_REQUESTS.inc(("hedge_won" if task is hedge else "primary_won",))
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
@@ -1,11 +1,18 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel
 from app.models.emotion_analyzer import EmotionAnalyzer
 
 router = APIRouter(prefix="/api", tags=["emotion"])
 
-# 싱글톤 감정 분석기 인스턴스
-emotion_analyzer = EmotionAnalyzer()
+# 싱글톤 감정 분석기 인스턴스 (콜드 스타트 단축을 위해 첫 사용 시 생성)
+_emotion_analyzer = None
+
+def get_emotion_analyzer():
+    """EmotionAnalyzer 싱글톤을 반환합니다. 최초 호출 시 생성합니다."""
+    global _emotion_analyzer
+    if _emotion_analyzer is None:
+        _emotion_analyzer = EmotionAnalyzer()
+    return _emotion_analyzer
 
 class JournalEntry(BaseModel):
     text: str
@@ -20,12 +27,13 @@ class AnalysisResponse(BaseModel):
 @router.post("/analyze", response_model=AnalysisResponse)
 async def analyze_emotion(journal: JournalEntry):
     try:
-        # 감정 분석 수행
-        result = emotion_analyzer.analyze(
+        # 감정 분석 수행 (미리 직렬화된 본문을 그대로 반환하여 응답 모델 검증/JSON 인코딩 생략,
+        # response_model은 API 문서용)
+        body = await get_emotion_analyzer().analyze_body(
             text=journal.text,
             mood_id=journal.mood_id,
             mode=journal.mode
         )
-        return result
+        return Response(body, media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
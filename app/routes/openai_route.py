@@ -1,13 +1,195 @@
-from fastapi import APIRouter, HTTPException, Request, Response
-import traceback
+from fastapi import APIRouter, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 import json
+import time
+import logging
+from typing import List, Optional
+from uuid import UUID
 from pydantic import BaseModel
-from app.models.openai_service import OpenAIService
+from app.models.openai_service import OpenAIService, UpstreamError
+from app.models.hybrid_router import HybridRouter
+from app.models.emotion_storage import EmotionStorage, build_record
+from app.models.session_store import SessionStore
+from app.models.job_queue import JobManager, JobQueueFullError
+from app.routes.emotion_route import get_emotion_analyzer
+from app.core.log_config import redact_text, elapsed_ms
+from app.core.metrics import journal_labels, mark_endpoint_done
+from app.core.auth import authenticated_user_id, check_service_token
 
 router = APIRouter(prefix="/api/openai", tags=["openai"])
+logger = logging.getLogger(__name__)
 
-# 싱글톤 OpenAI 서비스 인스턴스
-openai_service = OpenAIService()
+# 싱글톤 OpenAI 서비스 인스턴스 (콜드 스타트 단축을 위해 첫 사용 시 생성)
+_openai_service = None
+
+def get_openai_service():
+    """OpenAIService 싱글톤을 반환합니다. 최초 호출 시 생성합니다."""
+    global _openai_service
+    if _openai_service is None:
+        # 업스트림 장애 시 EmotionAnalyzer 템플릿 응답으로 대체
+        _openai_service = OpenAIService(fallback_analyzer=get_emotion_analyzer())
+    return _openai_service
+
+_hybrid_router = None
+
+def get_hybrid_router():
+    """로컬 분석/OpenAI 라우팅 계층 싱글톤을 반환합니다."""
+    global _hybrid_router
+    if _hybrid_router is None:
+        _hybrid_router = HybridRouter.from_env(get_openai_service(), get_emotion_analyzer())
+    return _hybrid_router
+
+async def close_openai_service():
+    """생성된 OpenAIService가 있으면 커넥션 풀을 정리합니다."""
+    if _openai_service is not None:
+        await _openai_service.aclose()
+
+# 감정 분석 결과 저장소 (EMOTION_STORAGE_URL이 없으면 저장하지 않음)
+_emotion_storage = None
+_emotion_storage_loaded = False
+
+def get_emotion_storage():
+    """EmotionStorage 싱글톤을 반환합니다. 저장소가 설정되지 않았으면 None을 반환합니다."""
+    global _emotion_storage, _emotion_storage_loaded
+    if not _emotion_storage_loaded:
+        _emotion_storage = EmotionStorage.from_env()
+        _emotion_storage_loaded = True
+    return _emotion_storage
+
+async def close_emotion_storage():
+    """저장 대기 중인 결과를 모두 저장하고 저장소를 닫습니다."""
+    if _emotion_storage is not None:
+        await _emotion_storage.close()
+
+# 서버 측 대화 세션 저장소 (첫 사용 시 생성)
+_session_store = None
+
+def get_session_store():
+    """SessionStore 싱글톤을 반환합니다. 최초 호출 시 생성합니다."""
+    global _session_store
+    if _session_store is None:
+        openai_service = get_openai_service()
+        _session_store = SessionStore.from_env(
+            openai_service.summarize_conversation,
+            openai_service.prompt_builder.counter
+        )
+    return _session_store
+
+async def close_session_store():
+    """진행 중인 대화 요약 작업을 정리합니다."""
+    if _session_store is not None:
+        await _session_store.close()
+
+def resolve_session(journal, user_id=None, session_token=None):
+    """
+    요청의 세션을 찾아 (세션, 프롬프트 컨텍스트)를 반환합니다. session_id가 없으면 (None, journal.context)
+    
+    Args:
+        journal: 요청 본문
+        user_id: resolve_request_user()로 확인한 사용자 ID
+        session_token: X-Session-Token 헤더 (세션 생성 시 받은 session_token)
+    
+    Raises:
+        HTTPException: 세션이 없거나 만료되었거나 요청자의 세션이 아닌 경우 (404)
+    """
+    if not journal.session_id:
+        return None, journal.context
+    store = get_session_store()
+    session = store.get(journal.session_id, user_id=user_id, token=session_token)
+    if session is None:
+        raise HTTPException(status_code=404, detail="세션이 없거나 만료되었습니다")
+    context = store.build_context(session)
+    if journal.context:
+        context = f"{context}\n{journal.context}" if context else journal.context
+    return session, context
+
+def record_turn(session, journal, result):
+    """완료된 턴을 세션에 추가합니다. 오래된 턴은 백그라운드에서 요약됩니다."""
+    if session is None:
+        return
+    get_session_store().append_turn(
+        session,
+        journal.text,
+        result["response"],
+        labels=journal_labels(journal.mode, journal.mood_id, journal.response_type)
+    )
+
+# 비동기 작업 관리자 (첫 사용 시 생성, JOB_QUEUE_URL이 없으면 프로세스 메모리 대기열)
+_job_manager = None
+
+def get_job_manager():
+    """JobManager 싱글톤을 반환합니다. 최초 호출 시 생성합니다."""
+    global _job_manager
+    if _job_manager is None:
+        _job_manager = JobManager.from_env(run_job)
+    return _job_manager
+
+async def close_job_manager():
+    """처리 중인 작업을 마치고 워커를 종료합니다."""
+    if _job_manager is not None:
+        await _job_manager.close()
+
+async def run_job(request):
+    """
+    작업 하나를 처리합니다 (JobManager 워커에서 호출).
+    
+    Raises:
+        UpstreamError: 응답을 생성하지 못한 경우 (작업 오류에는 detail의 고정 안내 문구만 기록)
+    """
+    # user_id는 submit_job에서 Authorization 토큰으로 확인한 사용자 ID
+    user_id = request.get("user_id")
+    journal = JournalEntry(**{key: value for key, value in request.items() if key != "user_id"})
+    result = await get_openai_service().generate_response(
+        text=journal.text,
+        mode=journal.mode,
+        mood_id=journal.mood_id,
+        response_type=journal.response_type,
+        context=journal.context
+    )
+    persist_result(journal, result, user_id)
+    return result
+
+def resolve_request_user(user_id, authorization):
+    """
+    결과를 저장할 사용자 ID를 Authorization: Bearer 토큰으로 결정합니다.
+
+    - 토큰이 없으면 익명 사용자(None, 저장 시 ANONYMOUS_USER_ID)로 처리
+    - 본문의 user_id는 토큰의 사용자와 같을 때만 허용 (토큰 없이 보낸 user_id도 거부)
+
+    Raises:
+        HTTPException: 유효하지 않은 토큰이거나 토큰 없이 user_id를 보낸 경우 (401),
+                       user_id가 토큰의 사용자와 다른 경우 (403)
+    """
+    if not authorization:
+        if user_id is not None:
+            raise HTTPException(status_code=401, detail="user_id를 지정하려면 인증 토큰이 필요합니다", headers={"WWW-Authenticate": "Bearer"})
+        return None
+    try:
+        token_user_id = authenticated_user_id(authorization)
+    except ValueError as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+    if user_id is not None and str(user_id) != token_user_id:
+        raise HTTPException(status_code=403, detail="다른 사용자로 저장할 수 없습니다")
+    return token_user_id
+
+def persist_result(journal, result, user_id, decision=None):
+    """
+    생성된 응답을 저장 큐에 넣습니다. DB 쓰기를 기다리지 않습니다.
+
+    user_id는 resolve_request_user()로 확인한 사용자 ID입니다 (요청 본문의 user_id를 그대로 쓰지 않음).
+    """
+    storage = get_emotion_storage()
+    if storage is None:
+        return
+    storage.enqueue(build_record(
+        journal.text,
+        result,
+        user_id=user_id,
+        mode=journal.mode,
+        mood_id=journal.mood_id,
+        response_type=journal.response_type,
+        decision=decision
+    ))
 
 class JournalEntry(BaseModel):
     text: str
@@ -15,72 +197,113 @@ class JournalEntry(BaseModel):
     mood_id: str = "neutral"  # happy, neutral, sad, tired, angry
     response_type: str = "comfort"  # comfort, fact, advice
     context: str = ""
+    user_id: Optional[UUID] = None  # Authorization 토큰의 사용자와 같아야 함 (토큰이 없으면 익명 사용자)
+    session_id: Optional[str] = None  # /sessions로 생성한 대화 세션 (이전 대화를 서버에서 이어붙임)
 
 class AnalysisResponse(BaseModel):
     detected_emotion: str
     summary: str
     response: str
 
+class JobRequest(JournalEntry):
+    webhook_url: Optional[str] = None  # 완료 시 작업 결과를 POST로 받을 URL
+
+class SessionCreate(BaseModel):
+    user_id: Optional[UUID] = None
+
+class BatchRequest(BaseModel):
+    entries: List[JournalEntry]
+    max_concurrency: Optional[int] = None  # 배치 내 동시 호출 수 (서버 설정값 이하)
+
+class BatchItemResult(BaseModel):
+    index: int
+    success: bool
+    result: Optional[AnalysisResponse] = None
+    error: Optional[str] = None  # 실패 시 안내 문구 (원인 오류는 포함하지 않음)
+    status: Optional[int] = None  # 항목별 상태 코드 (/generate가 반환할 값과 동일)
+
+class BatchResponse(BaseModel):
+    results: List[BatchItemResult]
+    succeeded: int
+    failed: int
+
 @router.post("/generate", response_model=AnalysisResponse)
-async def generate_response(journal: JournalEntry, request: Request, response: Response):
+async def generate_response(
+    journal: JournalEntry,
+    request: Request,
+    response: Response,
+    authorization: Optional[str] = Header(None),
+    x_session_token: Optional[str] = Header(None)
+):
+    start = time.perf_counter()
+    client_host = request.client.host if request.client else "unknown"
+    user_id = resolve_request_user(journal.user_id, authorization)
+    session, context = resolve_session(journal, user_id, x_session_token)
     try:
-        client_host = request.client.host if request.client else "unknown"
-        print(f"[API 요청 받음] /generate - 클라이언트 IP: {client_host}")
-        print(f"[요청 파라미터] {json.dumps(journal.dict(), ensure_ascii=False, indent=2)}")
-        
-        # OpenAI API 호출
-        result = openai_service.generate_response(
+        # 신뢰도 기반 라우팅: 로컬 응답이 가능하면 바로 응답, 아니면 OpenAI API 호출
+        result, decision = await get_hybrid_router().generate_response(
             text=journal.text,
             mode=journal.mode,
             mood_id=journal.mood_id,
             response_type=journal.response_type,
-            context=journal.context
+            context=context
         )
+        response.headers["X-Route-Decision"] = decision
         
         # 응답 유효성 검사 및 로깅
         if result and all(key in result for key in ["detected_emotion", "summary", "response"]):
-            print(f"[API 응답 성공] {json.dumps(result, ensure_ascii=False, indent=2)}")
+            # 성공 경로 로그는 LOG_SUCCESS_SAMPLE_RATE 비율로 샘플링, 일기 본문은 마스킹
+            logger.info("API 응답 성공", extra={
+                "route": "/generate",
+                "client": client_host,
+                "mode": journal.mode,
+                "mood_id": journal.mood_id,
+                "response_type": journal.response_type,
+                "decision": decision,
+                "text": redact_text(journal.text),
+                "duration_ms": elapsed_ms(start),
+                "sampled": True
+            })
             
             # CORS 헤더 추가
             response.headers["Access-Control-Allow-Origin"] = "*"
             response.headers["Access-Control-Allow-Methods"] = "POST, OPTIONS"
             response.headers["Access-Control-Allow-Headers"] = "Content-Type"
             
+            # 결과 저장은 백그라운드에서 묶어서 처리 (응답은 DB를 기다리지 않음)
+            persist_result(journal, result, user_id, decision)
+            record_turn(session, journal, result)
+            
+            # 이후 응답 직렬화 시간은 MetricsMiddleware가 serialize 단계로 기록
+            mark_endpoint_done(request, journal_labels(journal.mode, journal.mood_id, journal.response_type))
             return result
         else:
-            print(f"[API 응답 오류] 필수 필드 누락 - {result}")
+            logger.error("API 응답 오류: 필수 필드 누락", extra={"route": "/generate", "fields": sorted(result or {})})
             raise ValueError("OpenAI 응답에 필요한 필드가 누락되었습니다")
+    except UpstreamError as e:
+        # 원인 오류는 로그에만 남기고 클라이언트에는 상태 코드와 고정 안내 문구만 전달
+        logger.warning(f"API 업스트림 오류: {e}", extra={
+            "route": "/generate",
+            "client": client_host,
+            "mode": journal.mode,
+            "mood_id": journal.mood_id,
+            "status": e.status_code,
+            "duration_ms": elapsed_ms(start)
+        })
+        mark_endpoint_done(request, journal_labels(journal.mode, journal.mood_id, journal.response_type))
+        headers = {"Retry-After": "5"} if e.status_code == 503 else None
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=headers)
     except Exception as e:
-        error_detail = traceback.format_exc()
-        print(f"[API 오류 발생] {e}")
-        print(f"[상세 오류 내용]\n{error_detail}")
-        
-        # CORS 헤더 추가
-        response.headers["Access-Control-Allow-Origin"] = "*"
-        response.headers["Access-Control-Allow-Methods"] = "POST, OPTIONS"
-        response.headers["Access-Control-Allow-Headers"] = "Content-Type"
-        
-        # 클라이언트에 기본 응답 제공 (500 에러 대신)
-        default_emotion = "보통"  # 기본 감정
-        if hasattr(journal, 'mood_id') and journal.mood_id:
-            # 사용자가 선택한 감정 사용
-            if journal.mood_id == "happy":
-                default_emotion = "좋음"
-            elif journal.mood_id == "sad":
-                default_emotion = "슬픔"
-            elif journal.mood_id == "tired":
-                default_emotion = "지침"
-            elif journal.mood_id == "angry":
-                default_emotion = "불안"
-        
-        error_response = {
-            "detected_emotion": default_emotion,
-            "summary": "처리 중 오류가 발생했습니다.",
-            "response": f"죄송합니다. 요청을 처리하는 중 문제가 발생했습니다: {str(e)}"
-        }
-        
-        print(f"[API 오류 응답] {json.dumps(error_response, ensure_ascii=False, indent=2)}")
-        return error_response
+        logger.exception(f"API 오류 발생: {e}", extra={
+            "route": "/generate",
+            "client": client_host,
+            "mode": journal.mode,
+            "mood_id": journal.mood_id,
+            "text": redact_text(journal.text),
+            "duration_ms": elapsed_ms(start)
+        })
+        mark_endpoint_done(request, journal_labels(journal.mode, journal.mood_id, journal.response_type))
+        raise HTTPException(status_code=500, detail="요청을 처리하는 중 문제가 발생했습니다")
 
 @router.options("/generate")
 async def options_generate(response: Response):
@@ -88,4 +311,219 @@ async def options_generate(response: Response):
     response.headers["Access-Control-Allow-Origin"] = "*"
     response.headers["Access-Control-Allow-Methods"] = "POST, OPTIONS"
     response.headers["Access-Control-Allow-Headers"] = "Content-Type"
-    return {} 
\ No newline at end of file
+    return {}
+
+@router.post("/generate/batch", response_model=BatchResponse)
+async def generate_batch(batch: BatchRequest, request: Request, authorization: Optional[str] = Header(None)):
+    client_host = request.client.host if request.client else "unknown"
+    logger.info("API 요청 받음", extra={"route": "/generate/batch", "client": client_host, "items": len(batch.entries)})
+    user_ids = [resolve_request_user(entry.user_id, authorization) for entry in batch.entries]
+    
+    openai_service = get_openai_service()
+    if len(batch.entries) > openai_service.batch_max_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"배치 항목 수는 최대 {openai_service.batch_max_size}개입니다"
+        )
+    
+    # 항목별 실패는 전체 배치를 실패시키지 않고 결과에 포함
+    results = await openai_service.generate_batch(
+        [entry.dict() for entry in batch.entries],
+        max_concurrency=batch.max_concurrency
+    )
+    failed = sum(1 for item in results if not item["success"])
+    for entry, user_id, item in zip(batch.entries, user_ids, results):
+        if item["success"]:
+            persist_result(entry, item["result"], user_id)
+    
+    return {
+        "results": results,
+        "succeeded": len(results) - failed,
+        "failed": failed
+    }
+
+@router.post("/generate/stream")
+async def generate_response_stream(
+    journal: JournalEntry,
+    request: Request,
+    authorization: Optional[str] = Header(None),
+    x_session_token: Optional[str] = Header(None)
+):
+    """
+    SSE(text/event-stream)로 응답을 스트리밍합니다.
+    
+    이벤트 종류:
+        - token: 모델이 생성한 토큰 조각
+        - field: detected_emotion / summary / response 필드가 완성될 때마다 전송
+        - error: 응답 생성 실패 ({"message": 안내 문구, "status": /generate가 반환할 상태 코드}), 이후 done 없음
+        - done: 최종 응답 (/generate 응답과 동일한 형식)
+    """
+    client_host = request.client.host if request.client else "unknown"
+    logger.info("API 요청 받음", extra={
+        "route": "/generate/stream",
+        "client": client_host,
+        "mode": journal.mode,
+        "mood_id": journal.mood_id,
+        "text": redact_text(journal.text),
+        "sampled": True
+    })
+    user_id = resolve_request_user(journal.user_id, authorization)
+    session, context = resolve_session(journal, user_id, x_session_token)
+    
+    async def event_stream():
+        async for event, data in get_openai_service().stream_response(
+            text=journal.text,
+            mode=journal.mode,
+            mood_id=journal.mood_id,
+            response_type=journal.response_type,
+            context=context
+        ):
+            if event == "done":
+                persist_result(journal, data, user_id)
+                record_turn(session, journal, data)
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    
+    mark_endpoint_done(request, journal_labels(journal.mode, journal.mood_id, journal.response_type), serialize=False)
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # 프록시 버퍼링 비활성화
+            "Access-Control-Allow-Origin": "*"
+        }
+    )
+
+@router.get("/routing/stats")
+async def routing_stats():
+    # 라우팅 결정별 카운터 (로컬 응답 비율과 업스트림 호출 비용 조정용)
+    return get_hybrid_router().stats()
+
+@router.get("/storage/stats")
+async def storage_stats():
+    # 쓰기 지연 저장 큐 상태 (저장/버림/실패/거부 행 수, 평균 배치 크기)
+    storage = get_emotion_storage()
+    if storage is None:
+        return {"enabled": False}
+    return {"enabled": True, **storage.stats()}
+
+def resolve_stats_user(user_id, authorization, service_token):
+    """
+    통계를 조회할 사용자 ID를 인증 정보로 결정합니다.
+
+    - X-Service-Token이 SERVICE_TOKEN과 같으면 내부 서비스 요청으로 보고 user_id 쿼리 파라미터를 사용
+    - 그 외에는 Authorization: Bearer 토큰의 사용자만 조회 (user_id를 보냈다면 토큰의 사용자와 같아야 함)
+
+    Raises:
+        HTTPException: 인증 실패 (401), 다른 사용자 조회 (403), 서비스 요청에 user_id 누락 (400)
+    """
+    if check_service_token(service_token):
+        if user_id is None:
+            raise HTTPException(status_code=400, detail="user_id가 필요합니다")
+        return user_id
+    try:
+        token_user_id = authenticated_user_id(authorization)
+    except ValueError as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+    if user_id is not None and str(user_id) != token_user_id:
+        raise HTTPException(status_code=403, detail="다른 사용자의 통계는 조회할 수 없습니다")
+    return token_user_id
+
+@router.get("/stats/monthly")
+async def monthly_emotion_stats(
+    user_id: Optional[UUID] = None,
+    year: Optional[int] = None,
+    year_month: Optional[str] = None,
+    authorization: Optional[str] = Header(None),
+    x_service_token: Optional[str] = Header(None)
+):
+    # 월별 감정 통계 (월별 집계 테이블에서 조회하므로 기록 수와 무관하게 월 수에 비례)
+    user_id = resolve_stats_user(user_id, authorization, x_service_token)
+    storage = get_emotion_storage()
+    if storage is None:
+        raise HTTPException(status_code=503, detail="감정 기록 저장소가 설정되지 않았습니다")
+    try:
+        return await storage.monthly_stats(user_id, year=year, year_month=year_month)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/jobs", status_code=202)
+async def submit_job(job_request: JobRequest, response: Response, authorization: Optional[str] = Header(None)):
+    # 작업 ID를 바로 반환하고 결과는 /jobs/{job_id} 폴링 또는 웹훅으로 전달 (긴 analyze 요청용)
+    manager = get_job_manager()
+    user_id = resolve_request_user(job_request.user_id, authorization)
+    if not job_request.text:
+        raise HTTPException(status_code=400, detail="텍스트가 입력되지 않았습니다")
+    if job_request.session_id:
+        raise HTTPException(status_code=400, detail="작업 요청은 session_id를 지원하지 않습니다")
+    if job_request.webhook_url:
+        try:
+            await manager.validate_webhook(job_request.webhook_url)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    request = job_request.dict(exclude={"webhook_url", "session_id"})
+    request["user_id"] = user_id
+    try:
+        job = await manager.submit(request, webhook_url=job_request.webhook_url)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    
+    response.headers["Location"] = f"{router.prefix}/jobs/{job['job_id']}"
+    return manager.public_view(job)
+
+@router.get("/jobs/stats")
+async def job_stats():
+    # 대기/처리 중 작업 수와 상태별 카운터 (JOB_WORKERS, JOB_MAX_QUEUE 튜닝용)
+    return await get_job_manager().stats()
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업이 없거나 결과 보관 기간이 지났습니다")
+    return get_job_manager().public_view(job)
+
+@router.post("/sessions")
+async def create_session(body: SessionCreate = None, authorization: Optional[str] = Header(None)):
+    # 대화 세션 생성: 이후 /generate, /generate/stream 요청에 session_id를 넣으면 이전 대화가 이어짐
+    # 세션은 인증 사용자(Authorization) 또는 여기서 한 번만 반환하는 session_token(X-Session-Token 헤더)으로만 사용 가능
+    user_id = resolve_request_user(body.user_id if body else None, authorization)
+    session = get_session_store().create(user_id)
+    return {**session.info(), "session_token": session.token}
+
+@router.get("/sessions/stats")
+async def session_stats():
+    # 세션 수, 요약/제거/잘림 카운터 (SESSION_* 튜닝용)
+    return get_session_store().stats()
+
+@router.get("/sessions/{session_id}")
+async def get_session(session_id: str, authorization: Optional[str] = Header(None), x_session_token: Optional[str] = Header(None)):
+    user_id = resolve_request_user(None, authorization)
+    session = get_session_store().get(session_id, user_id=user_id, token=x_session_token)
+    if session is None:
+        raise HTTPException(status_code=404, detail="세션이 없거나 만료되었습니다")
+    return session.info()
+
+@router.delete("/sessions/{session_id}")
+async def delete_session(session_id: str, authorization: Optional[str] = Header(None), x_session_token: Optional[str] = Header(None)):
+    user_id = resolve_request_user(None, authorization)
+    if not get_session_store().delete(session_id, user_id=user_id, token=x_session_token):
+        raise HTTPException(status_code=404, detail="세션이 없거나 만료되었습니다")
+    return {"deleted": True}
+
+@router.get("/cache/stats")
+async def cache_stats():
+    # 캐시 크기 튜닝을 위한 히트/미스/합류 카운터
+    openai_service = get_openai_service()
+    if openai_service.cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **openai_service.cache.stats()}
+
+@router.get("/upstreams/stats")
+async def upstream_stats():
+    # 대상별 지연 시간/오류율 EWMA와 진행 중인 호출 수 (워커별 값)
+    openai_service = get_openai_service()
+    if openai_service.pool is None:
+        return {"enabled": False}
+    return {"enabled": True, **openai_service.pool.stats()}
@@ -0,0 +1,41 @@
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app.core.profiling import ProfileStore, check_token
+
+# PROFILING_TOKEN이 설정된 경우에만 app.main에서 등록
+router = APIRouter(prefix="/debug/profiles", tags=["profiling"])
+
+_profile_store = None
+
+def get_profile_store():
+    """ProfileStore 싱글톤을 반환합니다. 최초 호출 시 생성합니다."""
+    global _profile_store
+    if _profile_store is None:
+        _profile_store = ProfileStore.from_env()
+    return _profile_store
+
+def _authorize(token):
+    if not check_token(os.getenv("PROFILING_TOKEN"), token):
+        raise HTTPException(status_code=403, detail="프로파일링 토큰이 올바르지 않습니다")
+
+@router.get("")
+async def list_profiles(limit: int = 50, x_profile_token: Optional[str] = Header(None)):
+    # 최근 프로파일 목록 (모든 워커 공유, 최신순)
+    _authorize(x_profile_token)
+    return {"profiles": get_profile_store().index(limit)}
+
+@router.get("/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str, x_profile_token: Optional[str] = Header(None)):
+    # collapsed 스택 형식 (flamegraph.pl 입력 또는 speedscope에서 바로 열기)
+    _authorize(x_profile_token)
+    try:
+        collapsed = get_profile_store().load(profile_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if collapsed is None:
+        raise HTTPException(status_code=404, detail="프로파일이 없습니다")
+    return PlainTextResponse(collapsed, headers={"Content-Disposition": f'attachment; filename="{profile_id}.collapsed"'})
@@ -0,0 +1,146 @@
+"""
+/api/analyze 응답 경로 마이크로벤치마크
+
+같은 요청을 두 가지 라우트로 처리할 때의 요청당 시간을 비교합니다 (HTTP 서버 없이 ASGI 앱 직접 호출).
+
+    기존         요청마다 결과 dict 생성 -> response_model(AnalysisResponse) 검증 -> JSON 인코딩
+    사전 직렬화  EmotionAnalyzer.response_table의 UTF-8 JSON 본문을 Response로 바로 반환
+
+두 경로의 응답 본문이 같은지도 확인하고, 요청 파싱/라우팅을 제외한 응답 단계(결과 생성 ~ Response 생성)만
+따로 측정한 값도 출력합니다.
+
+사용법:
+    python benchmarks/analyze_fast_path.py
+    python benchmarks/analyze_fast_path.py --iterations 50000
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, APIRouter, HTTPException, Response
+from pydantic import TypeAdapter
+
+from app.routes import emotion_route
+from app.routes.emotion_route import JournalEntry, AnalysisResponse
+
+MOODS = ("happy", "neutral", "sad", "tired", "angry")
+MODES = ("comfort", "fact", "advice")
+
+
+def legacy_app():
+    """사전 직렬화 이전의 라우트 (요청마다 결과를 만들고 응답 모델로 검증/인코딩)"""
+    router = APIRouter(prefix="/api", tags=["emotion"])
+    analyzer = emotion_route.get_emotion_analyzer()
+
+    @router.post("/analyze", response_model=AnalysisResponse)
+    async def analyze_emotion(journal: JournalEntry):
+        try:
+            return analyzer._build_result(journal.mood_id, journal.mode)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    # 현재 라우트와 같은 방식(APIRouter 포함)으로 등록하여 라우팅 비용을 맞춤
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+def current_app():
+    app = FastAPI()
+    app.include_router(emotion_route.router)
+    return app
+
+
+def make_bodies():
+    return [
+        json.dumps({"text": f"오늘 하루를 기록한 일기입니다 ({index})", "mood_id": MOODS[index % 5], "mode": MODES[index % 3]}, ensure_ascii=False).encode()
+        for index in range(15)
+    ]
+
+
+async def call(app, body):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "path": "/api/analyze", "raw_path": b"/api/analyze", "query_string": b"",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80), "scheme": "http", "root_path": "",
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    chunks = []
+
+    async def receive():
+        return messages.pop() if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(chunks)
+
+
+async def measure(app, bodies, iterations):
+    start = time.perf_counter()
+    for index in range(iterations):
+        await call(app, bodies[index % len(bodies)])
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def measure_response_stage(iterations):
+    """응답 단계만 측정: 결과 dict 생성 + 응답 모델 검증/JSON 직렬화 vs 사전 직렬화 본문 조회"""
+    analyzer = emotion_route.get_emotion_analyzer()
+    adapter = TypeAdapter(AnalysisResponse)
+    keys = [(mood_id, mode) for mode in MODES for mood_id in MOODS]
+
+    start = time.perf_counter()
+    for index in range(iterations):
+        mood_id, mode = keys[index % len(keys)]
+        result = analyzer._build_result(mood_id, mode)
+        Response(adapter.dump_json(adapter.validate_python(result)), media_type="application/json")
+    legacy = (time.perf_counter() - start) / iterations * 1e6
+
+    start = time.perf_counter()
+    for index in range(iterations):
+        Response(analyzer.response_table[keys[index % len(keys)]][1], media_type="application/json")
+    return legacy, (time.perf_counter() - start) / iterations * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="/api/analyze 응답 경로 마이크로벤치마크")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=3, help="경로별 측정 반복 횟수 (최솟값 사용)")
+    args = parser.parse_args()
+
+    legacy, current = legacy_app(), current_app()
+    bodies = make_bodies()
+    for body in bodies:
+        expected, actual = await call(legacy, body), await call(current, body)
+        if json.loads(expected) != json.loads(actual):
+            raise SystemExit(f"응답 본문이 다릅니다: {expected!r} != {actual!r}")
+
+    # 워밍업 후 번갈아 측정하여 최솟값 사용 (다른 프로세스의 영향 최소화)
+    await measure(legacy, bodies, 1000)
+    await measure(current, bodies, 1000)
+    results = {"legacy": [], "current": []}
+    for _ in range(args.rounds):
+        results["legacy"].append(await measure(legacy, bodies, args.iterations))
+        results["current"].append(await measure(current, bodies, args.iterations))
+
+    baseline, fast = min(results["legacy"]), min(results["current"])
+    print(f"{'기존 (dict + 응답 모델)':<28} {baseline:>10.2f} us/요청")
+    print(f"{'사전 직렬화 본문':<28} {fast:>10.2f} us/요청")
+    print(f"{'절감':<28} {baseline - fast:>10.2f} us/요청 ({(baseline - fast) / baseline:.1%})")
+
+    stage_legacy, stage_fast = measure_response_stage(args.iterations * 5)
+    print("\n응답 단계만 (요청 파싱/라우팅 제외)")
+    print(f"{'기존 (dict + 응답 모델)':<28} {stage_legacy:>10.2f} us/요청")
+    print(f"{'사전 직렬화 본문':<28} {stage_fast:>10.2f} us/요청")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,134 @@
+"""
+콜드 스타트 벤치마크
+
+새 파이썬 프로세스에서 서버리스 진입점(api/index.py)을 임포트하고 첫 요청을 처리하는 데
+걸리는 시간을 측정합니다. 중앙값이 예산(ms)을 넘으면 종료 코드 1로 실패합니다.
+
+사용법:
+    python benchmarks/cold_start.py
+    python benchmarks/cold_start.py --runs 10 --budget-ms 1200
+    python benchmarks/cold_start.py --importtime   # 임포트 비용이 큰 모듈 상위 목록 출력
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 자식 프로세스에서 실행할 측정 코드
+# ASGI 앱을 직접 호출하여 HTTP 서버 없이 첫 요청 처리 시간을 측정
+PROBE = r"""
+import json, time, asyncio
+t0 = time.perf_counter()
+import api.index
+t1 = time.perf_counter()
+
+async def request(method, path, body=b""):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "path": path, "raw_path": path.encode(), "query_string": b"",
+        "headers": [(b"content-type", b"application/json")], "client": ("127.0.0.1", 0),
+        "server": ("bench", 80), "scheme": "http", "root_path": "",
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    status = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await api.index.app(scope, receive, send)
+    return status[0]
+
+async def main():
+    health = await request("GET", "/health")
+    t2 = time.perf_counter()
+    body = json.dumps({"text": "오늘은 조금 지쳤다", "mood_id": "tired", "mode": "comfort"}).encode()
+    analyze = await request("POST", "/api/analyze", body)
+    t3 = time.perf_counter()
+    return health, analyze, t2, t3
+
+health, analyze, t2, t3 = asyncio.run(main())
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "first_health_ms": (t2 - t1) * 1000,
+    "first_analyze_ms": (t3 - t2) * 1000,
+    "total_ms": (t3 - t0) * 1000,
+    "status": [health, analyze],
+}))
+"""
+
+
+def run_probe(env):
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    # 모듈 로드 시 출력되는 로그는 건너뛰고 마지막 JSON 줄만 사용
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def print_importtime(env, top):
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api.index"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stderr
+
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.strip()))
+
+    print(f"\n임포트 비용 상위 {top}개 모듈 (self 기준)")
+    for self_us, cumulative_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {self_us / 1000:8.1f} ms  (누적 {cumulative_us / 1000:8.1f} ms)  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="서버리스 진입점 콜드 스타트 벤치마크")
+    parser.add_argument("--runs", type=int, default=5, help="측정 횟수 (기본값: 5)")
+    parser.add_argument(
+        "--budget-ms", type=float,
+        default=float(os.getenv("COLD_START_BUDGET_MS", "1500")),
+        help="허용되는 콜드 스타트 중앙값 (기본값: COLD_START_BUDGET_MS 또는 1500)"
+    )
+    parser.add_argument("--importtime", action="store_true", help="임포트 비용 상위 모듈 출력")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    env.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+    results = [run_probe(env) for _ in range(args.runs)]
+    for key in ("import_ms", "first_health_ms", "first_analyze_ms", "total_ms"):
+        values = [result[key] for result in results]
+        print(f"{key:>18}: 중앙값 {statistics.median(values):8.1f} ms, 최대 {max(values):8.1f} ms")
+
+    statuses = {tuple(result["status"]) for result in results}
+    if statuses != {(200, 200)}:
+        print(f"실패: 예상하지 못한 응답 코드 {statuses}")
+        return 1
+
+    if args.importtime:
+        print_importtime(env, args.top)
+
+    median_total = statistics.median(result["total_ms"] for result in results)
+    if median_total > args.budget_ms:
+        print(f"\n실패: 콜드 스타트 중앙값 {median_total:.1f} ms 가 예산 {args.budget_ms:.1f} ms 를 초과했습니다.")
+        return 1
+
+    print(f"\n통과: 콜드 스타트 중앙값 {median_total:.1f} ms (예산 {args.budget_ms:.1f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
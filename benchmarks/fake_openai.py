@@ -0,0 +1,179 @@
+"""
+로컬 OpenAI Chat Completions API 대역 서버
+
+실제 API 비용 없이 부하 테스트를 하기 위한 가짜 /v1/chat/completions 엔드포인트입니다.
+응답 지연 분포, 잘못된 JSON 응답 비율, 429/5xx 오류 비율을 설정할 수 있고 스트리밍(stream=True)도 지원합니다.
+
+지연 분포 형식 (--latency, 단위 ms):
+    fixed:100              항상 100ms
+    uniform:50:300         50~300ms 균등 분포
+    lognormal:200:0.5      중앙값 200ms, 시그마 0.5인 로그정규 분포 (긴 꼬리)
+
+사용법:
+    python benchmarks/fake_openai.py --port 9100
+    python benchmarks/fake_openai.py --latency lognormal:300:0.6 --malformed-rate 0.05 --rate-429 0.02 --rate-5xx 0.01
+
+앱 연결:
+    OPENAI_BASE_URL=http://127.0.0.1:9100/v1 OPENAI_API_KEY=fake uvicorn app.main:app
+"""
+import json
+import time
+import random
+import asyncio
+import argparse
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+RESPONSE_TEMPLATE = {
+    "detected_emotion": "슬픔",
+    "summary": "하루 동안 있었던 일과 그로 인한 감정을 기록한 일기입니다.",
+    "response": "오늘 많이 힘드셨겠어요. 그런 감정을 느끼는 것은 자연스러운 일이에요. 충분히 쉬면서 스스로를 돌봐주세요."
+}
+MALFORMED_RESPONSES = (
+    "오늘 많이 힘드셨겠어요. 충분히 쉬면서 스스로를 돌봐주세요.",  # JSON이 아닌 일반 텍스트
+    '{"detected_emotion": "슬픔", "summary": "하루를 기록한 일기',  # 잘린 JSON
+    '{"summary": "필드가 누락된 응답"}'  # 필수 필드 누락
+)
+
+
+def parse_latency(spec):
+    """
+    지연 분포 문자열을 초 단위 샘플러 함수로 변환합니다.
+
+    Raises:
+        ValueError: 지원하지 않는 형식
+    """
+    kind, *params = spec.split(":")
+    values = [float(value) for value in params]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(0.0, values[1]) * values[0] / 1000
+    raise ValueError(f"지원하지 않는 지연 분포입니다: {spec}")
+
+
+def create_app(latency="lognormal:200:0.5", malformed_rate=0.0, rate_429=0.0, rate_5xx=0.0,
+               token_interval_ms=10.0, seed=None):
+    """
+    설정에 따라 동작하는 가짜 OpenAI API 앱을 생성합니다.
+
+    Args:
+        latency: 응답(스트리밍은 첫 토큰)까지의 지연 분포
+        malformed_rate: JSON 형식이 아닌 응답 비율 (0~1)
+        rate_429: 429 Too Many Requests 응답 비율 (0~1, Retry-After 헤더 포함)
+        rate_5xx: 500/502/503 응답 비율 (0~1)
+        token_interval_ms: 스트리밍 응답의 청크 간격
+        seed: 난수 시드 (재현 가능한 실행용)
+    """
+    sample_latency = parse_latency(latency)
+    rng = random.Random(seed)
+    counters = {"requests": 0, "ok": 0, "malformed": 0, "429": 0, "5xx": 0}
+
+    def completion_payload(body, content):
+        prompt_tokens = sum(len(message.get("content", "")) for message in body.get("messages", []))
+        return {
+            "id": f"chatcmpl-fake-{counters['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(content),
+                "total_tokens": prompt_tokens + len(content)
+            }
+        }
+
+    async def stream_chunks(body, content):
+        base = {
+            "id": f"chatcmpl-fake-{counters['requests']}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini")
+        }
+        step = 8
+        for start in range(0, len(content), step):
+            chunk = dict(base, choices=[{"index": 0, "delta": {"content": content[start:start + step]}, "finish_reason": None}])
+            yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+            await asyncio.sleep(token_interval_ms / 1000)
+        yield f"data: {json.dumps(dict(base, choices=[{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]))}\n\n"
+        if (body.get("stream_options") or {}).get("include_usage"):
+            usage = completion_payload(body, content)["usage"]
+            yield f"data: {json.dumps(dict(base, choices=[], usage=usage))}\n\n"
+        yield "data: [DONE]\n\n"
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        counters["requests"] += 1
+        await asyncio.sleep(sample_latency(rng))
+
+        roll = rng.random()
+        if roll < rate_429:
+            counters["429"] += 1
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"Retry-After": "1"}
+            )
+        if roll < rate_429 + rate_5xx:
+            counters["5xx"] += 1
+            return JSONResponse(
+                {"error": {"message": "The server had an error while processing your request.", "type": "server_error"}},
+                status_code=rng.choice((500, 502, 503))
+            )
+
+        if rng.random() < malformed_rate:
+            counters["malformed"] += 1
+            content = rng.choice(MALFORMED_RESPONSES)
+        else:
+            counters["ok"] += 1
+            content = json.dumps(RESPONSE_TEMPLATE, ensure_ascii=False)
+
+        if body.get("stream"):
+            return StreamingResponse(stream_chunks(body, content), media_type="text/event-stream")
+        return JSONResponse(completion_payload(body, content))
+
+    async def stats(request: Request):
+        return JSONResponse(counters)
+
+    return Starlette(routes=[
+        Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+        Route("/stats", stats, methods=["GET"])
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 OpenAI Chat Completions API 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", default="lognormal:200:0.5", help="지연 분포 (fixed:MS, uniform:MIN:MAX, lognormal:MEDIAN:SIGMA)")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="JSON 형식이 아닌 응답 비율")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="429 응답 비율")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="5xx 응답 비율")
+    parser.add_argument("--token-interval-ms", type=float, default=10.0, help="스트리밍 청크 간격")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    parse_latency(args.latency)  # 잘못된 형식은 서버 시작 전에 실패
+
+    import uvicorn
+    uvicorn.run(
+        create_app(args.latency, args.malformed_rate, args.rate_429, args.rate_5xx, args.token_interval_ms, args.seed),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+        access_log=False
+    )
+
+
+if __name__ == "__main__":
+    main()
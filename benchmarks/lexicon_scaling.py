@@ -0,0 +1,110 @@
+"""
+감정 사전 점수 계산기 확장성 벤치마크
+
+Aho-Corasick 기반 LexiconScorer가 본문 길이에 선형으로, 사전 크기와는 무관하게
+동작하는지 확인합니다 (ns/문자가 일정하게 유지되어야 함).
+비교용으로 용어마다 본문을 다시 스캔하여 같은 결과(점수 + 매칭 구간)를 구하는 방식도 측정합니다.
+이 방식은 사전 크기 x 본문 길이에 비례합니다.
+
+사용법:
+    python benchmarks/lexicon_scaling.py
+    python benchmarks/lexicon_scaling.py --lexicon-sizes 100 1000 5000 --text-lengths 1000 10000 100000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.lexicon_scorer import EMOTION_LEXICON, LexiconScorer
+
+HANGUL_START = 0xAC00
+HANGUL_COUNT = 11172
+
+
+def synthetic_lexicon(size, rng):
+    """기본 사전에 무작위 한국어/영어 용어를 추가하여 지정한 크기의 사전을 만듭니다."""
+    lexicon = {emotion: dict(terms) for emotion, terms in EMOTION_LEXICON.items()}
+    emotions = list(lexicon)
+    total = sum(len(terms) for terms in lexicon.values())
+    while total < size:
+        if rng.random() < 0.5:
+            term = "".join(chr(HANGUL_START + rng.randrange(HANGUL_COUNT)) for _ in range(rng.randint(2, 4)))
+        else:
+            term = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 9)))
+        terms = lexicon[rng.choice(emotions)]
+        if term not in terms:
+            terms[term] = round(rng.uniform(0.3, 1.0), 2)
+            total += 1
+    return lexicon
+
+
+def synthetic_diary(length, lexicon, rng):
+    """사전 용어가 섞인 일기 텍스트를 만듭니다."""
+    terms = [term for entries in lexicon.values() for term in entries]
+    filler = "오늘은 아침에 일어나서 회사에 갔다 점심을 먹고 산책을 했다 and then I went home "
+    parts = []
+    size = 0
+    while size < length:
+        piece = rng.choice(terms) if rng.random() < 0.1 else filler[rng.randrange(len(filler) - 10):]
+        parts.append(piece + " ")
+        size += len(piece) + 1
+    return "".join(parts)[:length]
+
+
+def naive_score(lexicon, text):
+    """비교 기준: 용어마다 본문 전체를 다시 스캔하여 모든 매칭 구간과 가중치 합을 구함"""
+    lowered = text.lower()
+    scores = dict.fromkeys(lexicon, 0.0)
+    spans = []
+    for emotion, terms in lexicon.items():
+        for term, weight in terms.items():
+            start = lowered.find(term)
+            while start != -1:
+                scores[emotion] += weight
+                spans.append((start, start + len(term)))
+                start = lowered.find(term, start + 1)
+    return scores, spans
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LexiconScorer 확장성 벤치마크")
+    parser.add_argument("--lexicon-sizes", type=int, nargs="+", default=[200, 1000, 5000])
+    parser.add_argument("--text-lengths", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'사전 크기':>10} {'본문 길이':>10} {'automaton(ms)':>14} {'ns/문자':>10} {'naive(ms)':>12}")
+    for lexicon_size in args.lexicon_sizes:
+        lexicon = synthetic_lexicon(lexicon_size, rng)
+
+        start = time.perf_counter()
+        scorer = LexiconScorer(lexicon)
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        for text_length in args.text_lengths:
+            text = synthetic_diary(text_length, lexicon, rng)
+            automaton_s = timed(lambda: scorer.score(text), args.repeat)
+            naive_s = timed(lambda: naive_score(lexicon, text), args.repeat)
+            print(
+                f"{scorer.term_count:>10} {text_length:>10} {automaton_s * 1000:>14.2f} "
+                f"{automaton_s * 1e9 / text_length:>10.0f} {naive_s * 1000:>12.2f}"
+            )
+        print(f"{'':>10} (사전 컴파일 {compile_ms:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+부하 테스트 벤치마크
+
+로컬 OpenAI 대역 서버(benchmarks/fake_openai.py)와 앱(uvicorn)을 별도 프로세스로 띄우고,
+고정된 동시성 단계별로 엔드포인트를 호출하여 RPS와 p50/p95/p99 지연 시간을 측정합니다.
+
+--baseline 으로 저장된 결과와 비교하여 허용 범위(--tolerance)를 넘는 회귀가 있으면 종료 코드 1로
+실패하므로 CI에서 사용할 수 있습니다.
+
+시나리오:
+    generate   POST /api/openai/generate (mode=analyze, 항상 업스트림 호출)
+    chat       POST /api/openai/generate (mode=chat, 신뢰도 기반 로컬 응답 포함)
+    analyze    POST /api/analyze (로컬 감정 분석)
+
+사용법:
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --scenarios generate analyze --concurrency 1 16 64 --requests 500
+    python benchmarks/load_test.py --latency lognormal:300:0.6 --malformed-rate 0.05 --rate-429 0.02
+    python benchmarks/load_test.py --save-baseline benchmarks/baseline.json
+    python benchmarks/load_test.py --baseline benchmarks/baseline.json --tolerance 0.2
+    python benchmarks/load_test.py --target http://127.0.0.1:8000   # 이미 실행 중인 앱 사용
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_TEXTS = (
+    "오늘은 회사에서 힘든 일이 많았다. 팀장님께 혼나고 야근까지 했다. 집에 와서도 마음이 편하지 않다.",
+    "친구들과 오랜만에 만나서 맛있는 저녁을 먹었다. 정말 즐겁고 행복한 하루였다.",
+    "요즘 잠을 제대로 못 자서 너무 피곤하다. 아무것도 하기 싫고 무기력하다.",
+    "내일 발표가 있는데 준비가 부족한 것 같아 걱정된다. 실수할까 봐 불안하다.",
+    "I felt lonely today. Nobody called me and I spent the whole evening alone."
+)
+MOODS = ("sad", "happy", "tired", "angry", "neutral")
+
+# 업스트림 오류 시 앱이 200과 함께 반환하는 대체 응답
+DEGRADED_SUMMARIES = ("응답 생성 중 오류가 발생했습니다.", "처리 중 오류가 발생했습니다.")
+
+
+def scenario_request(name, index):
+    """시나리오의 index번째 요청 (경로, JSON 본문)을 만듭니다. 캐시 적중을 피하도록 본문마다 번호를 붙입니다."""
+    text = f"{SAMPLE_TEXTS[index % len(SAMPLE_TEXTS)]} ({index})"
+    mood_id = MOODS[index % len(MOODS)]
+    if name == "generate":
+        return "/api/openai/generate", {"text": text, "mode": "analyze", "mood_id": mood_id, "response_type": "comfort"}
+    if name == "chat":
+        return "/api/openai/generate", {"text": text, "mode": "chat", "mood_id": mood_id, "response_type": "comfort"}
+    if name == "analyze":
+        return "/api/analyze", {"text": text, "mood_id": mood_id, "mode": "comfort"}
+    raise ValueError(f"알 수 없는 시나리오입니다: {name}")
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+async def run_level(client, base_url, scenario, concurrency, total_requests, counter_start):
+    """
+    동시성 concurrency개의 워커로 total_requests건을 호출하고 결과 요약을 반환합니다.
+    """
+    latencies = []
+    errors = 0
+    degraded = 0
+    next_index = [0]
+
+    async def worker():
+        nonlocal errors, degraded
+        while next_index[0] < total_requests:
+            index = counter_start + next_index[0]
+            next_index[0] += 1
+            path, body = scenario_request(scenario, index)
+            start = time.perf_counter()
+            try:
+                response = await client.post(base_url + path, json=body)
+            except Exception:
+                errors += 1
+                continue
+            elapsed = time.perf_counter() - start
+            if response.status_code != 200:
+                errors += 1
+                continue
+            latencies.append(elapsed)
+            if response.json().get("summary") in DEGRADED_SUMMARIES:
+                degraded += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": total_requests,
+        "rps": round(len(latencies) / wall, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "error_rate": round(errors / total_requests, 4),
+        "degraded_rate": round(degraded / total_requests, 4)
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url, process, timeout=30.0):
+    import httpx
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"프로세스가 종료되었습니다 (종료 코드 {process.returncode}): {url}")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"서버가 준비되지 않았습니다: {url}")
+
+
+def start_servers(args):
+    """가짜 OpenAI 서버와 앱을 띄우고 (앱 주소, 프로세스 목록)을 반환합니다."""
+    fake_port = free_port()
+    fake = subprocess.Popen(
+        [
+            sys.executable, os.path.join(ROOT, "benchmarks", "fake_openai.py"),
+            "--port", str(fake_port),
+            "--latency", args.latency,
+            "--malformed-rate", str(args.malformed_rate),
+            "--rate-429", str(args.rate_429),
+            "--rate-5xx", str(args.rate_5xx),
+            "--seed", "42"
+        ],
+        cwd=ROOT
+    )
+    processes = [fake]
+    try:
+        wait_until_ready(f"http://127.0.0.1:{fake_port}/stats", fake)
+
+        app_port = free_port()
+        env = dict(
+            os.environ,
+            OPENAI_BASE_URL=f"http://127.0.0.1:{fake_port}/v1",
+            OPENAI_API_KEY="fake-key-for-load-test",
+            OPENAI_CACHE_SIZE="0",
+            LOG_LEVEL="WARNING"
+        )
+        for item in args.app_env:
+            key, _, value = item.partition("=")
+            env[key] = value
+        app = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "app.main:app",
+                "--host", "127.0.0.1", "--port", str(app_port),
+                "--log-level", "warning", "--no-access-log"
+            ],
+            cwd=ROOT,
+            env=env,
+            stdout=subprocess.DEVNULL
+        )
+        processes.append(app)
+        wait_until_ready(f"http://127.0.0.1:{app_port}/health", app)
+    except Exception:
+        stop_servers(processes)
+        raise
+    return f"http://127.0.0.1:{app_port}", processes
+
+
+def stop_servers(processes):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def compare(results, baseline, tolerance, slack_ms):
+    """
+    기준 결과와 비교하여 회귀 목록을 반환합니다.
+
+    - rps가 기준보다 tolerance 비율 이상 낮으면 회귀
+    - p95/p99가 기준보다 tolerance 비율 + slack_ms 이상 높으면 회귀
+    - 오류율이 기준보다 1%p 이상 높으면 회귀
+    """
+    regressions = []
+    for key, base in baseline.get("results", {}).items():
+        current = results.get(key)
+        if current is None:
+            continue
+        if current["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{key}: rps {current['rps']} < 기준 {base['rps']}")
+        for metric in ("p95_ms", "p99_ms"):
+            if current[metric] > base[metric] * (1 + tolerance) + slack_ms:
+                regressions.append(f"{key}: {metric} {current[metric]} > 기준 {base[metric]}")
+        if current["error_rate"] > base["error_rate"] + 0.01:
+            regressions.append(f"{key}: error_rate {current['error_rate']} > 기준 {base['error_rate']}")
+    return regressions
+
+
+async def run(args, base_url):
+    import httpx
+
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    results = {}
+    counter = 0
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+        for scenario in args.scenarios:
+            # 워밍업 (지연 로딩되는 서비스 생성 등)
+            await run_level(client, base_url, scenario, 4, args.warmup, counter)
+            counter += args.warmup
+            for concurrency in args.concurrency:
+                summary = await run_level(client, base_url, scenario, concurrency, args.requests, counter)
+                counter += args.requests
+                key = f"{scenario}@{concurrency}"
+                results[key] = summary
+                print(
+                    f"{key:<16} {summary['rps']:>9.1f} {summary['p50_ms']:>9.1f} {summary['p95_ms']:>9.1f} "
+                    f"{summary['p99_ms']:>9.1f} {summary['error_rate'] * 100:>7.2f}% {summary['degraded_rate'] * 100:>8.2f}%",
+                    flush=True
+                )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 OpenAI 대역 서버를 사용한 부하 테스트")
+    parser.add_argument("--scenarios", nargs="+", default=["generate", "analyze"], choices=["generate", "chat", "analyze"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="동시성 단계별 요청 수")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=60.0, help="요청별 타임아웃 (초)")
+    parser.add_argument("--latency", default="lognormal:50:0.5", help="가짜 OpenAI 서버의 지연 분포")
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--app-env", nargs="*", default=[], metavar="KEY=VALUE", help="앱 프로세스에 추가할 환경 변수")
+    parser.add_argument("--target", default=None, help="이미 실행 중인 앱 주소 (지정 시 서버를 띄우지 않음)")
+    parser.add_argument("--baseline", default=None, help="비교할 기준 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용 회귀 비율 (기본값: 0.2)")
+    parser.add_argument("--slack-ms", type=float, default=5.0, help="지연 시간 비교에 더하는 절대 허용치 (ms)")
+    parser.add_argument("--save-baseline", default=None, help="결과를 기준 JSON으로 저장할 경로")
+    args = parser.parse_args()
+
+    processes = []
+    if args.target:
+        base_url = args.target.rstrip("/")
+    else:
+        base_url, processes = start_servers(args)
+
+    print(f"{'시나리오@동시성':<16} {'RPS':>9} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'오류':>8} {'대체응답':>9}")
+    try:
+        results = asyncio.run(run(args, base_url))
+    finally:
+        stop_servers(processes)
+
+    report = {
+        "config": {
+            "requests": args.requests,
+            "latency": args.latency,
+            "malformed_rate": args.malformed_rate,
+            "rate_429": args.rate_429,
+            "rate_5xx": args.rate_5xx
+        },
+        "results": results
+    }
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n기준 결과 저장: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != report["config"]:
+            print("\n경고: 기준 결과와 설정이 다릅니다", baseline.get("config"))
+        regressions = compare(results, baseline, args.tolerance, args.slack_ms)
+        if regressions:
+            print("\n성능 회귀 발견:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"\n기준 대비 회귀 없음 (허용 범위 {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+로깅 오버헤드 마이크로벤치마크
+
+요청 1건당 로깅이 호출 스레드(이벤트 루프)에 추가하는 시간을 측정합니다.
+
+    - legacy: 기존 방식 (요청/응답을 json.dumps(indent=2)로 print)
+    - queue: 큐 기반 구조화 로깅 (JSON 직렬화와 출력은 리스너 스레드에서 처리)
+    - queue + 샘플링: 성공 경로 로그를 일부만 남김
+    - disabled: 로그 레벨로 비활성화
+
+출력은 모두 임시 파일로 보냅니다 (--sink 로 변경 가능).
+
+사용법:
+    python benchmarks/logging_overhead.py
+    python benchmarks/logging_overhead.py --iterations 50000 --request-ms 5 200
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import log_config
+from app.core.log_config import setup_logging, shutdown_logging, redact_text
+
+JOURNAL = {
+    "text": "오늘은 회사에서 힘든 일이 많았다. 팀장님께 혼나고 야근까지 했다. 집에 와서도 마음이 편하지 않다. " * 5,
+    "mode": "chat",
+    "mood_id": "tired",
+    "response_type": "comfort",
+    "context": ""
+}
+RESULT = {
+    "detected_emotion": "지침",
+    "summary": "회사에서 힘든 하루를 보낸 뒤 지친 마음을 기록한 일기입니다.",
+    "response": "오늘 정말 고생 많으셨어요. 힘든 일이 겹치면 몸도 마음도 지치기 마련이에요. " * 3
+}
+
+
+def legacy_request(sink):
+    # 기존 openai_route의 요청/응답 로그
+    print("[API 요청 받음] /generate - 클라이언트 IP: 127.0.0.1", file=sink)
+    print(f"[요청 파라미터] {json.dumps(JOURNAL, ensure_ascii=False, indent=2)}", file=sink)
+    print(f"[API 응답 성공] {json.dumps(RESULT, ensure_ascii=False, indent=2)}", file=sink)
+
+
+def structured_request(logger):
+    logger.info("API 응답 성공", extra={
+        "route": "/generate",
+        "client": "127.0.0.1",
+        "mode": JOURNAL["mode"],
+        "mood_id": JOURNAL["mood_id"],
+        "response_type": JOURNAL["response_type"],
+        "decision": "llm_low_confidence",
+        "text": redact_text(JOURNAL["text"]),
+        "duration_ms": 812.5,
+        "sampled": True
+    })
+
+
+def measure(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def set_sample_rate(logger, rate):
+    for handler in logger.handlers:
+        for log_filter in handler.filters:
+            if isinstance(log_filter, log_config.SuccessSamplingFilter):
+                log_filter.sample_rate = rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로깅 오버헤드 마이크로벤치마크")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument(
+        "--request-ms", type=float, nargs="+", default=[1.0, 500.0],
+        help="비교 기준 요청 지연 시간 (ms, 기본값: 로컬 응답 1ms / LLM 응답 500ms)"
+    )
+    parser.add_argument("--sink", default=None, help="로그 출력 파일 (기본값: 임시 파일)")
+    args = parser.parse_args()
+
+    sink = open(args.sink, "w", encoding="utf-8") if args.sink else tempfile.TemporaryFile("w", encoding="utf-8")
+    os.environ["LOG_QUEUE_SIZE"] = str(args.iterations + 1)
+
+    # 리스너 스레드의 출력도 같은 파일로 보냄
+    with contextlib.redirect_stdout(sink):
+        setup_logging()
+    logger = logging.getLogger("app.benchmark")
+    app_logger = logging.getLogger("app")
+
+    results = []
+    results.append(("legacy print + json.dumps(indent=2)", measure(lambda: legacy_request(sink), args.iterations)))
+
+    set_sample_rate(app_logger, 1.0)
+    results.append(("queue (샘플링 1.0)", measure(lambda: structured_request(logger), args.iterations)))
+    drain_start = time.perf_counter()
+    shutdown_logging()
+    drain_ms = (time.perf_counter() - drain_start) * 1000
+
+    with contextlib.redirect_stdout(sink):
+        setup_logging()
+    set_sample_rate(app_logger, 0.1)
+    results.append(("queue (샘플링 0.1)", measure(lambda: structured_request(logger), args.iterations)))
+
+    shutdown_logging()
+
+    with contextlib.redirect_stdout(sink):
+        setup_logging()
+    app_logger.setLevel(logging.WARNING)
+    results.append(("disabled (LOG_LEVEL=WARNING)", measure(lambda: structured_request(logger), args.iterations)))
+    shutdown_logging()
+
+    header = "".join(f"{f'{ms:g}ms 요청 대비':>16}" for ms in args.request_ms)
+    print(f"{'방식':<40} {'호출 스레드 비용(us/요청)':>24}{header}")
+    for name, micros in results:
+        shares = "".join(f"{micros / (ms * 1000) * 100:>15.3f}%" for ms in args.request_ms)
+        print(f"{name:<40} {micros:>24.2f}{shares}")
+    print(f"\n리스너 스레드가 남은 로그 {args.iterations}건을 출력하는 데 걸린 시간: {drain_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+메트릭 기록 오버헤드 마이크로벤치마크
+
+/api/openai/generate 요청 1건이 기록하는 메트릭(미들웨어 + 단계별 지연 시간 4개 + 토큰 카운터 +
+진행 중 호출 수)을 빈 ASGI 앱에 적용했을 때 추가되는 시간을 측정합니다.
+
+사용법:
+    python benchmarks/metrics_overhead.py
+    python benchmarks/metrics_overhead.py --iterations 200000
+"""
+import os
+import sys
+import time
+import types
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import metrics
+from app.core.metrics import MetricsMiddleware, REGISTRY
+
+USAGE = types.SimpleNamespace(prompt_tokens=350, completion_tokens=180)
+ROUTE = types.SimpleNamespace(path_format="/api/openai/generate")
+
+
+class _Request:
+    def __init__(self, scope):
+        self.scope = scope
+
+
+async def bare_app(scope, receive, send):
+    scope["route"] = ROUTE
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def instrumented_app(scope, receive, send):
+    # OpenAIService와 openai_route가 요청 1건당 기록하는 메트릭
+    scope["route"] = ROUTE
+    labels = metrics.journal_labels("chat", "sad", "comfort")
+    start = time.perf_counter()
+    metrics.observe_stage("prompt_build", labels, start)
+    metrics.UPSTREAM_IN_FLIGHT.inc(labels)
+    metrics.UPSTREAM_IN_FLIGHT.dec(labels)
+    metrics.observe_stage("upstream", labels, start)
+    metrics.record_usage(USAGE, labels)
+    metrics.observe_stage("parse", labels, start)
+    metrics.mark_endpoint_done(_Request(scope), labels)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def measure(app, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        scope = {"type": "http", "method": "POST", "path": "/api/openai/generate"}
+        await app(scope, receive, send)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="메트릭 기록 오버헤드 마이크로벤치마크")
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+
+    baseline = await measure(bare_app, args.iterations)
+    instrumented = await measure(MetricsMiddleware(instrumented_app), args.iterations)
+
+    print(f"{'메트릭 없음':<24} {baseline:>10.2f} us/요청")
+    print(f"{'메트릭 기록':<24} {instrumented:>10.2f} us/요청")
+    print(f"{'추가 비용':<24} {instrumented - baseline:>10.2f} us/요청")
+
+    start = time.perf_counter()
+    body = REGISTRY.render()
+    print(f"\n/metrics 출력: {len(body.splitlines())}줄, {(time.perf_counter() - start) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,176 @@
+"""
+업스트림 풀 라우팅 벤치마크
+
+지연 시간이 서로 다른 로컬 OpenAI 대역 서버(benchmarks/fake_openai.py)를 여러 개 띄우고,
+같은 부하를 UpstreamPool(지연 시간 기반 선택)과 무작위 선택으로 각각 보내
+대상별 요청 비율과 p50/p95 지연 시간을 비교합니다.
+
+--fail-fastest-after 를 지정하면 해당 요청 수 이후 가장 빠른 대상이 503을 반환하도록 바꿔
+오류 대상에서 트래픽이 빠지는지 확인할 수 있습니다 (대역 서버는 벤치마크와 같은 프로세스에서 실행).
+
+사용법:
+    python benchmarks/upstream_pool.py
+    python benchmarks/upstream_pool.py --targets fixed:30 lognormal:120:0.4 lognormal:400:0.6 --concurrency 48
+    python benchmarks/upstream_pool.py --max-concurrency 8 --fail-fastest-after 300
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_openai import create_app
+from benchmarks.load_test import free_port, percentile
+from app.models.upstream_pool import UpstreamPool, UpstreamTarget
+
+MESSAGES = [
+    {"role": "system", "content": "당신은 일기장 앱의 AI 비서입니다."},
+    {"role": "user", "content": "오늘은 조금 지쳤다."}
+]
+
+
+async def start_fake_servers(specs):
+    """
+    대역 서버들을 현재 이벤트 루프에서 띄우고 (uvicorn 서버, 실행 태스크, 포트, 장애 상태) 목록을 반환합니다.
+
+    장애 상태(dict)의 "failing"을 True로 바꾸면 해당 서버가 503을 반환합니다.
+    """
+    import uvicorn
+    from starlette.responses import JSONResponse
+
+    servers = []
+    for index, spec in enumerate(specs):
+        port = free_port()
+        state = {"failing": False}
+
+        async def app(scope, receive, send, fake=create_app(spec, seed=index), state=state):
+            if state["failing"] and scope["type"] == "http":
+                await JSONResponse({"error": {"message": "unavailable"}}, status_code=503)(scope, receive, send)
+                return
+            await fake(scope, receive, send)
+
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False, lifespan="off"))
+        task = asyncio.ensure_future(server.serve())
+        while not server.started:
+            if task.done():
+                task.result()
+            await asyncio.sleep(0.01)
+        servers.append((server, task, port, state))
+    return servers
+
+
+def build_pool(ports, max_concurrency, http_client):
+    from openai import AsyncOpenAI
+
+    targets = [
+        UpstreamTarget(
+            name=f"target-{index}",
+            client=AsyncOpenAI(api_key="fake", base_url=f"http://127.0.0.1:{port}/v1", http_client=http_client, max_retries=0),
+            model="gpt-4o-mini",
+            max_concurrency=max_concurrency
+        )
+        for index, port in enumerate(ports)
+    ]
+    return UpstreamPool(targets, error_cooldown=2.0)
+
+
+async def run_policy(policy, pool, requests, concurrency, on_progress=None):
+    """
+    policy("pool" 또는 "random")로 requests건을 concurrency개 워커에서 호출하고 결과 요약을 반환합니다.
+    """
+    latencies = []
+    errors = 0
+    counts = {target.name: 0 for target in pool.targets}
+    next_index = [0]
+    rng = random.Random(0)
+
+    async def request(target):
+        counts[target.name] += 1
+        return await target.client.chat.completions.create(model=target.model, messages=MESSAGES, max_tokens=50)
+
+    async def worker():
+        nonlocal errors
+        while next_index[0] < requests:
+            next_index[0] += 1
+            if on_progress is not None:
+                on_progress(next_index[0])
+            start = time.perf_counter()
+            try:
+                if policy == "pool":
+                    await pool.call(request)
+                else:
+                    await request(rng.choice(pool.targets))
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": round(len(latencies) / wall, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "error_rate": round(errors / requests, 4),
+        "share": {name: round(count / requests, 3) for name, count in counts.items()}
+    }
+
+
+async def run(args):
+    import httpx
+
+    servers = await start_fake_servers(args.targets)
+    fastest = servers[0][3]
+    http_client = httpx.AsyncClient(limits=httpx.Limits(max_connections=None, max_keepalive_connections=args.concurrency))
+    try:
+        for policy in ("random", "pool"):
+            pool = build_pool([port for _, _, port, _ in servers], args.max_concurrency, http_client)
+            fastest["failing"] = False
+
+            on_progress = None
+            if args.fail_fastest_after:
+                def on_progress(index):
+                    fastest["failing"] = index > args.fail_fastest_after
+
+            # 워밍업 (연결 수립, 대상별 첫 지연 시간 표본)
+            await run_policy(policy, pool, len(args.targets) * 4, len(args.targets))
+            summary = await run_policy(policy, pool, args.requests, args.concurrency, on_progress)
+            share = "  ".join(f"{name}={value:.1%}" for name, value in summary["share"].items())
+            print(
+                f"{policy:<8} {summary['rps']:>9.1f} {summary['p50_ms']:>9.1f} {summary['p95_ms']:>9.1f} "
+                f"{summary['error_rate'] * 100:>7.2f}%   {share}",
+                flush=True
+            )
+            if policy == "pool":
+                for target in pool.stats()["targets"]:
+                    print(f"  {target['name']}: latency_ewma={target['latency_ewma_ms']}ms error_rate_ewma={target['error_rate_ewma']}")
+    finally:
+        await http_client.aclose()
+        for server, _, _, _ in servers:
+            server.should_exit = True
+        await asyncio.gather(*(task for _, task, _, _ in servers), return_exceptions=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="업스트림 풀 라우팅 벤치마크")
+    parser.add_argument("--targets", nargs="+", default=["lognormal:40:0.3", "lognormal:120:0.3", "lognormal:300:0.3"],
+                        help="대상별 지연 분포 (가장 빠른 대상을 첫 번째로)")
+    parser.add_argument("--requests", type=int, default=600)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--max-concurrency", type=int, default=64, help="대상별 동시 호출 수 제한")
+    parser.add_argument("--fail-fastest-after", type=int, default=0, help="이 요청 수 이후 가장 빠른 대상이 503 반환")
+    args = parser.parse_args()
+
+    print(f"대상 지연 분포: {', '.join(f'target-{index}={spec}' for index, spec in enumerate(args.targets))}")
+    print(f"{'정책':<8} {'RPS':>9} {'p50(ms)':>9} {'p95(ms)':>9} {'오류':>8}   대상별 요청 비율")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -44,6 +44,34 @@ CREATE TABLE IF NOT EXISTS emotion_analysis (
   FOREIGN KEY (user_id) REFERENCES users(id)
 );
 
+-- 사용자별 월별 감정 집계 테이블 (emotion_analysis 저장 시 트리거로 갱신)
+CREATE TABLE IF NOT EXISTS emotion_monthly_stats (
+  user_id UUID NOT NULL,
+  month DATE NOT NULL,
+  emotion TEXT NOT NULL,
+  count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, month, emotion),
+  FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- INSERT 문장 하나(여러 행)를 (사용자, 월, 감정)별로 묶어 한 번에 집계 반영
+CREATE OR REPLACE FUNCTION emotion_monthly_stats_rollup() RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO emotion_monthly_stats (user_id, month, emotion, count)
+  SELECT user_id, date_trunc('month', created_at AT TIME ZONE 'UTC')::date, emotion, count(*)
+  FROM new_rows
+  GROUP BY 1, 2, 3
+  ON CONFLICT (user_id, month, emotion) DO UPDATE SET count = emotion_monthly_stats.count + EXCLUDED.count;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS emotion_analysis_rollup ON emotion_analysis;
+CREATE TRIGGER emotion_analysis_rollup
+  AFTER INSERT ON emotion_analysis
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION emotion_monthly_stats_rollup();
+
 -- anonymous 사용자를 위한 특별 계정 생성
 INSERT INTO users (id, name, email, provider, provider_id)
 VALUES 
@@ -52,6 +80,7 @@ ON CONFLICT (email) DO NOTHING;
 
 -- 색인 생성
 CREATE INDEX IF NOT EXISTS emotion_analysis_user_id_idx ON emotion_analysis (user_id);
+CREATE INDEX IF NOT EXISTS emotion_analysis_user_id_created_at_idx ON emotion_analysis (user_id, created_at);
 CREATE INDEX IF NOT EXISTS emotion_analysis_created_at_idx ON emotion_analysis (created_at);
 CREATE INDEX IF NOT EXISTS emotion_analysis_emotion_idx ON emotion_analysis (emotion);
 CREATE INDEX IF NOT EXISTS users_email_idx ON users(email);
@@ -64,6 +93,7 @@ CREATE INDEX IF NOT EXISTS refresh_tokens_expires_at_idx ON refresh_tokens (expi
 ALTER TABLE emotion_analysis ENABLE ROW LEVEL SECURITY;
 ALTER TABLE users ENABLE ROW LEVEL SECURITY;
 ALTER TABLE refresh_tokens ENABLE ROW LEVEL SECURITY;
+ALTER TABLE emotion_monthly_stats ENABLE ROW LEVEL SECURITY;
 
 -- 모든 사용자가 자신의 데이터만 볼 수 있도록 정책 설정
 CREATE POLICY "사용자는 자신의 감정 분석 데이터만 볼 수 있음" ON emotion_analysis
@@ -78,6 +108,10 @@ CREATE POLICY "서버 API는 익명 사용자 데이터를 조작할 수 있음"
   USING (user_id = '00000000-0000-0000-0000-000000000000'::uuid OR auth.role() = 'service_role')
   WITH CHECK (user_id = '00000000-0000-0000-0000-000000000000'::uuid OR auth.role() = 'service_role');
 
+-- 월별 집계도 자신의 데이터만 조회
+CREATE POLICY "사용자는 자신의 월별 감정 집계만 볼 수 있음" ON emotion_monthly_stats
+  FOR SELECT USING (auth.uid()::uuid = user_id OR auth.role() = 'service_role');
+
 -- 정책 생성
 CREATE POLICY users_policy ON users
     FOR ALL
@@ -98,6 +132,8 @@ CREATE POLICY refresh_tokens_policy ON refresh_tokens
 GRANT SELECT ON emotion_analysis TO anon, authenticated, service_role;
 GRANT INSERT ON emotion_analysis TO anon, authenticated, service_role;
 GRANT USAGE ON SEQUENCE emotion_analysis_id_seq TO anon, authenticated, service_role;
+GRANT SELECT ON emotion_monthly_stats TO anon, authenticated, service_role;
+GRANT INSERT, UPDATE, DELETE ON emotion_monthly_stats TO service_role;
 GRANT SELECT ON users TO anon, authenticated, service_role;
 GRANT INSERT ON users TO anon, authenticated, service_role;
 GRANT SELECT, INSERT, UPDATE, DELETE ON refresh_tokens TO anon, authenticated, service_role; 
\ No newline at end of file
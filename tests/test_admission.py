@@ -0,0 +1,139 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.admission import AdmissionMiddleware, TokenBucketLimiter, deadline_remaining
+
+
+def create_app(release=None, **options):
+    app = FastAPI()
+
+    @app.post("/api/openai/generate")
+    async def generate():
+        if release is not None:
+            await release.wait()
+        return {"remaining": deadline_remaining()}
+
+    @app.get("/api/openai/jobs/{job_id}")
+    async def get_job(job_id: str):
+        return {"job_id": job_id}
+
+    @app.post("/api/analyze")
+    async def analyze():
+        return {}
+
+    app.add_middleware(AdmissionMiddleware, **options)
+    return app
+
+
+def client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def test_rate_limit_returns_429_with_retry_after():
+    app = create_app(rate=1.0, burst=2)
+
+    async def main():
+        async with client(app) as c:
+            return [await c.post("/api/openai/generate") for _ in range(3)]
+
+    responses = asyncio.run(main())
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert responses[-1].json() == {"detail": "rate_limited"}
+    assert int(responses[-1].headers["retry-after"]) >= 1
+
+
+def test_get_polling_and_cheap_paths_do_not_spend_tokens():
+    app = create_app(rate=1.0, burst=1)
+
+    async def main():
+        async with client(app) as c:
+            polls = [await c.get("/api/openai/jobs/abc") for _ in range(5)]
+            cheap = [await c.post("/api/analyze") for _ in range(5)]
+            limited = [await c.post("/api/openai/generate") for _ in range(2)]
+            return polls + cheap, limited
+
+    unlimited, limited = asyncio.run(main())
+    assert all(response.status_code == 200 for response in unlimited)
+    assert [response.status_code for response in limited] == [200, 429]
+
+
+def test_rate_limit_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("ADMISSION_RATE_PER_SEC", raising=False)
+    app = create_app(**AdmissionMiddleware.options_from_env())
+
+    async def main():
+        async with client(app) as c:
+            return [await c.post("/api/openai/generate") for _ in range(50)]
+
+    assert all(response.status_code == 200 for response in asyncio.run(main()))
+
+
+def test_forwarded_client_is_used_only_when_trusted():
+    async def statuses(trust_forwarded):
+        app = create_app(rate=1.0, burst=1, trust_forwarded=trust_forwarded)
+        async with client(app) as c:
+            return [
+                (await c.post("/api/openai/generate", headers={"X-Forwarded-For": f"10.0.0.{i}, 172.16.0.1"})).status_code
+                for i in range(3)
+            ]
+
+    assert asyncio.run(statuses(True)) == [200, 200, 200]
+    assert asyncio.run(statuses(False)) == [200, 429, 429]
+
+
+def test_llm_concurrency_limit_returns_503_with_retry_after():
+    async def main():
+        release = asyncio.Event()
+        app = create_app(release=release, llm_max_in_flight=1, overload_retry_after=3)
+        async with client(app) as c:
+            first = asyncio.ensure_future(c.post("/api/openai/generate"))
+            await asyncio.sleep(0.05)
+            rejected = await c.post("/api/openai/generate")
+            # 가벼운 경로와 GET 요청은 LLM 동시 처리 수 제한을 받지 않음
+            cheap = await c.post("/api/analyze")
+            poll = await c.get("/api/openai/jobs/abc")
+            release.set()
+            return (await first), rejected, cheap, poll
+
+    first, rejected, cheap, poll = asyncio.run(main())
+    assert first.status_code == 200
+    assert rejected.status_code == 503
+    assert rejected.json() == {"detail": "overloaded"}
+    assert rejected.headers["retry-after"] == "3"
+    assert cheap.status_code == 200
+    assert poll.status_code == 200
+
+
+def test_expired_deadline_is_rejected_and_budget_is_propagated():
+    app = create_app()
+
+    async def main():
+        async with client(app) as c:
+            expired = await c.post("/api/openai/generate", headers={"X-Request-Timeout-Ms": "0"})
+            budgeted = await c.post("/api/openai/generate", headers={"X-Request-Timeout-Ms": "5000"})
+            unbounded = await c.post("/api/openai/generate")
+            return expired, budgeted, unbounded
+
+    expired, budgeted, unbounded = asyncio.run(main())
+    assert expired.status_code == 503
+    assert expired.json() == {"detail": "deadline_expired"}
+    assert "retry-after" in expired.headers
+    assert 0 < budgeted.json()["remaining"] <= 5.0
+    assert unbounded.json()["remaining"] is None
+
+
+def test_token_bucket_refills_and_evicts_oldest_client(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.core.admission.time.monotonic", lambda: now[0])
+    limiter = TokenBucketLimiter(rate=2.0, burst=1, max_clients=2)
+
+    assert limiter.acquire("a") == 0.0
+    assert limiter.acquire("a") == 0.5
+    now[0] += 0.5
+    assert limiter.acquire("a") == 0.0
+
+    limiter.acquire("b")
+    limiter.acquire("c")
+    assert "a" not in limiter._buckets
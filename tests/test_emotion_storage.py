@@ -0,0 +1,153 @@
+import asyncio
+import sqlite3
+
+from app.models.emotion_storage import (
+    ANONYMOUS_USER_ID,
+    EmotionStorage,
+    SQLiteStorageBackend,
+    build_record,
+    is_integrity_error
+)
+
+USER_ID = "11111111-1111-1111-1111-111111111111"
+UNKNOWN_USER_ID = "22222222-2222-2222-2222-222222222222"
+
+
+def make_record(emotion="슬픔", user_id=None):
+    return build_record("오늘 하루", {"detected_emotion": emotion, "summary": "요약", "response": "응답"}, user_id=user_id)
+
+
+class RecordingBackend(SQLiteStorageBackend):
+    """insert_many 호출별 행 수를 기록하고, 지정한 횟수만큼 일시적 오류를 내는 SQLite 저장소"""
+
+    def __init__(self, path, transient_failures=0, known_users=None):
+        super().__init__(str(path))
+        self.inserts = []
+        self.transient_failures = transient_failures
+        self.known_users = known_users
+
+    async def insert_many(self, records):
+        self.inserts.append(len(records))
+        if self.transient_failures:
+            self.transient_failures -= 1
+            raise ConnectionError("connection reset")
+        await super().insert_many(records)
+
+    async def existing_users(self, user_ids):
+        if self.known_users is None:
+            return set(user_ids)
+        return set(user_ids) & self.known_users
+
+    def query(self, sql, params=()):
+        # close() 이후에도 확인할 수 있도록 새 연결로 조회
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def count(self):
+        return self.query("SELECT count(*) FROM emotion_analysis")[0][0]
+
+
+def run_storage(storage, records):
+    async def main():
+        for record in records:
+            assert storage.enqueue(record)
+        await storage.close()
+
+    asyncio.run(main())
+
+
+def test_rows_are_written_in_batches(tmp_path):
+    backend = RecordingBackend(tmp_path / "storage.db")
+    storage = EmotionStorage(backend, batch_size=100, flush_interval=10.0)
+    run_storage(storage, [make_record() for _ in range(250)])
+
+    assert backend.inserts == [100, 100, 50]
+    assert backend.count() == 250
+    assert storage.stats()["written"] == 250
+    assert storage.stats()["batches"] == 3
+
+
+def test_close_drains_queue_without_waiting_for_flush_interval(tmp_path):
+    backend = RecordingBackend(tmp_path / "storage.db")
+    storage = EmotionStorage(backend, batch_size=100, flush_interval=60.0)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        for _ in range(5):
+            storage.enqueue(make_record())
+        start = loop.time()
+        await storage.close(timeout=5.0)
+        return loop.time() - start
+
+    assert asyncio.run(main()) < 1.0
+    assert storage.stats()["written"] == 5
+
+
+def test_enqueue_after_close_is_dropped(tmp_path):
+    storage = EmotionStorage(RecordingBackend(tmp_path / "storage.db"))
+
+    async def main():
+        await storage.close()
+        return storage.enqueue(make_record())
+
+    assert asyncio.run(main()) is False
+    assert storage.stats()["dropped"] == 1
+
+
+def test_bad_row_is_rejected_without_dropping_the_batch(tmp_path):
+    backend = RecordingBackend(tmp_path / "storage.db")
+    storage = EmotionStorage(backend, batch_size=100, flush_interval=10.0)
+    records = [make_record() for _ in range(40)]
+    # NOT NULL 제약 위반 (재시도해도 성공하지 않는 오류)
+    records[3]["emotion"] = None
+    records[27]["emotion"] = None
+    run_storage(storage, records)
+
+    stats = storage.stats()
+    assert stats["written"] == 38
+    assert stats["rejected"] == 2
+    assert stats["failed"] == 0
+    assert backend.count() == 38
+    # 무결성 오류는 재시도 없이 반씩 나눠 저장 (전체 재시도보다 훨씬 적은 호출)
+    assert len(backend.inserts) < 40
+    rows = backend.query("SELECT count FROM emotion_monthly_stats WHERE user_id = ?", (ANONYMOUS_USER_ID,))
+    assert sum(count for count, in rows) == 38
+
+
+def test_unknown_users_are_rejected_before_insert(tmp_path):
+    backend = RecordingBackend(tmp_path / "storage.db", known_users={USER_ID})
+    storage = EmotionStorage(backend, batch_size=100, flush_interval=10.0)
+    run_storage(storage, [
+        make_record(user_id=USER_ID),
+        make_record(user_id=UNKNOWN_USER_ID),
+        make_record(),
+        make_record(user_id=UNKNOWN_USER_ID)
+    ])
+
+    assert backend.inserts == [2]
+    assert storage.stats()["written"] == 2
+    assert storage.stats()["rejected"] == 2
+
+
+def test_transient_errors_are_retried(tmp_path):
+    backend = RecordingBackend(tmp_path / "storage.db", transient_failures=1)
+    storage = EmotionStorage(backend, batch_size=100, flush_interval=10.0, max_retries=1)
+    run_storage(storage, [make_record() for _ in range(3)])
+
+    assert backend.inserts == [3, 3]
+    assert storage.stats()["written"] == 3
+    assert storage.stats()["failed"] == 0
+
+
+def test_integrity_errors_are_classified():
+    class PostgresError(Exception):
+        def __init__(self, sqlstate):
+            self.sqlstate = sqlstate
+
+    assert is_integrity_error(sqlite3.IntegrityError("NOT NULL constraint failed"))
+    assert is_integrity_error(PostgresError("23503"))  # foreign_key_violation
+    assert not is_integrity_error(PostgresError("08006"))  # connection_failure
+    assert not is_integrity_error(ConnectionError("reset"))
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from app.models.hybrid_router import HybridRouter
+
+CONFIDENT_HAPPY = "오늘은 행복했다 기뻤다 즐거웠다 신났다 뿌듯했다"
+
+
+class FakeAnalyzer:
+    mode_templates = {"comfort": {}, "fact": {}, "advice": {}}
+
+    def __init__(self):
+        self.calls = []
+
+    async def analyze_async(self, text, mood_id, mode):
+        self.calls.append(text)
+        return {"detected_emotion": "좋음", "summary": "로컬", "response": "로컬 응답"}
+
+
+class FakeOpenAIService:
+    def __init__(self):
+        self.calls = []
+
+    async def generate_response(self, text, mode, mood_id, response_type, context):
+        self.calls.append(text)
+        return {"detected_emotion": "좋음", "summary": "LLM", "response": "LLM 응답"}
+
+
+def make_router(**options):
+    return HybridRouter(FakeOpenAIService(), FakeAnalyzer(), **options)
+
+
+@pytest.mark.parametrize("threshold, expected", [
+    (0.5, HybridRouter.LOCAL),
+    (0.99, HybridRouter.LLM_LOW_CONFIDENCE)
+])
+def test_confidence_threshold(threshold, expected):
+    decision, estimate = make_router(threshold=threshold).decide(CONFIDENT_HAPPY, "chat", "happy")
+    assert 0.5 <= estimate["confidence"] < 0.99
+    assert decision == expected
+
+
+def test_estimate_must_match_selected_mood():
+    decision, _ = make_router(threshold=0.5).decide(CONFIDENT_HAPPY, "chat", "sad")
+    assert decision == HybridRouter.LLM_MOOD_MISMATCH
+
+
+@pytest.mark.parametrize("options, args, expected", [
+    ({"enabled": False}, ("chat", "happy", "comfort", ""), HybridRouter.LLM_DISABLED),
+    ({}, ("analyze", "happy", "comfort", ""), HybridRouter.LLM_MODE),
+    ({}, ("chat", "happy", "unknown", ""), HybridRouter.LLM_MODE),
+    ({}, ("chat", "happy", "comfort", "이전 대화"), HybridRouter.LLM_CONTEXT)
+])
+def test_requests_without_local_template_go_to_llm(options, args, expected):
+    decision, estimate = make_router(threshold=0.5, **options).decide(CONFIDENT_HAPPY, *args)
+    assert decision == expected
+    assert estimate is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("오늘은 안 행복해 정말 안 행복해", HybridRouter.LLM_NEGATED),
+    ("행복하지 않았다 기쁘지 않았다 즐겁지 않았다", HybridRouter.LLM_NEGATED),
+    ("I'm not happy at all, not happy", HybridRouter.LLM_NEGATED),
+    ("행복했다 기뻤다 즐거웠다 신났다 하지만 피곤했다", HybridRouter.LLM_MIXED),
+    ("happy happy joy joy but exhausted", HybridRouter.LLM_MIXED)
+])
+def test_negated_and_mixed_inputs_stay_on_llm_path(text, expected):
+    router = make_router(threshold=0.0)
+
+    async def main():
+        return await router.generate_response(text, mood_id="happy")
+
+    result, decision = asyncio.run(main())
+    assert decision == expected
+    assert result["summary"] == "LLM"
+    assert router.emotion_analyzer.calls == []
+    assert router.openai_service.calls == [text]
+
+
+def test_generate_response_counts_decisions():
+    router = make_router(threshold=0.5)
+
+    async def main():
+        await router.generate_response(CONFIDENT_HAPPY, mood_id="happy")
+        await router.generate_response(CONFIDENT_HAPPY, mood_id="sad")
+        await router.generate_response("", mood_id="happy")
+
+    asyncio.run(main())
+    stats = router.stats()
+    assert stats["decisions"] == {
+        HybridRouter.LOCAL: 1,
+        HybridRouter.LLM_MOOD_MISMATCH: 1,
+        HybridRouter.EMPTY: 1
+    }
+    assert stats["local_ratio"] == round(1 / 3, 4)
+    assert router.emotion_analyzer.calls == [CONFIDENT_HAPPY]
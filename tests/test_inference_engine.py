@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from app.models.inference_engine import MicroBatcher, Seq2SeqInferenceEngine
+
+WORDS = ["오늘", "하루", "너무", "피곤", "했다", "기분", "좋았다", "친구", "만났다", "비가", "왔다"]
+
+
+def make_engine():
+    """네트워크 없이 작은 무작위 BART 모델과 로컬 단어 토크나이저로 엔진을 만듭니다."""
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    tokenizers = pytest.importorskip("tokenizers")
+
+    vocab = {"<s>": 0, "<pad>": 1, "</s>": 2, "<unk>": 3}
+    vocab.update({word: i + len(vocab) for i, word in enumerate(WORDS)})
+    backend = tokenizers.Tokenizer(tokenizers.models.WordLevel(vocab, unk_token="<unk>"))
+    backend.pre_tokenizer = tokenizers.pre_tokenizers.Whitespace()
+    tokenizer = transformers.PreTrainedTokenizerFast(
+        tokenizer_object=backend, bos_token="<s>", eos_token="</s>", pad_token="<pad>", unk_token="<unk>"
+    )
+
+    torch.manual_seed(0)
+    config = transformers.BartConfig(
+        vocab_size=len(vocab),
+        d_model=16,
+        encoder_layers=1,
+        decoder_layers=1,
+        encoder_attention_heads=2,
+        decoder_attention_heads=2,
+        encoder_ffn_dim=32,
+        decoder_ffn_dim=32,
+        max_position_embeddings=64,
+        pad_token_id=1,
+        bos_token_id=0,
+        eos_token_id=2,
+        decoder_start_token_id=2,
+        forced_bos_token_id=None,
+        forced_eos_token_id=None
+    )
+    model = transformers.BartForConditionalGeneration(config)
+    return Seq2SeqInferenceEngine(model=model, tokenizer=tokenizer, max_input_length=32, max_output_length=8)
+
+
+def test_engine_generates_one_output_per_input():
+    engine = make_engine()
+    assert engine.loaded
+    outputs = engine.generate_batch(["오늘 하루 너무 피곤 했다", "친구 만났다"])
+    assert len(outputs) == 2
+    assert all(isinstance(output, str) for output in outputs)
+
+
+def test_concurrent_submits_are_batched_and_mapped_to_callers():
+    engine = make_engine()
+    texts = ["오늘 하루 너무 피곤 했다", "기분 좋았다", "친구 만났다 기분 좋았다", "비가 왔다"]
+    expected = engine.generate_batch(texts)
+    batcher = MicroBatcher(engine.generate_batch, max_batch_size=16, max_wait_ms=50)
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit(text) for text in texts))
+
+    assert asyncio.run(main()) == expected
+    assert batcher.stats() == {"batches": 1, "items": 4, "avg_batch_size": 4.0}
+
+
+def test_batches_are_split_by_max_batch_size_and_keep_order():
+    sizes = []
+
+    def batch_fn(items):
+        sizes.append(len(items))
+        return [item * 10 for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=3, max_wait_ms=50)
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(7)))
+
+    assert asyncio.run(main()) == [i * 10 for i in range(7)]
+    assert sizes == [3, 3, 1]
+
+
+def test_batch_error_reaches_every_waiter_and_next_batch_runs():
+    calls = []
+
+    def batch_fn(items):
+        calls.append(list(items))
+        if len(calls) == 1:
+            raise RuntimeError("추론 실패")
+        return [f"ok:{item}" for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=16, max_wait_ms=50)
+
+    async def main():
+        failed = await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+        succeeded = await batcher.submit("다음")
+        return failed, succeeded
+
+    failed, succeeded = asyncio.run(main())
+    assert all(isinstance(error, RuntimeError) for error in failed)
+    assert calls[0] == [0, 1, 2]
+    # 실패한 배치 이후에도 워커가 계속 동작
+    assert succeeded == "ok:다음"
+    assert batcher.stats()["batches"] == 1
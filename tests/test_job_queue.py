@@ -0,0 +1,219 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.models import job_queue
+from app.models.job_queue import (
+    EXPIRED,
+    FAILED,
+    JOB_FAILED_MESSAGE,
+    SUCCEEDED,
+    JobManager,
+    JobQueueFullError,
+    MemoryJobBackend,
+    is_public_address
+)
+
+
+async def wait_for_status(manager, job_id, timeout=3.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
+        job = await manager.get(job_id)
+        if job is not None and job["status"] in (SUCCEEDED, FAILED, EXPIRED):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"작업이 끝나지 않았습니다: {job_id}")
+
+
+def test_job_result_is_available_until_result_ttl():
+    async def process(request):
+        return {"echo": request["text"]}
+
+    async def main():
+        manager = JobManager(process, MemoryJobBackend(), workers=1, result_ttl=0.2)
+        job = await manager.submit({"text": "안녕"})
+        finished = await wait_for_status(manager, job["job_id"])
+        await asyncio.sleep(0.3)
+        expired = await manager.get(job["job_id"])
+        await manager.close()
+        return finished, expired
+
+    finished, expired = asyncio.run(main())
+    assert finished["status"] == SUCCEEDED
+    assert finished["result"] == {"echo": "안녕"}
+    assert expired is None
+
+
+def test_job_waiting_longer_than_job_ttl_expires_without_processing():
+    calls = []
+
+    async def process(request):
+        calls.append(request)
+        return {}
+
+    async def main():
+        # 워커 없이 제출만 받은 뒤, job_ttl이 지나고 나서 워커 시작
+        manager = JobManager(process, MemoryJobBackend(), workers=0, job_ttl=0.05)
+        job = await manager.submit({"text": "늦은 작업"})
+        await asyncio.sleep(0.1)
+        manager.workers = 1
+        manager.start()
+        finished = await wait_for_status(manager, job["job_id"])
+        await manager.close()
+        return finished, manager.counts
+
+    finished, counts = asyncio.run(main())
+    assert finished["status"] == EXPIRED
+    assert finished["error"]
+    assert calls == []
+    assert counts[EXPIRED] == 1
+
+
+class DetailError(Exception):
+    def __init__(self, message, detail):
+        super().__init__(message)
+        self.detail = detail
+
+
+def run_failing_job(error):
+    async def process(request):
+        raise error
+
+    async def main():
+        manager = JobManager(process, MemoryJobBackend(), workers=1)
+        job = await manager.submit({"text": "x"})
+        finished = await wait_for_status(manager, job["job_id"])
+        await manager.close()
+        return finished
+
+    return asyncio.run(main())
+
+
+def test_failed_job_records_only_error_detail():
+    finished = run_failing_job(DetailError("401 Incorrect API key provided: sk-abcd1234", "응답 생성에 실패했습니다."))
+    assert finished["status"] == FAILED
+    assert finished["error"] == "응답 생성에 실패했습니다."
+    assert "request" not in JobManager.public_view(finished)
+
+
+def test_failed_job_without_detail_records_fixed_message():
+    finished = run_failing_job(ConnectionError("connect to 10.0.0.5:5432 failed"))
+    assert finished["status"] == FAILED
+    assert finished["error"] == JOB_FAILED_MESSAGE
+
+
+def test_submit_rejects_when_queue_is_full():
+    async def process(request):
+        return {}
+
+    async def main():
+        manager = JobManager(process, MemoryJobBackend(), workers=0, max_queue_size=2)
+        await manager.submit({"text": "1"})
+        await manager.submit({"text": "2"})
+        with pytest.raises(JobQueueFullError):
+            await manager.submit({"text": "3"})
+        return manager.counts
+
+    assert asyncio.run(main())["rejected"] == 1
+
+
+def test_memory_backend_sweeps_expired_records(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.models.job_queue.time.time", lambda: now[0])
+    backend = MemoryJobBackend()
+
+    async def main():
+        await backend.save({"job_id": "old"}, ttl=10)
+        now[0] += 11
+        await backend.save({"job_id": "new"}, ttl=10)
+        return await backend.load("old"), await backend.load("new")
+
+    old, new = asyncio.run(main())
+    assert old is None
+    assert new == {"job_id": "new"}
+    assert set(backend._jobs) == {"new"}
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/hook",
+    "http://10.1.2.3/hook",
+    "http://169.254.169.254/latest/meta-data",
+    "http://[::1]/hook",
+    "http://[::ffff:192.168.0.1]/hook",
+    "ftp://example.com/hook"
+])
+def test_webhook_to_non_public_address_is_rejected(url):
+    manager = JobManager(None, MemoryJobBackend())
+    with pytest.raises(ValueError):
+        asyncio.run(manager.validate_webhook(url))
+
+
+def test_webhook_private_address_allowed_when_configured():
+    manager = JobManager(None, MemoryJobBackend(), webhook_allow_private=True)
+    asyncio.run(manager.validate_webhook("http://127.0.0.1:9000/hook"))
+
+
+def test_public_address_check():
+    assert is_public_address("8.8.8.8")
+    assert is_public_address("2606:4700:4700::1111")
+    assert not is_public_address("100.64.0.1")
+    assert not is_public_address("224.0.0.1")
+    assert not is_public_address("fe80::1%eth0")
+
+
+def deliver_with_dns(url, resolved):
+    """resolved 순서대로 DNS 응답을 돌려주며 웹훅을 전송하고 (결과, 받은 요청 목록)을 반환합니다."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(204)
+
+    async def resolve_host(hostname, port):
+        return resolved.pop(0)
+
+    async def main():
+        manager = JobManager(None, MemoryJobBackend(), webhook_retries=1)
+        manager._resolve_host = resolve_host
+        manager._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        await manager.validate_webhook(url)
+        job = {"job_id": "abc", "status": SUCCEEDED, "webhook_url": url}
+        status = await manager._deliver_webhook(job)
+        await manager.close()
+        return status
+
+    return asyncio.run(main()), requests
+
+
+def test_webhook_connects_to_the_vetted_address():
+    status, requests = deliver_with_dns("https://hooks.example.com:8443/done?x=1", [["93.184.216.34"], ["93.184.216.34"]])
+    assert status == 204
+    request, = requests
+    assert request.url.host == "93.184.216.34"
+    assert request.url.port == 8443
+    assert request.url.raw_path == b"/done?x=1"
+    assert request.headers["Host"] == "hooks.example.com:8443"
+    assert request.extensions["sni_hostname"] == "hooks.example.com"
+
+
+def test_webhook_rebound_to_private_address_is_not_sent():
+    status, requests = deliver_with_dns("http://hooks.example.com/done", [["93.184.216.34"], ["127.0.0.1"]])
+    assert status == "rejected"
+    assert requests == []
+
+
+@pytest.mark.parametrize("url", ["redis://localhost:6379/0", "rediss://cache.example.com", "unix:///tmp/redis.sock"])
+def test_job_queue_url_schemes(monkeypatch, url):
+    created = []
+    monkeypatch.setenv("JOB_QUEUE_URL", url)
+    monkeypatch.setattr(job_queue, "RedisJobBackend", lambda url, prefix: created.append(url))
+    JobManager.from_env(None)
+    assert created == [url]
+
+
+def test_job_queue_url_with_unknown_scheme_is_rejected(monkeypatch):
+    monkeypatch.setenv("JOB_QUEUE_URL", "http://localhost:6379")
+    with pytest.raises(ValueError, match="unix://"):
+        JobManager.from_env(None)
@@ -0,0 +1,81 @@
+import pytest
+
+from app.models.lexicon_scorer import AhoCorasickAutomaton, LexiconScorer, get_default_scorer
+
+
+def terms(result):
+    return [(match["term"], match["negated"]) for match in result["matches"]]
+
+
+def test_automaton_reports_overlapping_matches():
+    automaton = AhoCorasickAutomaton([("he", 1), ("she", 2), ("hers", 3), ("his", 4)])
+    assert sorted(automaton.iter_matches("ushers")) == [(1, 4, 2), (2, 4, 1), (2, 6, 3)]
+    assert len(automaton) == 4
+
+
+def test_english_terms_match_only_at_word_boundaries():
+    scorer = LexiconScorer({"sad": {"sad": 1.0}, "happy": {"fun": 1.0}})
+    assert scorer.score("The crusade was funny")["matches"] == []
+    result = scorer.score("Sad, but fun.")
+    assert [match["term"] for match in result["matches"]] == ["sad", "fun"]
+
+
+def test_korean_terms_match_as_stems():
+    result = get_default_scorer().score("오늘은 너무 행복했고 즐거웠다")
+    assert [match["term"] for match in result["matches"]] == ["행복", "즐거"]
+    assert result["dominant"] == "happy"
+    assert result["negated"] == 0
+    assert not result["mixed"]
+
+
+def test_confidence_grows_with_agreeing_terms_and_drops_with_mixed_emotions():
+    scorer = get_default_scorer()
+    one = scorer.score("행복했다")["confidence"]
+    many = scorer.score("행복했다 기뻤다 즐거웠다 신났다")["confidence"]
+    mixed = scorer.score("행복했다 슬펐다")["confidence"]
+    assert 0 < mixed < one < many <= 1
+
+
+@pytest.mark.parametrize("text", [
+    "안 행복해",
+    "오늘은 행복하지 않았다",
+    "기쁘지 못한 하루",
+    "걱정 없이 잘 지냈다",
+    "I'm not happy at all",
+    "I don't feel happy",
+    "I didn’t feel happy",
+    "never happy here"
+])
+def test_negated_terms_do_not_count(text):
+    result = get_default_scorer().score(text)
+    assert result["negated"] == 1
+    assert result["dominant"] is None
+    assert result["confidence"] == 0.0
+
+
+@pytest.mark.parametrize("text", [
+    "오늘은 불안 했다",  # "불안"의 "안"은 부정이 아님
+    "잘못 했다 슬프다",  # "잘못"의 "못"은 부정이 아님
+    "힘들고 기운이 없다",  # 감정 용어에 포함된 "없"은 부정이 아님
+    "nothing but joy",
+    "not bad. happy now"  # 부정 범위는 절 구분 문자에서 끝남
+])
+def test_negation_cues_outside_scope_are_ignored(text):
+    result = get_default_scorer().score(text)
+    assert result["negated"] == 0
+    assert result["dominant"] is not None
+
+
+def test_negation_reaches_only_the_nearest_term():
+    result = get_default_scorer().score("슬펐다 그리고 행복하지 않았다")
+    assert terms(result) == [("슬펐", False), ("행복", True)]
+    assert result["dominant"] == "sad"
+
+
+@pytest.mark.parametrize("text", ["행복했지만 피곤했다", "I was happy but tired", "그런데 행복했다"])
+def test_contrast_marks_result_as_mixed(text):
+    assert get_default_scorer().score(text)["mixed"]
+
+
+def test_contrast_without_emotion_is_not_mixed():
+    assert not get_default_scorer().score("밥을 먹었지만 배가 고팠다")["mixed"]
@@ -0,0 +1,141 @@
+import hmac
+import json
+import time
+import base64
+import asyncio
+import hashlib
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.routes import openai_route
+from app.models.emotion_storage import ANONYMOUS_USER_ID
+from app.models.session_store import SessionStore
+
+SECRET = "test-secret"
+USER_ID = "11111111-1111-1111-1111-111111111111"
+OTHER_USER_ID = "22222222-2222-2222-2222-222222222222"
+RESULT = {"detected_emotion": "보통", "summary": "요약", "response": "응답"}
+
+
+def b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def make_token(user_id, secret=SECRET):
+    header = b64(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+    payload = b64(json.dumps({"sub": user_id, "exp": time.time() + 60}).encode())
+    signature = hmac.new(secret.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()
+    return f"Bearer {header}.{payload}.{b64(signature)}"
+
+
+class FakeRouter:
+    async def generate_response(self, **kwargs):
+        return dict(RESULT), "local"
+
+
+class FakeStorage:
+    def __init__(self):
+        self.records = []
+
+    def enqueue(self, record):
+        self.records.append(record)
+        return True
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    storage = FakeStorage()
+    monkeypatch.setenv("JWT_SECRET", SECRET)
+    monkeypatch.setattr(openai_route, "_hybrid_router", FakeRouter())
+    monkeypatch.setattr(openai_route, "_emotion_storage", storage)
+    monkeypatch.setattr(openai_route, "_emotion_storage_loaded", True)
+    return storage
+
+
+def send(method, path, body=None, authorization=None, session_token=None):
+    app = FastAPI()
+    app.include_router(openai_route.router)
+    headers = {}
+    if authorization:
+        headers["Authorization"] = authorization
+    if session_token:
+        headers["X-Session-Token"] = session_token
+
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.request(method, "/api/openai" + path, json=body, headers=headers)
+
+    return asyncio.run(main())
+
+
+def post_generate(body, authorization=None):
+    return send("POST", "/generate", body, authorization)
+
+
+def test_result_is_stored_for_token_user(storage):
+    response = post_generate({"text": "오늘 하루"}, make_token(USER_ID))
+    assert response.status_code == 200
+    assert [record["user_id"] for record in storage.records] == [USER_ID]
+
+
+def test_request_without_token_is_stored_as_anonymous(storage):
+    response = post_generate({"text": "오늘 하루"})
+    assert response.status_code == 200
+    assert [record["user_id"] for record in storage.records] == [ANONYMOUS_USER_ID]
+
+
+@pytest.mark.parametrize("authorization, status", [
+    (None, 401),  # 토큰 없이 다른 사용자로 저장 시도
+    (make_token(USER_ID), 403),  # 토큰의 사용자와 다른 user_id
+    (make_token(OTHER_USER_ID, secret="wrong-secret"), 401)  # 서명이 맞지 않는 토큰
+])
+def test_body_user_id_must_match_token(storage, authorization, status):
+    response = post_generate({"text": "오늘 하루", "user_id": OTHER_USER_ID}, authorization)
+    assert response.status_code == status
+    assert storage.records == []
+
+
+class WordCounter:
+    def count(self, text):
+        return len(text.split()) if text else 0
+
+
+async def summarize(summary, turns, labels=None):
+    return summary
+
+
+@pytest.fixture
+def sessions(storage, monkeypatch):
+    store = SessionStore(summarize, WordCounter())
+    monkeypatch.setattr(openai_route, "_session_store", store)
+    return store
+
+
+def test_anonymous_session_requires_session_token(sessions):
+    created = send("POST", "/sessions").json()
+    session_id, token = created["session_id"], created["session_token"]
+
+    assert send("GET", f"/sessions/{session_id}").status_code == 404
+    assert send("GET", f"/sessions/{session_id}", session_token="wrong").status_code == 404
+    assert send("GET", f"/sessions/{session_id}", authorization=make_token(USER_ID)).status_code == 404
+    body = {"text": "오늘 하루", "session_id": session_id}
+    assert send("POST", "/generate", body).status_code == 404
+    assert send("DELETE", f"/sessions/{session_id}", session_token="wrong").status_code == 404
+
+    assert send("GET", f"/sessions/{session_id}", session_token=token).status_code == 200
+    assert send("POST", "/generate", body, session_token=token).status_code == 200
+    assert send("DELETE", f"/sessions/{session_id}", session_token=token).status_code == 200
+
+
+def test_session_is_bound_to_token_user(sessions):
+    created = send("POST", "/sessions", authorization=make_token(USER_ID)).json()
+    session_id = created["session_id"]
+    assert created["user_id"] == USER_ID
+
+    body = {"text": "오늘 하루", "session_id": session_id}
+    assert send("POST", "/generate", body, make_token(OTHER_USER_ID)).status_code == 404
+    assert send("DELETE", f"/sessions/{session_id}", authorization=make_token(OTHER_USER_ID)).status_code == 404
+    assert send("POST", "/generate", body, make_token(USER_ID)).status_code == 200
+    assert send("GET", f"/sessions/{session_id}", authorization=make_token(USER_ID)).json()["turns"] == 1
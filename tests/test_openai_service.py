@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from app.models.openai_service import OpenAIService, UpstreamError
+
+SECRET = "sk-proj-abcd1234"
+
+
+class StatusError(Exception):
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "fake")
+    monkeypatch.setenv("OPENAI_CACHE_SIZE", "0")
+    monkeypatch.setenv("OPENAI_RETRY_MAX_ATTEMPTS", "1")
+    monkeypatch.setenv("OPENAI_CIRCUIT_FAILURE_THRESHOLD", "0")
+    monkeypatch.delenv("OPENAI_UPSTREAMS", raising=False)
+    service = OpenAIService()
+    yield service
+    asyncio.run(service.aclose())
+
+
+def test_batch_item_errors_are_sanitized(service):
+    async def generate(text, mode, mood_id, response_type, context):
+        if text == "인증 실패":
+            raise StatusError(f"Incorrect API key provided: {SECRET}", 401)
+        if text == "서버 오류":
+            raise StatusError(f"upstream 500 for key {SECRET}", 500)
+        if text == "시간 초과":
+            raise asyncio.TimeoutError()
+        return {"detected_emotion": "보통", "summary": text, "response": "응답"}
+
+    service._generate = generate
+    results = asyncio.run(service.generate_batch([
+        {"text": "정상"},
+        {"text": "인증 실패"},
+        {"text": "서버 오류"},
+        {"text": "시간 초과"},
+        {"text": ""}
+    ]))
+
+    assert [item["status"] for item in results] == [200, 502, 503, 503, 400]
+    assert results[0]["success"] and results[0]["error"] is None
+    assert results[1]["error"] == UpstreamError.DETAILS[502]
+    assert results[2]["error"] == UpstreamError.DETAILS[503]
+    assert results[3]["error"] == UpstreamError.DETAILS[503]
+    # 원인 오류 문구(API 키 일부 포함)는 결과에 포함되지 않음
+    assert all(SECRET not in str(item) for item in results)
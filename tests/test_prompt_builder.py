@@ -0,0 +1,98 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.openai_service import OpenAIService
+from app.models.prompt_builder import PromptBuilder, TokenCounter
+
+
+class WordCounter:
+    """단어 하나를 1토큰으로 세는 계산기 (청크 경계를 예측하기 쉽게)"""
+
+    exact = True
+
+    def count(self, text):
+        return len(text.split()) if text else 0
+
+
+def sentences(count, words=5):
+    return " ".join(f"문장{i} " + "단어 " * (words - 2) + "끝." for i in range(count))
+
+
+def test_approximate_token_count():
+    counter = TokenCounter()
+    counter._encoding = None
+    assert counter.count("") == 0
+    assert counter.count("abcdefgh") == 2
+    assert counter.count("안녕하세요") == 5
+    assert counter.count("hi 안녕") == 3
+
+
+def test_short_text_is_not_reduced():
+    builder = PromptBuilder(max_input_tokens=20, counter=WordCounter())
+    assert not builder.needs_reduction("짧은 일기")
+    assert builder.needs_reduction(sentences(5))
+
+
+def test_chunks_follow_sentence_boundaries_within_budget():
+    builder = PromptBuilder(chunk_tokens=12, max_chunks=8, counter=WordCounter())
+    text = sentences(6)
+    chunks = builder.split_chunks(text)
+    # 5단어 문장 2개씩 (3개면 예산 12 초과)
+    assert len(chunks) == 3
+    assert all(builder.count_tokens(chunk) <= 12 for chunk in chunks)
+    assert all(chunk.endswith("끝.") for chunk in chunks)
+    assert " ".join(chunks) == text
+
+
+def test_chunk_budget_grows_to_respect_max_chunks():
+    builder = PromptBuilder(chunk_tokens=5, max_chunks=2, counter=WordCounter())
+    chunks = builder.split_chunks(sentences(6))
+    assert len(chunks) == 2
+
+
+def test_sentence_longer_than_budget_is_split():
+    builder = PromptBuilder(chunk_tokens=4, max_chunks=100, counter=WordCounter())
+    chunks = builder.split_chunks("가 " * 20)
+    assert len(chunks) > 1
+    assert all(builder.count_tokens(chunk) <= 4 for chunk in chunks)
+
+
+def test_prompt_keeps_fixed_prefix_and_context_last():
+    builder = PromptBuilder(counter=WordCounter())
+    template = "고정 지시문. 감정: {emotion}, 유형: {response_type}\n일기: {text}"
+    _, first = builder.build("시스템", template, "첫 일기", "좋음", "위로")
+    _, second = builder.build("시스템", template, "둘째 일기", "슬픔", "조언", context="이전 대화")
+    assert first.startswith("고정 지시문.") and second.startswith("고정 지시문.")
+    assert second.endswith("\n추가 컨텍스트: 이전 대화")
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "fake")
+    monkeypatch.setenv("OPENAI_CACHE_SIZE", "0")
+    monkeypatch.delenv("OPENAI_UPSTREAMS", raising=False)
+    service = OpenAIService()
+    service.prompt_builder = PromptBuilder(max_input_tokens=20, chunk_tokens=12, max_chunks=8, counter=WordCounter())
+    yield service
+    asyncio.run(service.aclose())
+
+
+def test_long_text_is_summarized_per_chunk_and_joined(service):
+    prompts = []
+
+    async def create_completion(system_message, prompt, max_tokens=500, temperature=0.7, labels=None, stage="upstream"):
+        prompts.append((prompt, max_tokens, stage))
+        await asyncio.sleep(0)
+        index = prompt.split("구간 ", 1)[1].split("/", 1)[0]
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f" 요약{index} "))])
+
+    service._create_completion = create_completion
+    _, prompt, _ = asyncio.run(service._build_prompt(sentences(6), "chat", "happy", "comfort", ""))
+
+    assert len(prompts) == 3
+    assert {stage for _, _, stage in prompts} == {"chunk_upstream"}
+    assert {max_tokens for _, max_tokens, _ in prompts} == {service.prompt_builder.chunk_summary_tokens}
+    assert PromptBuilder.REDUCED_TEXT_HEADER + "[1] 요약1\n[2] 요약2\n[3] 요약3" in prompt
+    assert "문장0" not in prompt
@@ -0,0 +1,129 @@
+import time
+import asyncio
+
+import pytest
+
+from app.core.admission import request_deadline, deadline_remaining, DeadlineExceededError
+from app.models.response_cache import ResponseCache
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_callers_share_one_compute():
+    cache = ResponseCache(max_size=10, ttl=60)
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"response": "ok"}
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_compute("key", factory) for _ in range(10)))
+
+    results = run(main())
+
+    assert len(calls) == 1
+    assert results == [{"response": "ok"}] * 10
+    # 호출자마다 사본을 받으므로 한 호출자의 수정이 다른 호출자나 캐시에 영향을 주지 않음
+    results[0]["response"] = "changed"
+    assert results[1]["response"] == "ok"
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["coalesced"] == 9
+    assert cache.stats()["inflight"] == 0
+
+
+def test_cached_value_is_reused_until_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = ResponseCache(max_size=10, ttl=60)
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        return {"response": len(calls)}
+
+    assert run(cache.get_or_compute("key", factory)) == {"response": 1}
+    now[0] += 59
+    assert run(cache.get_or_compute("key", factory)) == {"response": 1}
+    now[0] += 2
+    assert run(cache.get_or_compute("key", factory)) == {"response": 2}
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["expirations"] == 1
+
+
+def test_failures_are_shared_but_not_cached():
+    cache = ResponseCache(max_size=10, ttl=60)
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream")
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_compute("key", failing) for _ in range(3)), return_exceptions=True)
+
+    results = run(main())
+    assert len(calls) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    async def succeeding():
+        return {"response": "ok"}
+
+    assert run(cache.get_or_compute("key", succeeding)) == {"response": "ok"}
+
+
+def test_shared_compute_ignores_first_callers_deadline():
+    cache = ResponseCache(max_size=10, ttl=60)
+    seen_deadlines = []
+
+    async def factory():
+        seen_deadlines.append(deadline_remaining())
+        await asyncio.sleep(0.1)
+        return {"response": "ok"}
+
+    async def caller(budget):
+        if budget is not None:
+            request_deadline.set(time.monotonic() + budget)
+        return await cache.get_or_compute("key", factory)
+
+    async def main():
+        return await asyncio.gather(caller(0.02), caller(None), return_exceptions=True)
+
+    short, unbounded = run(main())
+
+    # 마감 시각이 짧은 호출자만 실패하고, 공유 작업은 마감 시각 없이 끝까지 진행
+    assert isinstance(short, DeadlineExceededError)
+    assert unbounded == {"response": "ok"}
+    assert seen_deadlines == [None]
+
+
+def test_expired_caller_does_not_call_factory():
+    cache = ResponseCache(max_size=10, ttl=60)
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        return {"response": "ok"}
+
+    async def main():
+        request_deadline.set(time.monotonic() - 1)
+        with pytest.raises(DeadlineExceededError):
+            await cache.get_or_compute("key", factory)
+        await asyncio.sleep(0.01)
+        request_deadline.set(None)
+        return await cache.get("key")
+
+    assert run(main()) is None
+    assert calls == []
+    assert cache.stats()["inflight"] == 0
+
+
+def test_make_key_normalizes_whitespace_and_options():
+    first = ResponseCache.make_key("오늘은  좋았다 ", "Chat", "happy", "comfort", "", "gpt-4o-mini")
+    second = ResponseCache.make_key("오늘은 좋았다", "chat", " HAPPY", "comfort", None, "gpt-4o-mini")
+    assert first == second
+    assert first != ResponseCache.make_key("오늘은 좋았다", "chat", "happy", "comfort", "", "gpt-4o")
@@ -0,0 +1,192 @@
+import asyncio
+
+from app.models.session_store import SessionStore
+
+USER_ID = "11111111-1111-1111-1111-111111111111"
+
+
+class WordCounter:
+    def count(self, text):
+        return len(text.split()) if text else 0
+
+
+class RecordingSummarizer:
+    """요약 호출을 기록하고, release가 설정될 때까지 기다렸다가 요약을 반환합니다."""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.release = None
+        self.fail = fail
+
+    async def __call__(self, summary, turns, labels=None):
+        self.calls.append((summary, list(turns)))
+        if self.release is not None:
+            await self.release.wait()
+        if self.fail:
+            raise RuntimeError("upstream")
+        return f"요약{len(self.calls)}"
+
+
+def make_store(summarizer, **options):
+    options.setdefault("history_tokens", 1000)
+    options.setdefault("keep_turns", 2)
+    return SessionStore(summarizer, WordCounter(), **options)
+
+
+def test_old_turns_are_folded_after_twice_keep_turns():
+    summarizer = RecordingSummarizer()
+    store = make_store(summarizer)
+
+    async def main():
+        session = store.create()
+        for i in range(4):
+            store.append_turn(session, f"일기{i}", f"응답{i}")
+        assert session._summarizing is None
+        store.append_turn(session, "일기4", "응답4")
+        assert session._summarizing is not None
+        await session._summarizing
+        return session
+
+    session = asyncio.run(main())
+    assert summarizer.calls == [("", [("일기0", "응답0"), ("일기1", "응답1"), ("일기2", "응답2")])]
+    assert session.summary == "요약1"
+    assert session.turns == [("일기3", "응답3"), ("일기4", "응답4")]
+    assert session.summarized_turns == 3
+    assert store.stats()["summaries"] == 1
+    assert store.build_context(session) == "이전 대화 요약: 요약1\n최근 대화:\n사용자: 일기3\n응답: 응답3\n사용자: 일기4\n응답: 응답4"
+
+
+def test_turns_over_token_budget_trigger_summary_and_context_is_truncated():
+    summarizer = RecordingSummarizer()
+    store = make_store(summarizer, history_tokens=10, keep_turns=4)
+
+    async def main():
+        session = store.create()
+        summarizer.release = asyncio.Event()
+        store.append_turn(session, "긴 일기 " * 3, "긴 응답 " * 3)
+        # 한 턴(16토큰)만으로 예산(10)을 넘으므로 요약 시작, 요약 전에는 예산에 맞게 잘림
+        assert session._summarizing is not None
+        assert store.build_context(session) == ""
+        summarizer.release.set()
+        await session._summarizing
+        return session
+
+    session = asyncio.run(main())
+    assert session.turns == []
+    assert session.summary == "요약1"
+    assert store.stats()["truncations"] == 1
+
+
+def test_turns_added_while_summarizing_are_kept():
+    summarizer = RecordingSummarizer()
+    store = make_store(summarizer)
+
+    async def main():
+        summarizer.release = asyncio.Event()
+        session = store.create()
+        for i in range(5):
+            store.append_turn(session, f"일기{i}", f"응답{i}")
+        task = session._summarizing
+        await asyncio.sleep(0)
+        store.append_turn(session, "일기5", "응답5")
+        summarizer.release.set()
+        await task
+        return session
+
+    session = asyncio.run(main())
+    assert session.turns == [("일기3", "응답3"), ("일기4", "응답4"), ("일기5", "응답5")]
+    assert session.summarized_turns == 3
+
+
+def test_failed_summary_is_retried_on_next_turn():
+    summarizer = RecordingSummarizer(fail=True)
+    store = make_store(summarizer)
+
+    async def main():
+        session = store.create()
+        for i in range(5):
+            store.append_turn(session, f"일기{i}", f"응답{i}")
+        await session._summarizing
+        summarizer.fail = False
+        store.append_turn(session, "일기5", "응답5")
+        await session._summarizing
+        return session
+
+    session = asyncio.run(main())
+    assert store.stats()["summary_failures"] == 1
+    assert len(summarizer.calls) == 2
+    assert session.summary == "요약2"
+
+
+def test_deleting_session_cancels_summary():
+    summarizer = RecordingSummarizer()
+    store = make_store(summarizer)
+
+    async def main():
+        summarizer.release = asyncio.Event()
+        session = store.create()
+        for i in range(5):
+            store.append_turn(session, f"일기{i}", f"응답{i}")
+        task = session._summarizing
+        await asyncio.sleep(0)
+        assert store.delete(session.session_id, token=session.token)
+        await asyncio.gather(task, return_exceptions=True)
+        return task
+
+    task = asyncio.run(main())
+    assert task.cancelled()
+    assert store.stats()["size"] == 0
+
+
+def test_close_cancels_running_summaries():
+    summarizer = RecordingSummarizer()
+    store = make_store(summarizer)
+
+    async def main():
+        summarizer.release = asyncio.Event()
+        session = store.create()
+        for i in range(5):
+            store.append_turn(session, f"일기{i}", f"응답{i}")
+        task = session._summarizing
+        await asyncio.sleep(0)
+        await store.close()
+        return task, session
+
+    task, session = asyncio.run(main())
+    assert task.cancelled()
+    assert session.summary == ""
+    assert len(session.turns) == 5
+
+
+def test_sessions_expire_and_are_evicted(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.models.session_store.time.time", lambda: now[0])
+    store = make_store(RecordingSummarizer(), ttl=60, max_sessions=2)
+
+    first = store.create()
+    second = store.create()
+    store.create()
+    assert store.get(first.session_id, token=first.token) is None
+    assert store.stats()["evictions"] == 1
+
+    now[0] += 61
+    assert store.get(second.session_id, token=second.token) is None
+    assert store.stats()["expirations"] == 1
+
+
+def test_session_requires_its_token_or_owner():
+    store = make_store(RecordingSummarizer())
+    anonymous = store.create()
+    owned = store.create(USER_ID)
+
+    assert store.get(anonymous.session_id) is None
+    assert store.get(anonymous.session_id, token="wrong") is None
+    assert store.get(anonymous.session_id, token=owned.token) is None
+    assert store.get(anonymous.session_id, token=anonymous.token) is anonymous
+
+    assert store.get(owned.session_id, user_id="22222222-2222-2222-2222-222222222222") is None
+    assert store.get(owned.session_id, user_id=USER_ID) is owned
+    assert store.get(owned.session_id, token=owned.token) is owned
+
+    assert not store.delete(anonymous.session_id, token="wrong")
+    assert store.delete(anonymous.session_id, token=anonymous.token)
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from app.models.stream_parser import IncrementalJSONFieldParser
+
+FIELDS = ("detected_emotion", "summary", "response")
+
+
+def feed_all(text, size):
+    """text를 size 글자씩 나눠 넣고 (완성된 필드 목록, 파서)를 반환합니다."""
+    parser = IncrementalJSONFieldParser(FIELDS)
+    found = []
+    for i in range(0, len(text), size):
+        found.extend(parser.feed(text[i:i + size]))
+    return found, parser
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_fenced_json_with_preamble(size):
+    text = (
+        "다음은 결과입니다:\n```json\n"
+        '{"detected_emotion": "슬픔", "summary": "하루 요약", "response": "괜찮아요."}'
+        "\n```\n도움이 되길 바랍니다."
+    )
+    found, parser = feed_all(text, size)
+    assert found == [("detected_emotion", "슬픔"), ("summary", "하루 요약"), ("response", "괜찮아요.")]
+    assert parser.completed == dict(found)
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 1000])
+def test_escaped_strings_split_across_chunks(size):
+    expected = {
+        "detected_emotion": "좋음",
+        "summary": '그는 "괜찮다"고 말했다 \\ 끝',
+        "response": "첫 줄\n둘째 줄\t탭 é {중괄호} [대괄호], 쉼표: 콜론"
+    }
+    text = json.dumps(expected, ensure_ascii=True)
+    found, parser = feed_all(text, size)
+    assert parser.completed == expected
+    assert [name for name, _ in found] == list(FIELDS)
+
+
+def test_nested_and_unknown_keys_are_ignored():
+    text = json.dumps({
+        "meta": {"summary": "중첩 값"},
+        "tags": ["response", "summary"],
+        "detected_emotion": "보통",
+        "extra": "무시",
+        "summary": "최상위 값"
+    }, ensure_ascii=False)
+    found, parser = feed_all(text, 4)
+    assert found == [("detected_emotion", "보통"), ("summary", "최상위 값")]
+    assert "response" not in parser.completed
+
+
+def test_duplicate_field_is_reported_once():
+    found, parser = feed_all('{"summary": "처음", "summary": "나중"}', 3)
+    assert found == [("summary", "처음")]
+    assert parser.completed == {"summary": "처음"}
+
+
+def test_incomplete_value_is_not_reported():
+    parser = IncrementalJSONFieldParser(FIELDS)
+    assert parser.feed('{"summary": "아직 끝나지 않은 \\"') == []
+    assert parser.feed('값\\""') == [("summary", '아직 끝나지 않은 "값"')]
+    assert parser.text == '{"summary": "아직 끝나지 않은 \\"값\\""'
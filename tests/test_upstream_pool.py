@@ -0,0 +1,221 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.upstream_pool import UpstreamPool, UpstreamTarget
+
+
+class StatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def make_pool(*latencies, **options):
+    """지연 시간 EWMA가 latencies인 대상들로 풀을 만듭니다 (None은 표본 없음)"""
+    targets = []
+    for index, latency in enumerate(latencies):
+        target = UpstreamTarget(f"t{index}", client=None, model="m", max_concurrency=options.pop(f"max_concurrency_{index}", 64))
+        target.latency = latency
+        targets.append(target)
+    return UpstreamPool(targets, **options)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.models.upstream_pool.time.monotonic", lambda: now[0])
+    return now
+
+
+def test_pool_requires_targets():
+    with pytest.raises(ValueError):
+        UpstreamPool([])
+
+
+def test_fastest_target_is_selected():
+    pool = make_pool(0.3, 0.1, 0.2)
+    assert pool._select(0.0).name == "t1"
+
+
+def test_in_flight_calls_spread_load():
+    pool = make_pool(0.1, 0.25)
+    fast, slow = pool.targets
+    fast.in_flight = 2  # 0.1 × 3 > 0.25 × 1
+    assert pool._select(0.0) is slow
+    fast.in_flight = 1  # 0.1 × 2 < 0.25 × 1
+    assert pool._select(0.0) is fast
+
+
+def test_error_rate_penalizes_target():
+    pool = make_pool(0.1, 0.15)
+    pool.targets[0].error_rate = 0.5  # 0.1 ÷ 0.5 > 0.15
+    assert pool._select(0.0).name == "t1"
+
+
+def test_target_without_samples_is_assumed_fastest():
+    pool = make_pool(0.2, None)
+    pool.targets[0].in_flight = 1
+    assert pool._select(0.0).name == "t1"
+
+
+def test_full_or_cooling_targets_are_skipped():
+    pool = make_pool(0.1, 0.2, max_concurrency_0=1)
+    fast, slow = pool.targets
+    fast.in_flight = 1
+    assert pool._select(0.0) is slow
+    slow.available_at = 10.0
+    assert pool._select(5.0) is None
+    assert pool._select(10.0) is slow
+
+
+def test_latency_ewma_ignores_fast_failures_and_counts_slow_ones():
+    pool = make_pool(1.0, ewma_alpha=0.5)
+    target = pool.targets[0]
+    pool.record(target, 0.5)
+    assert target.latency == 0.75
+    assert target.error_rate == 0.0
+
+    # 빠르게 실패한 호출은 지연 시간을 낮추지 않음
+    pool.record(target, 0.01, ConnectionError("refused"))
+    assert target.latency == 0.75
+    assert target.error_rate == 0.5
+
+    # 오래 걸린 실패(타임아웃)는 느려졌다는 표본
+    pool.record(target, 2.75, asyncio.TimeoutError())
+    assert target.latency == 1.75
+
+
+def test_request_errors_do_not_affect_target():
+    pool = make_pool(0.1)
+    target = pool.targets[0]
+    pool.record(target, 5.0, StatusError(400))
+    assert target.latency == 0.1
+    assert target.error_rate == 0.0
+    assert target.errors == 0
+
+
+def test_consecutive_failures_eject_target_until_cooldown(clock):
+    pool = make_pool(0.1, 0.3, ewma_alpha=0.5, error_threshold=0.5, error_cooldown=5.0)
+    bad, good = pool.targets
+
+    pool.record(bad, 0.01, StatusError(500))
+    assert bad.available_at == 0.0  # 한 번 실패로는 제외하지 않음
+    pool.record(bad, 0.01, StatusError(500))
+    assert bad.available_at == clock[0] + 5.0
+    assert pool._select(clock[0]) is good
+
+    clock[0] += 5.0
+    # 쉬는 시간이 지나면 다시 선택되어 회복 여부를 확인 (오류율이 남아 있어도 더 빠르면 선택)
+    assert pool._select(clock[0]) is good
+    good.latency = 1.0
+    assert pool._select(clock[0]) is bad
+    pool.record(bad, 0.1)
+    assert bad.consecutive_failures == 0
+    assert bad.error_rate == 0.375
+
+
+def test_rate_limited_target_cools_down_for_retry_after(clock):
+    pool = make_pool(0.1, 0.3)
+    target = pool.targets[0]
+    pool.record(target, 0.05, StatusError(429, {"retry-after": "3"}))
+    assert target.available_at == clock[0] + 3.0
+    assert target.stats()["cooling_down_s"] == 3.0
+
+
+def test_rate_budget_moves_calls_to_next_target():
+    fast = UpstreamTarget("fast", client=None, model="m", rate_per_sec=1.0, burst=1)
+    slow = UpstreamTarget("slow", client=None, model="m")
+    fast.latency, slow.latency = 0.1, 0.3
+    pool = UpstreamPool([fast, slow])
+
+    async def main():
+        return [await pool.acquire(), await pool.acquire()]
+
+    first, second = asyncio.run(main())
+    assert (first, second) == (fast, slow)
+    assert fast.throttled == 1
+    assert fast.available_at > 0
+
+
+def test_acquire_waits_for_release_when_all_targets_are_full():
+    pool = make_pool(0.1, max_concurrency_0=1)
+    target = pool.targets[0]
+
+    async def main():
+        held = await pool.acquire()
+        waiter = asyncio.ensure_future(pool.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        pool.release(held)
+        return await asyncio.wait_for(waiter, 1.0)
+
+    assert asyncio.run(main()) is target
+    assert target.in_flight == 1
+
+
+def test_call_records_result_and_releases_target():
+    pool = make_pool(None, None)
+
+    async def ok(target):
+        return target.name
+
+    async def fail(target):
+        raise StatusError(503)
+
+    async def main():
+        name = await pool.call(ok)
+        with pytest.raises(StatusError):
+            await pool.call(fail)
+        return name
+
+    name = asyncio.run(main())
+    assert [target.in_flight for target in pool.targets] == [0, 0]
+    assert sum(target.requests for target in pool.targets) == 2
+    assert sum(target.errors for target in pool.targets) == 1
+    assert pool.targets[0].name == name and pool.targets[0].latency is not None
+
+
+def test_cancelled_call_is_not_counted_as_error():
+    pool = make_pool(0.001)
+    target = pool.targets[0]
+
+    async def slow(target):
+        await asyncio.sleep(1.0)
+
+    async def main():
+        task = asyncio.ensure_future(pool.call(slow))
+        await asyncio.sleep(0.02)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(main())
+    assert target.in_flight == 0
+    assert target.errors == 0
+    assert target.error_rate == 0.0
+    # 평소보다 오래 걸렸으므로 느려졌다는 표본으로 사용
+    assert target.latency > 0.001
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "default-key")
+    monkeypatch.setenv("OPENAI_KEY_B", "key-b")
+    monkeypatch.setenv("OPENAI_UPSTREAM_ERROR_COOLDOWN", "7")
+    monkeypatch.setenv("OPENAI_UPSTREAMS", '[{"name": "a", "rate_per_sec": 5}, {"api_key_env": "OPENAI_KEY_B", "model": "other", "max_concurrency": 8}]')
+    clients = []
+
+    def client_factory(api_key, base_url):
+        clients.append(api_key)
+        return api_key
+
+    pool = UpstreamPool.from_env(client_factory, "default-model", default_max_concurrency=16)
+    a, b = pool.targets
+    assert clients == ["default-key", "key-b"]
+    assert (a.name, a.model, a.max_concurrency, a.limiter.burst) == ("a", "default-model", 16, 5)
+    assert (b.name, b.model, b.max_concurrency, b.limiter) == ("upstream-1", "other", 8, None)
+    assert pool.error_cooldown == 7.0
+
+    monkeypatch.delenv("OPENAI_UPSTREAMS")
+    assert UpstreamPool.from_env(client_factory, "default-model") is None
@@ -0,0 +1,210 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.upstream_resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    RetryPolicy,
+    UpstreamResilience
+)
+
+
+class StatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def make_resilience(max_attempts=3, failure_threshold=5, **options):
+    return UpstreamResilience(
+        retry_policy=RetryPolicy(max_attempts=max_attempts, base_delay=0.001, max_delay=0.01, retryable_exceptions=(ConnectionError,)),
+        circuit_breaker=CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=30.0),
+        **options
+    )
+
+
+def flaky(*outcomes):
+    """outcomes를 차례로 반환하거나 발생시키는 attempt 함수와 호출 기록"""
+    calls = []
+
+    async def attempt():
+        outcome = outcomes[len(calls)]
+        calls.append(outcome)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return attempt, calls
+
+
+@pytest.mark.parametrize("error, reason", [
+    (asyncio.TimeoutError(), "timeout"),
+    (StatusError(429), "rate_limited"),
+    (StatusError(503), "server_error"),
+    (StatusError(408), "server_error"),
+    (ConnectionError("reset"), "connection"),
+    (StatusError(400), None),
+    (StatusError(401), None),
+    (ValueError("bad"), None)
+])
+def test_retry_classification(error, reason):
+    policy = RetryPolicy(retryable_exceptions=(ConnectionError,))
+    assert policy.classify(error) == reason
+
+
+@pytest.mark.parametrize("headers, delay", [
+    ({"retry-after-ms": "1500"}, 1.5),
+    ({"retry-after": "3"}, 3.0),
+    ({"x-ratelimit-reset-requests": "6m0s"}, 360.0),
+    ({"x-ratelimit-reset-requests": "1h2m3.5s"}, 3723.5),
+    ({"x-ratelimit-reset-requests": "20ms"}, 0.02),
+    ({"x-ratelimit-reset-requests": "soon"}, None),
+    ({}, None)
+])
+def test_server_delay_headers(headers, delay):
+    assert RetryPolicy.server_delay(StatusError(429, headers)) == delay
+
+
+def test_backoff_waits_at_least_server_delay():
+    policy = RetryPolicy(base_delay=0.25, max_delay=8.0)
+    assert policy.backoff(1, StatusError(429, {"retry-after": "2"})) >= 2.0
+    assert all(0 <= policy.backoff(3) <= 2.0 for _ in range(50))
+
+
+def test_retryable_errors_are_retried_until_success():
+    resilience = make_resilience()
+    attempt, calls = flaky(StatusError(503), ConnectionError("reset"), "ok")
+    assert asyncio.run(resilience.call(attempt, timeout=5.0)) == "ok"
+    assert len(calls) == 3
+    assert resilience.circuit_breaker.failures == 0
+
+
+def test_non_retryable_error_is_raised_without_retry():
+    resilience = make_resilience()
+    attempt, calls = flaky(StatusError(400), "ok")
+    with pytest.raises(StatusError):
+        asyncio.run(resilience.call(attempt, timeout=5.0))
+    assert len(calls) == 1
+    # 업스트림 장애가 아니므로 서킷 실패로 세지 않음
+    assert resilience.circuit_breaker.failures == 0
+
+
+def test_retries_stop_at_max_attempts_and_record_failure():
+    resilience = make_resilience(max_attempts=2)
+    attempt, calls = flaky(StatusError(500), StatusError(502), "ok")
+    with pytest.raises(StatusError):
+        asyncio.run(resilience.call(attempt, timeout=5.0))
+    assert len(calls) == 2
+    assert resilience.circuit_breaker.failures == 1
+
+
+def test_circuit_opens_and_rejects_calls():
+    resilience = make_resilience(max_attempts=1, failure_threshold=2)
+    for _ in range(2):
+        attempt, _ = flaky(StatusError(500))
+        with pytest.raises(StatusError):
+            asyncio.run(resilience.call(attempt, timeout=5.0))
+    assert resilience.circuit_breaker.state == CircuitBreaker.OPEN
+
+    attempt, calls = flaky("ok")
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(resilience.call(attempt, timeout=5.0))
+    assert calls == []
+
+
+def test_circuit_half_open_allows_one_probe(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.models.upstream_resilience.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0)
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    now[0] += 29
+    assert not breaker.allow()
+
+    now[0] += 2
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+    # 시험 호출 실패 시 다시 open
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    now[0] += 31
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_released_probe_can_be_retried(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.models.upstream_resilience.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=1.0)
+    breaker.record_failure()
+    now[0] += 2
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+
+
+def test_latency_tracker_quantile():
+    tracker = LatencyTracker(quantile=0.9, sample_size=100, min_samples=10, refresh_every=10)
+    for value in range(9):
+        tracker.add(value / 100)
+    assert tracker.value is None
+    tracker.add(0.09)
+    assert tracker.value == 0.09
+
+
+def hedged_resilience(delay):
+    resilience = make_resilience(hedge_enabled=True, hedge_min_delay=delay)
+    resilience.latency = LatencyTracker(min_samples=1, refresh_every=1)
+    resilience.latency.add(delay)
+    return resilience
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    resilience = hedged_resilience(0.02)
+    cancelled = []
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+        if len(calls) == 1:
+            try:
+                await asyncio.sleep(1.0)
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+            return "primary"
+        return "hedge"
+
+    assert asyncio.run(resilience.call(attempt, timeout=5.0, hedge=True)) == "hedge"
+    assert len(calls) == 2
+    assert cancelled == [1]
+
+
+def test_fast_primary_is_not_hedged():
+    resilience = hedged_resilience(0.5)
+    attempt, calls = flaky("primary", "hedge")
+    assert asyncio.run(resilience.call(attempt, timeout=5.0, hedge=True)) == "primary"
+    assert len(calls) == 1
+
+
+def test_hedge_is_not_used_when_disabled_for_the_call():
+    resilience = hedged_resilience(0.01)
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "only"
+
+    assert asyncio.run(resilience.call(attempt, timeout=5.0, hedge=False)) == "only"
+    assert len(calls) == 1